@@ -0,0 +1,68 @@
+"""Compares the speed and accuracy of the raster and shapely backends of overlap_matrix."""
+
+import time
+
+import cv2
+import numpy as np
+
+from tomni.annotation_manager import AnnotationManager
+from tomni.annotation_manager.spatial import store_footprints, store_geometries
+from tomni.annotation_manager.utils import overlap_matrix
+
+
+# %%
+def cell_mask(shape, n_cells, seed):
+    """A binary mask with touching and overlapping cells of 4 to 20 pixels radius."""
+    rng = np.random.default_rng(seed)
+    mask = np.zeros(shape, dtype=np.uint8)
+    for x, y in rng.integers(0, min(shape), size=(n_cells, 2)):
+        axes = (int(rng.integers(4, 20)), int(rng.integers(4, 20)))
+        cv2.ellipse(
+            mask, (int(x), int(y)), axes, int(rng.integers(0, 180)), 0, 360, 1, -1
+        )
+    return mask
+
+
+shape = (4000, 4000)
+store = AnnotationManager.from_binary_mask(cell_mask(shape, 20000, 0)).store
+other_store = AnnotationManager.from_binary_mask(cell_mask(shape, 20000, 1)).store
+print(f"{len(store)} x {len(other_store)} cells")
+
+
+# %%
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+geometries, shapely_build = timed(store_geometries, store)
+other_geometries, other_shapely_build = timed(store_geometries, other_store)
+shapely_matrix, shapely_overlap = timed(overlap_matrix, geometries, other_geometries)
+
+footprints, raster_build = timed(store_footprints, store)
+other_footprints, other_raster_build = timed(store_footprints, other_store)
+raster_matrix, raster_overlap = timed(
+    overlap_matrix, footprints, other_footprints, backend="raster"
+)
+
+print(
+    f"shapely: {shapely_build + other_shapely_build:.2f} s shapes, {shapely_overlap:.2f} s overlap, "
+    f"{shapely_matrix.nnz} overlapping pairs"
+)
+print(
+    f"raster: {raster_build + other_raster_build:.2f} s footprints, {raster_overlap:.2f} s overlap, "
+    f"{raster_matrix.nnz} overlapping pairs"
+)
+
+# %%
+# Pairs found by one backend only, e.g. touching along their boundary pixels, count as 0 for the other backend.
+pairs = (abs(raster_matrix) + abs(shapely_matrix)).nonzero()
+raster_ratios = np.asarray(raster_matrix[pairs]).ravel()
+shapely_ratios = np.asarray(shapely_matrix[pairs]).ravel()
+difference = np.abs(raster_ratios - shapely_ratios)
+print(f"mean absolute difference: {difference.mean():.4f}")
+print(f"max absolute difference: {difference.max():.4f}")
+for threshold in (0.1, 0.5, 0.9):
+    agree = np.mean((raster_ratios >= threshold) == (shapely_ratios >= threshold))
+    print(f"pairs on the same side of overlap >= {threshold}: {agree:.4f}")
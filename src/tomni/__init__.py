@@ -17,5 +17,6 @@ from .img_dim import img_dim
 from .img_paste import img_paste
 from .json_operations import *
 from .make_mask import *
+from .mask_bands import find_contours_in_bands, foreground_bands
 from .shape_fitting import fit_rect_around_ellipse
 from .transformers import *
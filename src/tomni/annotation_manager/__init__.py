@@ -1,2 +1,5 @@
 from .annotations import Annotation, BinaryMask, Ellipse, Point, Polygon
+from .feature_cache import FeatureCache
 from .main import AnnotationManager
+from .store import AnnotationStore
+from .summary import FeatureSummary, merge_summaries
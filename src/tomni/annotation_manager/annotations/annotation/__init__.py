@@ -1 +1 @@
-from .main import Annotation
+from .main import FEATURES, Annotation
@@ -1,8 +1,26 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Callable, Dict, List, Union
+
+# dimension: the power of the feature_multiplier applied to the pixel value of the feature.
+FEATURES = {
+    "area": {"is_ratio": False, "dimension": 2},
+    "aspect_ratio": {"is_ratio": True, "dimension": 0},
+    "average_diameter": {"is_ratio": False, "dimension": 1},
+    "circularity": {"is_ratio": True, "dimension": 0},
+    "convex_hull_area": {"is_ratio": False, "dimension": 2},
+    "major_axis": {"is_ratio": False, "dimension": 1},
+    "minor_axis": {"is_ratio": False, "dimension": 1},
+    "perimeter": {"is_ratio": False, "dimension": 1},
+    "roundness": {"is_ratio": True, "dimension": 0},
+}
 
 
 class Annotation(ABC):
+    __slots__ = ("_id", "_label", "_children", "_parents", "_accuracy", "_features")
+
+    # Shared by all annotations, features are only stored per annotation once calculated.
+    _all_features = FEATURES
+
     def __init__(
         self, id: str, label: str, children: List, parents: List, accuracy: float
     ) -> None:
@@ -11,6 +29,7 @@ class Annotation(ABC):
         self._children: List[Annotation] = children
         self._parents: List[Annotation] = parents
         self._accuracy: float = accuracy
+        self._features: Union[Dict[str, float], None] = None
 
     @abstractmethod
     def to_dict(self, decimals: int = 2, **kwargs) -> dict:
@@ -38,3 +57,20 @@ class Annotation(ABC):
     @abstractmethod
     def label(self, value) -> None:
         self._label = value
+
+    def _feature(self, name: str, calculate: Callable[[], float]) -> float:
+        """Returns a feature in pixel units, it is calculated on first access and cached.
+
+        Args:
+            name (str): Name of the feature, private names like "_outer_area" hold intermediate values.
+            calculate (Callable[[], float]): Calculates the feature when it is not cached yet.
+
+        Returns:
+            float: The feature in pixel units.
+        """
+        if self._features is None:
+            self._features = {}
+        elif name in self._features:
+            return self._features[name]
+        value = self._features[name] = calculate()
+        return value
@@ -7,10 +7,18 @@ import numpy as np
 
 from tomni.annotation_manager.annotations.annotation import Annotation
 from tomni.annotation_manager.annotations.point import Point
-from tomni.annotation_manager.utils import overlap_object
+from tomni.annotation_manager.utils import overlap_matrix
 
 
 class Ellipse(Annotation):
+    __slots__ = (
+        "_center",
+        "_radius_x",
+        "_radius_y",
+        "_rotation",
+        "_feature_multiplier",
+    )
+
     def __init__(
         self,
         radius_x: float,
@@ -50,27 +58,30 @@ class Ellipse(Annotation):
         self.rotation: float = rotation
 
         self._feature_multiplier: float = 1
-        self._area: Union[float, None] = None
-        self._aspect_ratio: Union[float, None] = None
-        self._average_diameter: Union[float, None] = None
-        self._circularity: Union[float, None] = None
-        self._convex_hull_area: Union[float, None] = None
-        self._major_axis: Union[float, None] = None
-        self._minor_axis: Union[float, None] = None
-        self._perimeter: Union[float, None] = None
-        self._roundness: Union[float, None] = None
-
-        self._all_features = {
-            "area": {"is_ratio": False},
-            "aspect_ratio": {"is_ratio": True},
-            "average_diameter": {"is_ratio": False},
-            "circularity": {"is_ratio": True},
-            "convex_hull_area": {"is_ratio": False},
-            "major_axis": {"is_ratio": False},
-            "minor_axis": {"is_ratio": False},
-            "perimeter": {"is_ratio": False},
-            "roundness": {"is_ratio": True},
-        }
+
+    @classmethod
+    def _from_store(cls, store, row: int) -> "Ellipse":
+        """Creates an Ellipse from a row of an AnnotationStore.
+
+        Args:
+            store (AnnotationStore): The store that holds the ellipse's parameters.
+            row (int): Index of the ellipse in the store.
+
+        Returns:
+            Ellipse: An ellipse with the parameters of the row.
+        """
+        center_x, center_y, radius_x, radius_y, rotation = store.ellipse_parameters(row)
+        return cls(
+            radius_x=radius_x,
+            radius_y=radius_y,
+            center=Point(x=center_x, y=center_y),
+            rotation=rotation,
+            id=store.ids[row],
+            label=store.label(row),
+            children=store.children[row],
+            parents=store.parents[row],
+            accuracy=float(store.accuracy[row]),
+        )
 
     @property
     def accuracy(self):
@@ -134,9 +145,7 @@ class Ellipse(Annotation):
         Returns:
             float: Ellipse's area.
         """
-        if self._area is None:
-            self._calculate_area()
-        return self._area * self._feature_multiplier**2
+        return self._feature("area", self._calculate_area) * self._feature_multiplier**2
 
     @property
     def circularity(self) -> float:
@@ -145,9 +154,7 @@ class Ellipse(Annotation):
         Returns:
             float: Ellipse's circularity.
         """
-        if self._circularity is None:
-            self._calculate_circularity()
-        return self._circularity
+        return self._feature("circularity", self._calculate_circularity)
 
     @property
     def convex_hull_area(self) -> Union[float, None]:
@@ -159,9 +166,10 @@ class Ellipse(Annotation):
         Returns:
             Union[float, None]: The convex hull area of the ellipse, or None if it cannot be calculated.
         """
-        if self._convex_hull_area is None:
-            self._calculate_convex_hull_area()
-        return self._convex_hull_area * self._feature_multiplier**2
+        return (
+            self._feature("convex_hull_area", self._calculate_convex_hull_area)
+            * self._feature_multiplier**2
+        )
 
     @property
     def average_diameter(self) -> float:
@@ -170,9 +178,10 @@ class Ellipse(Annotation):
         Returns:
             float: Average diameter.
         """
-        if self._average_diameter is None:
-            self._calculate_average_diameter()
-        return self._average_diameter * self._feature_multiplier
+        return (
+            self._feature("average_diameter", self._calculate_average_diameter)
+            * self._feature_multiplier
+        )
 
     @property
     def minor_axis(self) -> float:
@@ -181,9 +190,10 @@ class Ellipse(Annotation):
         Returns:
             float: Minor axis length.
         """
-        if self._minor_axis is None:
-            self._calculate_minor_axis()
-        return self._minor_axis * self._feature_multiplier
+        return (
+            self._feature("minor_axis", self._calculate_minor_axis)
+            * self._feature_multiplier
+        )
 
     @property
     def major_axis(self) -> float:
@@ -192,9 +202,10 @@ class Ellipse(Annotation):
         Returns:
             float: major axis length.
         """
-        if self._major_axis is None:
-            self._calculate_major_axis()
-        return self._major_axis * self._feature_multiplier
+        return (
+            self._feature("major_axis", self._calculate_major_axis)
+            * self._feature_multiplier
+        )
 
     @property
     def aspect_ratio(self) -> float:
@@ -203,9 +214,7 @@ class Ellipse(Annotation):
         Returns:
             float: Ellipse's aspect ratio.
         """
-        if self._aspect_ratio is None:
-            self._calculate_aspect_ratio()
-        return self._aspect_ratio
+        return self._feature("aspect_ratio", self._calculate_aspect_ratio)
 
     @property
     def perimeter(self) -> float:
@@ -214,9 +223,10 @@ class Ellipse(Annotation):
         Returns:
             float: Ellipse's perimeter.
         """
-        if self._perimeter is None:
-            self._calculate_perimeter()
-        return self._perimeter * self._feature_multiplier
+        return (
+            self._feature("perimeter", self._calculate_perimeter)
+            * self._feature_multiplier
+        )
 
     @property
     def roundness(self) -> Union[float, None]:
@@ -225,10 +235,7 @@ class Ellipse(Annotation):
         Returns:
             Union[float, None]: Polygon's roundness in [0, 1] or None.
         """
-
-        if self._roundness is None:
-            self._calculate_roundness()
-        return self._roundness
+        return self._feature("roundness", self._calculate_roundness)
 
     def to_dict(
         self,
@@ -314,12 +321,16 @@ class Ellipse(Annotation):
             thickness=-1,
         )
 
-    def is_in_mask(self, mask_json: List[dict], min_overlap: float = 0.9) -> bool:
+    def is_in_mask(
+        self, mask_json: List[dict], min_overlap: float = 0.9, backend: str = "shapely"
+    ) -> bool:
         """Check if an ellipse is within a binary mask.
 
         Args:
             mask_json (List[dict]): A list of dict masks in AxionBio dict format.
             min_overlap (float, optional): Minimum overlap required between the ellipse and the mask, expressed as a value between 0 and 1. Defaults to 0.9.
+            backend (str, optional): "shapely" intersects the shapes, "raster" counts the shared pixels, see `overlap_matrix`.
+                Defaults to "shapely".
 
         Returns:
             bool: True if the ellipse is within a mask and meets the required overlap, False otherwise.
@@ -333,64 +344,52 @@ class Ellipse(Annotation):
             "angleOfRotation": self.rotation,
         }
 
-        for mask in mask_json:
-            overlap_ratio = overlap_object(json_object, mask)
-            if overlap_ratio >= min_overlap:
-                return True
-
-        return False
-
-    def _calculate_circularity(self) -> None:
-        if not self._area:
-            self._calculate_area()
-
-        if not self._perimeter:
-            self._calculate_perimeter()
-
-        self._circularity = 4 * np.pi * self._area / self._perimeter**2
+        if len(mask_json) == 0:
+            return False
 
-    def _calculate_perimeter(self) -> None:
-        self._perimeter = (
-            2 * np.pi * np.sqrt((self._radius_x**2 + self._radius_y**2) / 2)
+        return (
+            overlap_matrix([json_object], mask_json, backend=backend).max()
+            >= min_overlap
         )
 
-    def _calculate_roundness(self) -> None:
-        if not self._area:
-            self._calculate_area()
+    def _calculate_circularity(self) -> float:
+        area = self._feature("area", self._calculate_area)
+        perimeter = self._feature("perimeter", self._calculate_perimeter)
+        return 4 * np.pi * area / perimeter**2
 
-        if not self._major_axis:
-            self._calculate_major_axis()
+    def _calculate_perimeter(self) -> float:
+        return 2 * np.pi * np.sqrt((self._radius_x**2 + self._radius_y**2) / 2)
 
-        if self.major_axis == 0:
-            self._roundness = 0
-        else:
-            enclosing_circle_area = (self._major_axis / 2) ** 2 * np.pi
-            self._roundness = self._area / enclosing_circle_area
+    def _calculate_roundness(self) -> float:
+        area = self._feature("area", self._calculate_area)
+        major_axis = self._feature("major_axis", self._calculate_major_axis)
+        if major_axis == 0:
+            return 0
+        enclosing_circle_area = (major_axis / 2) ** 2 * np.pi
+        return area / enclosing_circle_area
 
-    def _calculate_area(self) -> None:
-        self._area = np.pi * self._radius_x * self._radius_y
+    def _calculate_area(self) -> float:
+        return np.pi * self._radius_x * self._radius_y
 
-    def _calculate_convex_hull_area(self) -> None:
-        if not self._area:
-            self._calculate_area()
-        self._convex_hull_area = self._area
+    def _calculate_convex_hull_area(self) -> float:
+        return self._feature("area", self._calculate_area)
 
-    def _calculate_minor_axis(self) -> None:
-        self._minor_axis = min(self._radius_x, self._radius_y) * 2
+    def _calculate_minor_axis(self) -> float:
+        return min(self._radius_x, self._radius_y) * 2
 
-    def _calculate_major_axis(self) -> None:
-        self._major_axis = max(self._radius_x, self._radius_y) * 2
+    def _calculate_major_axis(self) -> float:
+        return max(self._radius_x, self._radius_y) * 2
 
-    def _calculate_average_diameter(self) -> None:
-        self._average_diameter = (self._radius_x * 2 + self._radius_y * 2) / 2
+    def _calculate_average_diameter(self) -> float:
+        return (self._radius_x * 2 + self._radius_y * 2) / 2
 
-    def _calculate_aspect_ratio(self) -> None:
+    def _calculate_aspect_ratio(self) -> float:
         if self._radius_x == self._radius_y:
-            self._aspect_ratio = 1.0
+            return 1.0
         elif self._radius_x > self._radius_y:
-            self._aspect_ratio = self._radius_y / self._radius_x
+            return self._radius_y / self._radius_x
         else:
-            self._aspect_ratio = self._radius_x / self._radius_y
+            return self._radius_x / self._radius_y
 
     def __eq__(self, other):
         if self.radius_x != other.radius_x:
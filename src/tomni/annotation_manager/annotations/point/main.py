@@ -3,5 +3,7 @@ from dataclasses import dataclass
 
 @dataclass
 class Point:
+    __slots__ = ("x", "y")
+
     x: int
     y: int
@@ -1,3 +1,4 @@
+from dataclasses import asdict
 from unittest import TestCase
 
 from tomni.annotation_manager.annotations.point import Point
@@ -21,3 +22,9 @@ class TestPointCompare(TestCase):
         point2 = Point(2, 1)
 
         self.assertFalse(point1 == point2)
+
+    def test_slots(self):
+        point = Point(1, 2)
+
+        self.assertFalse(hasattr(point, "__dict__"))
+        self.assertEqual(asdict(point), {"x": 1, "y": 2})
@@ -1,5 +1,5 @@
 from dataclasses import asdict
-from typing import List, Tuple, Union, Dict
+from typing import List, Tuple, Union
 import cv2
 import numpy as np
 
@@ -7,17 +7,27 @@ from tomni.annotation_manager.annotations.annotation import Annotation
 from tomni.annotation_manager.annotations.point import Point
 from tomni.annotation_manager.utils import (
     are_lines_equal,
+    parse_contour_to_points,
     parse_points_to_contour,
-    overlap_object,
+    overlap_matrix,
     parse_points_to_inner_contour,
+    simplify_rings,
 )
 
 MIN_NR_POINTS_POLYGON = 5
 
-from ...utils import compress_polygon_points, parse_points_to_contour
+from ...utils import parse_points_to_contour
 
 
 class Polygon(Annotation):
+    __slots__ = (
+        "_points",
+        "_inner_points",
+        "_outer_contour",
+        "_inner_contour_list",
+        "_feature_multiplier",
+    )
+
     def __init__(
         self,
         points: List[Point],
@@ -30,6 +40,7 @@ class Polygon(Annotation):
         accuracy: float = 1,
     ):
         """Initializes a Polygon object.
+        The contours are only created from the points when they are needed, e.g. for features or masks.
 
         Args:
             points (List[Point]): Collection of edges describing the polygon.
@@ -44,39 +55,105 @@ class Polygon(Annotation):
             metric_unit (str, optional): A suffix added to the name of the feature in the dict. Defaults to "".
             feature_multiplier (int, optional): Pixel density of the image. Defaults to 1.
         """
+        if len(points) < 5:
+            raise ValueError("Polygon must have atleast 5 points.")
         super().__init__(id, label, children, parents, accuracy)
         self._points = points
         self._inner_points = inner_points
-        if len(self._points) < 5:
-            raise ValueError("Polygon must have atleast 5 points.")
-        self._contour: np.ndarray = parse_points_to_contour(points)
-        self._inner_contours: List[np.ndarray] = parse_points_to_inner_contour(
-            inner_points
-        )
+        self._outer_contour: Union[np.ndarray, None] = None
+        self._inner_contour_list: Union[List[np.ndarray], None] = None
         self._feature_multiplier = feature_multiplier
 
-        self._area: Union[float, None] = None
-        self._outer_area: Union[float, None] = None
-        self._aspect_ratio: Union[float, None] = None
-        self._average_diameter: Union[float, None] = None
-        self._circularity: Union[float, None] = None
-        self._convex_hull_area: Union[float, None] = None
-        self._major_axis: Union[float, None] = None
-        self._minor_axis: Union[float, None] = None
-        self._perimeter: Union[float, None] = None
-        self._roundness: Union[float, None] = None
-
-        self._all_features = {
-            "area": {"is_ratio": False},
-            "aspect_ratio": {"is_ratio": True},
-            "average_diameter": {"is_ratio": False},
-            "circularity": {"is_ratio": True},
-            "convex_hull_area": {"is_ratio": False},
-            "major_axis": {"is_ratio": False},
-            "minor_axis": {"is_ratio": False},
-            "perimeter": {"is_ratio": False},
-            "roundness": {"is_ratio": True},
-        }
+    @classmethod
+    def _from_store(cls, store, row: int) -> "Polygon":
+        """Creates a Polygon that is a view on a row of an AnnotationStore.
+        The contours share the store's vertex buffer and points are only created when accessed.
+
+        Args:
+            store (AnnotationStore): The store that holds the polygon's geometry.
+            row (int): Index of the polygon in the store.
+
+        Returns:
+            Polygon: A polygon backed by the store.
+        """
+        polygon = cls.__new__(cls)
+        Annotation.__init__(
+            polygon,
+            id=store.ids[row],
+            label=store.label(row),
+            children=store.children[row],
+            parents=store.parents[row],
+            accuracy=float(store.accuracy[row]),
+        )
+        polygon._points = None
+        polygon._inner_points = None
+        polygon._outer_contour = store.outer_contour(row)
+        polygon._inner_contour_list = store.inner_contours(row)
+        polygon._feature_multiplier = 1
+        return polygon
+
+    @classmethod
+    def _from_contours(
+        cls,
+        contour: np.ndarray,
+        inner_contours: List[np.ndarray],
+        id: str,
+        label: str = "",
+    ) -> "Polygon":
+        """Creates a Polygon from OpenCV contours, e.g. from cv2.findContours.
+        The contours are used as they are and points are only created when accessed.
+
+        Args:
+            contour (np.ndarray): The outer contour of shape (N, 1, 2) with dtype np.int32.
+            inner_contours (List[np.ndarray]): The contours of the holes.
+            id (str): UUID identifier.
+            label (str, optional): Class label of annotation. Defaults to "".
+
+        Returns:
+            Polygon: A polygon with the contours.
+        """
+        polygon = cls.__new__(cls)
+        Annotation.__init__(
+            polygon, id=id, label=label, children=[], parents=[], accuracy=1
+        )
+        polygon._points = None
+        polygon._inner_points = None
+        polygon._outer_contour = contour
+        polygon._inner_contour_list = inner_contours
+        polygon._feature_multiplier = 1
+        return polygon
+
+    @property
+    def _contour(self) -> np.ndarray:
+        """Outer contour as OpenCV contour of shape (N, 1, 2), created from the points on first access."""
+        if self._outer_contour is None:
+            self._outer_contour = parse_points_to_contour(self._points)
+        return self._outer_contour
+
+    @property
+    def _inner_contours(self) -> List[np.ndarray]:
+        """Inner contours as OpenCV contours, created from the inner points on first access."""
+        if self._inner_contour_list is None:
+            self._inner_contour_list = parse_points_to_inner_contour(self._inner_points)
+        return self._inner_contour_list
+
+    def _rings(self) -> List[np.ndarray]:
+        """The outer ring followed by the inner rings, as float arrays of shape (N, 2).
+        The contours are used when the points were never created, e.g. for polygons of a store.
+        Outer and inner points are created separately, so either can be missing.
+        """
+        if self._points is None:
+            rings = [self._contour.reshape(-1, 2).astype(np.float64)]
+        else:
+            rings = [_points_to_ring(self._points)]
+        if self._inner_points is None:
+            rings.extend(
+                contour.reshape(-1, 2).astype(np.float64)
+                for contour in self._inner_contours
+            )
+        else:
+            rings.extend(_points_to_ring(points) for points in self._inner_points)
+        return rings
 
     @property
     def accuracy(self) -> float:
@@ -97,6 +174,8 @@ class Polygon(Annotation):
 
     @property
     def points(self) -> List[Point]:
+        if self._points is None:
+            self._points = parse_contour_to_points(self._contour)
         return self._points
 
     @points.setter
@@ -105,6 +184,11 @@ class Polygon(Annotation):
 
     @property
     def inner_points(self) -> List[List[Point]]:
+        if self._inner_points is None:
+            self._inner_points = [
+                parse_contour_to_points(inner_contour)
+                for inner_contour in self._inner_contours
+            ]
         return self._inner_points
 
     @inner_points.setter
@@ -119,9 +203,7 @@ class Polygon(Annotation):
         Returns:
             Union[float, None]: Polygon's area or None.
         """
-        if self._area is None:
-            self._calculate_area()
-        return self._area * self._feature_multiplier**2
+        return self._feature("area", self._calculate_area) * self._feature_multiplier**2
 
     @property
     def circularity(self) -> Union[float, None]:
@@ -130,10 +212,7 @@ class Polygon(Annotation):
         Returns:
             Union[float, None]: Circularity in [0, 1] or None.
         """
-
-        if self._circularity is None:
-            self._calculate_circularity()
-        return self._circularity
+        return self._feature("circularity", self._calculate_circularity)
 
     @property
     def convex_hull_area(self) -> Union[float, None]:
@@ -142,10 +221,10 @@ class Polygon(Annotation):
         Returns:
             Union[float, None]: Polygon's convex hull area or None.
         """
-
-        if self._convex_hull_area is None:
-            self._calculate_convex_hull_area()
-        return self._convex_hull_area * self._feature_multiplier**2
+        return (
+            self._feature("convex_hull_area", self._calculate_convex_hull_area)
+            * self._feature_multiplier**2
+        )
 
     @property
     def average_diameter(self) -> float:
@@ -154,9 +233,10 @@ class Polygon(Annotation):
         Returns:
             float: Average diameter.
         """
-        if self._average_diameter is None:
-            self._calculate_average_diameter()
-        return self._average_diameter * self._feature_multiplier
+        return (
+            self._feature("average_diameter", self._calculate_average_diameter)
+            * self._feature_multiplier
+        )
 
     @property
     def minor_axis(self) -> float:
@@ -165,9 +245,9 @@ class Polygon(Annotation):
         Returns:
             float: Minor axis length.
         """
-        if self._minor_axis is None:
-            self._calculate_axes()
-        return self._minor_axis * self._feature_multiplier
+        return (
+            self._feature("_axes", self._calculate_axes)[0] * self._feature_multiplier
+        )
 
     @property
     def major_axis(self) -> float:
@@ -176,9 +256,9 @@ class Polygon(Annotation):
         Returns:
             float: major axis length.
         """
-        if self._major_axis is None:
-            self._calculate_axes()
-        return self._major_axis * self._feature_multiplier
+        return (
+            self._feature("_axes", self._calculate_axes)[1] * self._feature_multiplier
+        )
 
     @property
     def aspect_ratio(self) -> float:
@@ -187,9 +267,7 @@ class Polygon(Annotation):
         Returns:
             float: Ellipse's aspect ratio.
         """
-        if self._aspect_ratio is None:
-            self._calculate_aspect_ratio()
-        return self._aspect_ratio
+        return self._feature("aspect_ratio", self._calculate_aspect_ratio)
 
     @property
     def perimeter(self) -> Union[float, None]:
@@ -198,10 +276,10 @@ class Polygon(Annotation):
         Returns:
             Union[float, None]: Polygon's perimeter or None.
         """
-
-        if self._perimeter is None:
-            self._calculate_perimeter()
-        return self._perimeter * self._feature_multiplier
+        return (
+            self._feature("perimeter", self._calculate_perimeter)
+            * self._feature_multiplier
+        )
 
     @property
     def roundness(self) -> Union[float, None]:
@@ -210,10 +288,7 @@ class Polygon(Annotation):
         Returns:
             Union[float, None]: Polygon's roundness in [0, 1] or None.
         """
-
-        if self._roundness is None:
-            self._calculate_roundness()
-        return self._roundness
+        return self._feature("roundness", self._calculate_roundness)
 
     def to_dict(
         self,
@@ -251,22 +326,15 @@ class Polygon(Annotation):
                     f"The following features are not compatible with the Annotation Manager: {', '.join(missing_features)}"
                 )
 
-        points = self._points.copy()
-        inner_points = self._inner_points.copy()
         if kwargs.get("do_compress", False):
-            points = compress_polygon_points(
-                points,
+            points, *inner_points = compress_rings(
+                self._rings(),
                 kwargs.get("epsilon", 3),
-                min_number_of_points=MIN_NR_POINTS_POLYGON,
+                kwargs.get("max_vertices"),
             )
-            inner_points = [
-                compress_polygon_points(
-                    inner_polygon,
-                    kwargs.get("epsilon", 3),
-                    min_number_of_points=MIN_NR_POINTS_POLYGON,
-                )
-                for inner_polygon in inner_points
-            ]
+        else:
+            points = self.points.copy()
+            inner_points = self.inner_points.copy()
 
         inner_polygons = []
         for inner_polygon in inner_points:
@@ -301,13 +369,17 @@ class Polygon(Annotation):
         dict_return_value = {**super_dict, **polygon_dict}
         return dict_return_value
 
-    def is_in_mask(self, mask_json: List[dict], min_overlap: float = 0.9):
+    def is_in_mask(
+        self, mask_json: List[dict], min_overlap: float = 0.9, backend: str = "shapely"
+    ):
         """Check if a polygon is within a binary mask.
 
         Args:
             mask_json (List[dict]): A list of dict masks in AxionBio dict format.
             min_overlap (float, optional): Minimum overlap required between the polygon a mask, expressed as a value between 0 and 1.
             Defaults to 0.9.
+            backend (str, optional): "shapely" intersects the shapes, "raster" counts the shared pixels, see `overlap_matrix`.
+                Defaults to "shapely".
 
         Returns:
             bool: True if the polygon is within a mask and meets the required overlap, False otherwise.
@@ -318,12 +390,13 @@ class Polygon(Annotation):
         json_points = [{"x": point.x, "y": point.y} for point in self.points]
         json_object = {"type": "polygon", "points": json_points}
 
-        for mask in mask_json:
-            overlap_ratio = overlap_object(json_object, mask)
-            if overlap_ratio >= min_overlap:
-                return True
+        if len(mask_json) == 0:
+            return False
 
-        return False
+        return (
+            overlap_matrix([json_object], mask_json, backend=backend).max()
+            >= min_overlap
+        )
 
     def to_binary_mask(self, shape: Tuple[int, int]) -> np.ndarray:
         """Transform a polygon to a binary mask.
@@ -335,71 +408,56 @@ class Polygon(Annotation):
             np.ndarray: A binary mask in [0, 1].
         """
         mask = np.zeros(shape, dtype=np.uint8)
-        if len(self._points) > 0:
-            points = np.array(
-                [[point.x, point.y] for point in self._points], dtype=np.int32
-            )
-            cv2.fillPoly(mask, [points], color=1)
+        if len(self._contour) > 0:
+            cv2.fillPoly(mask, [self._contour], color=1)
 
-        if self._inner_points:
+        if self._inner_contours:
             mask_inner = np.zeros(shape, dtype=np.uint8)
-            for inner_polygon in self._inner_points:
-                points = np.array(
-                    [[point.x, point.y] for point in inner_polygon], dtype=np.int32
-                )
-                cv2.fillPoly(mask_inner, [points], color=1)
+            for inner_contour in self._inner_contours:
+                cv2.fillPoly(mask_inner, [inner_contour], color=1)
             mask = mask - mask_inner
 
         return mask
 
-    def _calculate_area(self) -> None:
-        # outer area for calculating circularity f.e.
-        self._outer_area = cv2.contourArea(self._contour)
-        self._area = self._outer_area
-        for inner_contour in self._inner_contours:
-            area_inner = cv2.contourArea(inner_contour)
-            self._area -= area_inner
-
-    def _calculate_circularity(self):
-        if not self._outer_area:
-            self._calculate_area()
+    def _calculate_outer_area(self) -> float:
+        return cv2.contourArea(self._contour)
 
-        if not self._perimeter:
-            self._calculate_perimeter()
+    def _calculate_area(self) -> float:
+        area = self._feature("_outer_area", self._calculate_outer_area)
+        for inner_contour in self._inner_contours:
+            area -= cv2.contourArea(inner_contour)
+        return area
 
-        self._circularity = (4 * np.pi * self._outer_area) / (self._perimeter**2)
+    def _calculate_circularity(self) -> float:
+        outer_area = self._feature("_outer_area", self._calculate_outer_area)
+        perimeter = self._feature("perimeter", self._calculate_perimeter)
+        return (4 * np.pi * outer_area) / (perimeter**2)
 
-    def _calculate_convex_hull_area(self) -> None:
+    def _calculate_convex_hull_area(self) -> float:
         convex_hull = cv2.convexHull(self._contour)
-        self._convex_hull_area = cv2.contourArea(convex_hull)
-
-    def _calculate_perimeter(self) -> None:
-        self._perimeter = cv2.arcLength(self._contour, True)
+        return cv2.contourArea(convex_hull)
 
-    def _calculate_roundness(self) -> None:
-        if not self._outer_area:
-            self._calculate_area()
+    def _calculate_perimeter(self) -> float:
+        return cv2.arcLength(self._contour, True)
 
+    def _calculate_roundness(self) -> float:
+        outer_area = self._feature("_outer_area", self._calculate_outer_area)
         _, radius = cv2.minEnclosingCircle(self._contour)
         enclosing_circle_area = radius**2 * np.pi
-        self._roundness = self._outer_area / enclosing_circle_area
+        return outer_area / enclosing_circle_area
 
-    def _calculate_axes(self) -> None:
+    def _calculate_axes(self) -> Tuple[float, float]:
+        """Minor and major axis of the fitted ellipse."""
         _, (diameter_1, diameter_2), _ = cv2.fitEllipse(self._contour)
-        self._minor_axis = min(diameter_1, diameter_2)
-        self._major_axis = max(diameter_1, diameter_2)
-
-    def _calculate_average_diameter(self) -> None:
-        if self._minor_axis is None or self._major_axis is None:
-            self._calculate_axes()
+        return min(diameter_1, diameter_2), max(diameter_1, diameter_2)
 
-        self._average_diameter = (self._major_axis + self._minor_axis) / 2
+    def _calculate_average_diameter(self) -> float:
+        minor_axis, major_axis = self._feature("_axes", self._calculate_axes)
+        return (major_axis + minor_axis) / 2
 
-    def _calculate_aspect_ratio(self) -> None:
-        if self._minor_axis is None or self._major_axis is None:
-            self._calculate_axes()
-
-        self._aspect_ratio = self._minor_axis / self._major_axis
+    def _calculate_aspect_ratio(self) -> float:
+        minor_axis, major_axis = self._feature("_axes", self._calculate_axes)
+        return minor_axis / major_axis
 
     def __eq__(self, other):
         if not isinstance(other, Polygon):
@@ -407,9 +465,52 @@ class Polygon(Annotation):
             return False
 
         are_points_equal = are_lines_equal(self.points, other.points, is_enclosed=True)
-        reverse_points = other.points
-        reverse_points.reverse()
+        # Reverse a copy, the points of other are also used for its contour.
+        reverse_points = other.points[::-1]
         are_points_equal_mirrored = are_lines_equal(
             self.points, reverse_points, is_enclosed=True
         )
         return are_points_equal | are_points_equal_mirrored
+
+
+def _points_to_ring(points: List[Point]) -> np.ndarray:
+    ring = np.array([[point.x, point.y] for point in points], dtype=np.float64)
+    return ring.reshape(-1, 2)
+
+
+def compress_rings(
+    rings: List[np.ndarray],
+    epsilon: Union[float, None] = 3.0,
+    max_vertices: Union[int, None] = None,
+) -> List[List[Point]]:
+    """Compresses the rings of one or many polygons in one call of `simplify_rings`.
+
+    Args:
+        rings (List[np.ndarray]): Arrays of shape (N, 2) with the vertices of every ring.
+        epsilon (Union[float, None], optional): Epsilon value in Ramer-Douglas-Peucker algorithm, as in
+            `compress_polygon_points`. Defaults to 3.0.
+        max_vertices (Union[int, None], optional): The maximum number of vertices of every ring. Defaults to None.
+
+    Returns:
+        List[List[Point]]: The points of every compressed ring.
+    """
+    if not rings:
+        return []
+    ring_lengths = [len(ring) for ring in rings]
+    vertices = np.concatenate(rings).reshape(-1, 2)
+    ring_offsets = np.concatenate([[0], np.cumsum(ring_lengths)])
+    keep = simplify_rings(
+        vertices,
+        ring_offsets,
+        epsilon=epsilon,
+        max_vertices=max_vertices,
+        min_vertices=MIN_NR_POINTS_POLYGON,
+    )
+
+    ring_ids = np.repeat(np.arange(len(rings)), ring_lengths)[keep]
+    kept_offsets = np.searchsorted(ring_ids, np.arange(len(rings) + 1))
+    coordinates = vertices[keep].tolist()
+    return [
+        [Point(x, y) for x, y in coordinates[start:end]]
+        for start, end in zip(kept_offsets[:-1], kept_offsets[1:])
+    ]
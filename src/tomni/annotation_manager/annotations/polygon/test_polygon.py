@@ -1,6 +1,9 @@
 from dataclasses import asdict
 from unittest import TestCase
 
+import cv2
+import numpy as np
+
 from tomni.annotation_manager import Ellipse, Point, Polygon
 from tomni.annotation_manager.main import AnnotationManager
 
@@ -613,3 +616,42 @@ class TestPolygon(TestCase):
         )
         actual = donut_polygon.to_dict(features=["area"])
         self.assertDictEqual(expected, actual)
+
+    def test_contours_are_lazy(self):
+        polygon = Polygon(points=self.circular_points, id="1")
+
+        self.assertIsNone(polygon._outer_contour)
+        self.assertEqual(polygon.area, 14.0)
+        self.assertEqual(polygon._contour.shape, (len(self.circular_points), 1, 2))
+        self.assertEqual(polygon._inner_contours, [])
+
+    def test_compress_after_points_of_store_polygon(self):
+        mask = np.zeros((60, 60), dtype=np.uint8)
+        cv2.circle(mask, (30, 30), 20, 1, -1)
+        cv2.circle(mask, (30, 30), 8, 0, -1)
+        manager = AnnotationManager.from_binary_mask(mask, include_inner_contours=True)
+        expected = manager.to_dict(features=[], do_compress=True)
+
+        polygon = manager.annotations[0]
+        polygon.points
+
+        self.assertEqual(polygon.to_dict(features=[], do_compress=True), expected[0])
+        self.assertEqual(manager.to_dict(features=[], do_compress=True), expected)
+        self.assertEqual(
+            list(manager.iter_dicts(features=[], do_compress=True)), expected
+        )
+        self.assertEqual(len(expected[0]["inner_points"]), 1)
+
+    def test_slots(self):
+        polygon = Polygon(points=self.circular_points, id="1")
+        ellipse = Ellipse(radius_x=3, center=Point(5, 5), rotation=0, id="2")
+
+        self.assertFalse(hasattr(polygon, "__dict__"))
+        self.assertFalse(hasattr(ellipse, "__dict__"))
+        self.assertIs(polygon._all_features, ellipse._all_features)
+
+    def test_compare_keeps_points(self):
+        other = Polygon(points=list(self.circular_points), id="2")
+
+        self.assertEqual(self.circular_polygon, other)
+        self.assertEqual(other.points, self.circular_points)
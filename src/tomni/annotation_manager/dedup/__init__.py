@@ -0,0 +1 @@
+from .main import duplicate_rows, suppressed_rows
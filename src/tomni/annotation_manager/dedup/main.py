@@ -0,0 +1,122 @@
+from typing import Sequence, Union
+
+import numpy as np
+
+from tomni.annotation_manager.annotations import Annotation, Polygon
+from tomni.annotation_manager.features import calculate_features
+from tomni.annotation_manager.spatial import iou_pairs, store_geometries
+from tomni.annotation_manager.store import AnnotationStore
+
+
+def duplicate_rows(
+    store: AnnotationStore,
+    iou_threshold: Union[float, None] = None,
+    annotations: Union[Sequence[Annotation], None] = None,
+) -> np.ndarray:
+    """Finds the annotations that duplicate an earlier annotation of the store.
+
+    Exact duplicates have the same canonical geometry hash, see `canonical_geometry_hashes`.
+    With an `iou_threshold` also near duplicates are found: candidate pairs come from an STRtree query,
+    so only annotations with overlapping geometries are compared.
+
+    Args:
+        store (AnnotationStore): The annotations.
+        iou_threshold (Union[float, None], optional): Annotations whose intersection over union with an earlier,
+            kept annotation is at least this value are duplicates. Defaults to None, which only finds exact duplicates.
+        annotations (Union[Sequence[Annotation], None], optional): The annotations of the rows of the store.
+            When given, annotations with the same hash are only exact duplicates when they are equal with `__eq__`,
+            e.g. for polygons with non-integral points that the store truncates. Defaults to None.
+
+    Returns:
+        np.ndarray: Boolean array, True for every annotation that duplicates an earlier annotation.
+
+    Note:
+        - The first annotation of a group of duplicates is kept, whatever its label or accuracy.
+        - The intersection over union uses the outer contours, as `is_in_mask` does.
+    """
+    hashes = calculate_features(store, ["_canonical_hash"])["_canonical_hash"]
+    _, first_rows, counts = np.unique(hashes, return_index=True, return_counts=True)
+    is_duplicate = np.ones(len(store), dtype=bool)
+    is_duplicate[first_rows] = False
+    if annotations is not None and np.any(counts > 1):
+        is_duplicate = _confirm_exact_duplicates(hashes, is_duplicate, annotations)
+
+    if iou_threshold is not None:
+        rows = np.flatnonzero(~is_duplicate)
+        first, second, ious = iou_pairs(
+            store_geometries(store.take(rows)), min_iou=iou_threshold
+        )
+        is_match = ious >= iou_threshold
+        is_duplicate[rows] = _suppress(
+            first[is_match], second[is_match], np.arange(len(rows))
+        )
+    return is_duplicate
+
+
+def _confirm_exact_duplicates(
+    hashes: np.ndarray, is_duplicate: np.ndarray, annotations: Sequence[Annotation]
+) -> np.ndarray:
+    """Only keeps the rows marked as duplicate that equal an earlier kept annotation with the same hash."""
+    is_duplicate = is_duplicate.copy()
+    kept_rows = {}
+    for row, geometry_hash in enumerate(hashes.tolist()):
+        group = kept_rows.setdefault(geometry_hash, [])
+        if is_duplicate[row] and not any(
+            _is_same_geometry(annotations[kept], annotations[row]) for kept in group
+        ):
+            is_duplicate[row] = False
+        if not is_duplicate[row]:
+            group.append(row)
+    return is_duplicate
+
+
+def _is_same_geometry(annotation: Annotation, other: Annotation) -> bool:
+    """Compares a polygon or ellipse with `__eq__`, which is only defined between annotations of the same kind."""
+    if isinstance(annotation, Polygon) != isinstance(other, Polygon):
+        return False
+    return bool(annotation == other)
+
+
+def suppressed_rows(
+    store: AnnotationStore, scores: np.ndarray, iou_threshold: float
+) -> np.ndarray:
+    """Non-maximum suppression: finds the annotations that overlap too much with an annotation with a higher score.
+
+    Annotations are visited from the highest to the lowest score and an annotation is suppressed when its
+    intersection over union with an annotation that is kept is above `iou_threshold`.
+    Candidate pairs come from an STRtree query, so only annotations with overlapping geometries are compared.
+
+    Args:
+        store (AnnotationStore): The annotations, polygons and ellipses together.
+        scores (np.ndarray): The score of every annotation, e.g. the accuracy. Ties are won by the earlier annotation.
+        iou_threshold (float): Annotations with a higher intersection over union are suppressed.
+
+    Returns:
+        np.ndarray: Boolean array, True for every suppressed annotation.
+
+    Note:
+        The intersection over union uses the outer contours, as `is_in_mask` does.
+    """
+    ranks = np.empty(len(store), dtype=np.int64)
+    # Annotations without a score come last.
+    ranks[np.argsort(-np.nan_to_num(scores, nan=-np.inf), kind="stable")] = np.arange(
+        len(store)
+    )
+    first, second, ious = iou_pairs(store_geometries(store), min_iou=iou_threshold)
+    is_match = ious > iou_threshold
+    return _suppress(first[is_match], second[is_match], ranks)
+
+
+def _suppress(first: np.ndarray, second: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """Greedily suppresses the annotation with the highest rank of every matching pair,
+    unless the other annotation of the pair is suppressed itself.
+    """
+    is_suppressed = np.zeros(len(ranks), dtype=bool)
+    winners = np.where(ranks[first] < ranks[second], first, second)
+    losers = np.where(ranks[first] < ranks[second], second, first)
+
+    # Whether an annotation is suppressed is final before it is compared with annotations of a higher rank.
+    for idx in np.argsort(ranks[losers], kind="stable").tolist():
+        if not is_suppressed[winners[idx]]:
+            is_suppressed[losers[idx]] = True
+    return is_suppressed
@@ -0,0 +1,89 @@
+from unittest import TestCase
+
+import numpy as np
+
+from tomni.annotation_manager.annotations import Ellipse, Point, Polygon
+from tomni.annotation_manager.store import AnnotationStore
+
+from .main import duplicate_rows, suppressed_rows
+
+
+class TestDuplicateRows(TestCase):
+    def setUp(self) -> None:
+        square = [Point(0, 0), Point(10, 0), Point(20, 0), Point(20, 20), Point(0, 20)]
+        self.store = AnnotationStore.from_annotations(
+            [
+                Polygon(points=square, id="a"),
+                Ellipse(center=Point(50, 50), radius_x=10, rotation=0, id="b"),
+                Polygon(points=square[::-1], id="c"),
+                Ellipse(center=Point(51, 50), radius_x=10, rotation=0, id="d"),
+                Ellipse(center=Point(52, 50), radius_x=10, rotation=0, id="e"),
+                Polygon(
+                    points=[
+                        Point(x + 1, y)
+                        for x, y in [(0, 0), (10, 0), (20, 0), (20, 20), (0, 20)]
+                    ],
+                    id="f",
+                ),
+            ]
+        )
+
+    def test_exact_duplicates(self):
+        np.testing.assert_array_equal(
+            duplicate_rows(self.store), [False, False, True, False, False, False]
+        )
+
+    def test_near_duplicates(self):
+        # "e" overlaps enough with "d", but "d" is a duplicate of "b" and is not kept.
+        np.testing.assert_array_equal(
+            duplicate_rows(self.store, iou_threshold=0.85),
+            [False, False, True, True, False, True],
+        )
+
+    def test_empty_store(self):
+        self.assertEqual(len(duplicate_rows(AnnotationStore.empty(), 0.5)), 0)
+
+
+class TestSuppressedRows(TestCase):
+    def setUp(self) -> None:
+        self.store = AnnotationStore.from_annotations(
+            [
+                Ellipse(center=Point(50, 50), radius_x=10, rotation=0, id="a"),
+                Ellipse(center=Point(52, 50), radius_x=10, rotation=0, id="b"),
+                Ellipse(center=Point(54, 50), radius_x=10, rotation=0, id="c"),
+                Polygon(
+                    points=[
+                        Point(x, y) for x, y in [(0, 0), (8, 0), (8, 8), (4, 8), (0, 8)]
+                    ],
+                    id="d",
+                ),
+                Polygon(
+                    points=[
+                        Point(x, y) for x, y in [(1, 0), (9, 0), (9, 8), (5, 8), (1, 8)]
+                    ],
+                    id="e",
+                ),
+            ]
+        )
+
+    def test_highest_score_is_kept(self):
+        actual = suppressed_rows(
+            self.store, np.array([0.5, 0.9, 0.7, 0.6, 0.8]), iou_threshold=0.6
+        )
+
+        np.testing.assert_array_equal(actual, [True, False, True, True, False])
+
+    def test_suppressed_annotations_do_not_suppress(self):
+        # "a" and "c" only overlap enough with "b", which is suppressed by "a".
+        actual = suppressed_rows(
+            self.store, np.array([0.9, 0.8, 0.7, 0.6, 0.5]), iou_threshold=0.7
+        )
+
+        np.testing.assert_array_equal(actual, [False, True, False, False, True])
+
+    def test_ties_and_missing_scores(self):
+        actual = suppressed_rows(
+            self.store, np.array([np.nan, 0.5, 0.5, 1, 1]), iou_threshold=0.7
+        )
+
+        np.testing.assert_array_equal(actual, [True, False, True, False, True])
@@ -0,0 +1 @@
+from .main import FeatureCache, canonical_geometry_hashes, geometry_hashes
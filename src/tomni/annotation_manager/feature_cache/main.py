@@ -0,0 +1,315 @@
+import os
+import sqlite3
+import threading
+import time
+from hashlib import blake2b
+from typing import Dict, Sequence, Tuple, Union
+
+import numpy as np
+
+from tomni.annotation_manager.store import POLYGON, AnnotationStore
+from tomni.annotation_manager.store.main import concatenated_ranges
+
+DEFAULT_MAX_ENTRIES = 1_000_000
+HASH_SIZE = 16
+
+
+def geometry_hashes(store: AnnotationStore) -> np.ndarray:
+    """Hashes the geometry of every annotation: the vertices of all rings of a polygon or the parameters of an ellipse.
+    Annotations with the same geometry have the same hash, whatever their id, label or position in the store.
+
+    Args:
+        store (AnnotationStore): The annotations.
+
+    Returns:
+        np.ndarray: A 16 byte hash per annotation with dtype S16.
+    """
+    # Slices of one buffer are much faster than hashing numpy slices of every row.
+    vertices = memoryview(store.vertices.astype("<i4", copy=False).tobytes())
+    ring_lengths = memoryview(np.diff(store.ring_offsets).astype("<i8").tobytes())
+    ellipse_parameters = memoryview(
+        np.column_stack([store.centers, store.radii, store.rotations])
+        .astype("<f8")
+        .tobytes()
+    )
+    vertex_starts = store.ring_offsets[store.object_rings].tolist()
+
+    hashes = np.empty(len(store), dtype=f"S{HASH_SIZE}")
+    for row, (is_polygon, first_ring, end_ring) in enumerate(
+        zip(
+            (store.types == POLYGON).tolist(),
+            store.object_rings[:-1].tolist(),
+            store.object_rings[1:].tolist(),
+        )
+    ):
+        if is_polygon:
+            digest = blake2b(b"polygon", digest_size=HASH_SIZE)
+            digest.update(ring_lengths[first_ring * 8 : end_ring * 8])
+            digest.update(vertices[vertex_starts[row] * 8 : vertex_starts[row + 1] * 8])
+        else:
+            digest = blake2b(b"ellipse", digest_size=HASH_SIZE)
+            digest.update(ellipse_parameters[row * 40 : (row + 1) * 40])
+        hashes[row] = digest.digest()
+    return hashes
+
+
+def canonical_geometry_hashes(store: AnnotationStore) -> np.ndarray:
+    """Hashes the geometry of every annotation independent of how the geometry is written down.
+    Every ring starts at its top-left vertex and runs in the same direction, inner contours are sorted
+    and ellipses use a rotation in [0, 90) degrees. So a polygon with its points shifted or reversed
+    has the same hash, as `Polygon.__eq__` considers it equal.
+
+    Args:
+        store (AnnotationStore): The annotations.
+
+    Returns:
+        np.ndarray: A 16 byte hash per annotation with dtype S16.
+    """
+    return geometry_hashes(_canonical_store(store))
+
+
+class FeatureCache(object):
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """Initializes a FeatureCache: a persistent cache of feature values in pixel units,
+        keyed by the hash of the geometry of an annotation, so features survive reloading annotations.
+
+        The cache is an SQLite database with one entry per geometry that holds all its cached features.
+        When it holds more than `max_entries` geometries, the least recently used geometries are evicted.
+        Several processes can share a cache file.
+
+        Args:
+            path (Union[str, os.PathLike]): The database file, it is created if it does not exist.
+            max_entries (int, optional): The maximal number of geometries. Defaults to 1 million.
+        """
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        """A cache is pickled as its path, every process opens its own connection."""
+        return {"path": self.path, "max_entries": self.max_entries}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            with connection:
+                # Every entry has a float64 per feature position and a bit per position that is filled.
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "key BLOB PRIMARY KEY, filled INTEGER, feature_values BLOB, last_used REAL"
+                    ") WITHOUT ROWID"
+                )
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)"
+                )
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS positions (feature TEXT PRIMARY KEY, position INTEGER)"
+                )
+                connection.execute(
+                    "CREATE TEMP TABLE lookup (position INTEGER PRIMARY KEY, key BLOB)"
+                )
+            self._connection = connection
+        return self._connection
+
+    def get(
+        self, keys: np.ndarray, features: Sequence[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Looks up feature values, the geometries that are found are marked as recently used.
+
+        Args:
+            keys (np.ndarray): Geometry hashes, see `geometry_hashes`.
+            features (Sequence[str]): The names of the features.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The values with shape [len(keys), len(features)], NaN if not found,
+                and whether every value was found.
+        """
+        with self._lock, self._db as db:
+            values, found = self._select(db, keys, features)
+            db.execute(
+                "UPDATE entries SET last_used = ? WHERE key IN (SELECT key FROM lookup)",
+                (time.time(),),
+            )
+        return values, found
+
+    def put(
+        self, keys: np.ndarray, features: Sequence[str], values: np.ndarray
+    ) -> None:
+        """Stores feature values, next to the values that are already cached for the same geometries.
+        The least recently used geometries are evicted when the cache is full.
+
+        Args:
+            keys (np.ndarray): Geometry hashes, see `geometry_hashes`.
+            features (Sequence[str]): The names of the features.
+            values (np.ndarray): The values in pixel units with shape [len(keys), len(features)].
+        """
+        if len(keys) == 0:
+            return
+
+        with self._lock, self._db as db:
+            for feature in features:
+                db.execute(
+                    "INSERT OR IGNORE INTO positions "
+                    "SELECT ?, COUNT(*) FROM positions",
+                    (feature,),
+                )
+            positions = self._positions(db)
+            all_features = sorted(positions, key=positions.get)
+            merged, filled = self._select(db, keys, all_features)
+            columns = [positions[feature] for feature in features]
+            merged[:, columns] = values
+            filled[:, columns] = True
+
+            bits = (filled.astype(np.int64) << np.arange(len(all_features))).sum(axis=1)
+            db.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                zip(
+                    keys.tolist(),
+                    bits.tolist(),
+                    [row.tobytes() for row in merged.astype("<f8")],
+                    [time.time()] * len(keys),
+                ),
+            )
+            n_entries = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if n_entries > self.max_entries:
+                db.execute(
+                    "DELETE FROM entries WHERE key IN ("
+                    "SELECT key FROM entries ORDER BY last_used LIMIT ?)",
+                    (n_entries - self.max_entries,),
+                )
+
+    def clear(self) -> None:
+        """Removes all values from the cache."""
+        with self._lock, self._db as db:
+            db.execute("DELETE FROM entries")
+            db.execute("DELETE FROM positions")
+
+    def close(self) -> None:
+        """Closes the database connection, it is opened again when the cache is used."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @staticmethod
+    def _positions(db: sqlite3.Connection) -> Dict[str, int]:
+        return dict(db.execute("SELECT feature, position FROM positions").fetchall())
+
+    def _select(
+        self, db: sqlite3.Connection, keys: np.ndarray, features: Sequence[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Reads the values of keys into the lookup table, the caller holds the lock and the transaction."""
+        values = np.full((len(keys), len(features)), np.nan)
+        found = np.zeros((len(keys), len(features)), dtype=bool)
+        db.execute("DELETE FROM lookup")
+        db.executemany("INSERT INTO lookup VALUES (?, ?)", enumerate(keys.tolist()))
+        rows = db.execute(
+            "SELECT lookup.position, entries.filled, entries.feature_values FROM lookup "
+            "JOIN entries ON entries.key = lookup.key"
+        ).fetchall()
+        if not rows:
+            return values, found
+
+        positions = self._positions(db)
+        columns = np.array([positions.get(feature, -1) for feature in features])
+        is_known = columns >= 0
+        row_positions, filled, blobs = zip(*rows)
+        row_positions = np.array(row_positions, dtype=np.int64)
+        # Entries that were written before features were added are shorter, the filled bits mark the valid values.
+        width = max(max(map(len, blobs)), 8 * len(positions))
+        stored = np.frombuffer(
+            b"".join(blob.ljust(width, b"\x00") for blob in blobs), dtype="<f8"
+        ).reshape(len(blobs), -1)
+        is_filled = (
+            np.array(filled, dtype=np.int64)[:, None] >> np.maximum(columns, 0)
+        ) & 1
+
+        found[row_positions] = is_known & (is_filled == 1)
+        values[row_positions[:, None], np.flatnonzero(is_known)] = stored[
+            :, columns[is_known]
+        ]
+        values[~found] = np.nan
+        return values, found
+
+
+def _canonical_store(store: AnnotationStore) -> AnnotationStore:
+    """A copy of the store with canonical rings and ellipse parameters, for hashing only."""
+    ring_starts = store.ring_offsets[:-1]
+    ring_lengths = np.diff(store.ring_offsets)
+    ring_ids = np.repeat(np.arange(store.n_rings), ring_lengths)
+    local_idx = np.arange(len(store.vertices)) - ring_starts[ring_ids]
+    x = store.vertices[:, 0].astype(np.int64)
+    y = store.vertices[:, 1].astype(np.int64)
+
+    # Every ring starts at its first top-left vertex. Sorted by ring, ring r keeps its own range of positions.
+    has_vertices = ring_lengths > 0
+    first = np.zeros(store.n_rings, dtype=np.int64)
+    order = np.lexsort((local_idx, x, y, ring_ids))
+    first[has_vertices] = local_idx[order[ring_starts[has_vertices]]]
+
+    # Rings run in the direction with a positive area, flat rings continue to the smaller neighbour.
+    previous = np.arange(len(store.vertices)) - 1
+    previous[ring_starts[has_vertices]] = store.ring_offsets[1:][has_vertices] - 1
+    signed_areas = np.bincount(
+        ring_ids, weights=x[previous] * y - y[previous] * x, minlength=store.n_rings
+    )
+    is_reversed = signed_areas < 0
+    flat = np.flatnonzero((signed_areas == 0) & has_vertices)
+    next_vertex = ring_starts[flat] + (first[flat] + 1) % ring_lengths[flat]
+    previous_vertex = ring_starts[flat] + (first[flat] - 1) % ring_lengths[flat]
+    is_reversed[flat] = (y[previous_vertex] < y[next_vertex]) | (
+        (y[previous_vertex] == y[next_vertex]) & (x[previous_vertex] < x[next_vertex])
+    )
+    step = np.where(is_reversed, -1, 1)
+    canonical_idx = ring_starts[ring_ids] + (
+        (first[ring_ids] + step[ring_ids] * local_idx) % ring_lengths[ring_ids]
+    )
+    vertices = store.vertices[canonical_idx]
+
+    # The outer contour stays first, inner contours are sorted by their first vertex.
+    owners = np.repeat(np.arange(len(store)), np.diff(store.object_rings))
+    is_inner = np.arange(store.n_rings) != store.object_rings[:-1][owners]
+    first_vertex = np.zeros((store.n_rings, 2), dtype=np.int64)
+    first_vertex[has_vertices] = vertices[ring_starts[has_vertices]]
+    ring_order = np.lexsort(
+        (ring_lengths, first_vertex[:, 0], first_vertex[:, 1], is_inner, owners)
+    )
+    vertex_idx = concatenated_ranges(ring_starts[ring_order], ring_lengths[ring_order])
+
+    # Rotations of 90 degrees or more swap the radii, as in Ellipse, and circles have no rotation.
+    radii = store.radii.copy()
+    rotations = store.rotations % 180
+    is_swapped = rotations >= 90
+    radii[is_swapped] = radii[is_swapped][:, ::-1]
+    rotations[is_swapped] -= 90
+    rotations[radii[:, 0] == radii[:, 1]] = 0
+
+    return AnnotationStore(
+        types=store.types,
+        ids=store.ids,
+        label_codes=store.label_codes,
+        label_table=store.label_table,
+        accuracy=store.accuracy,
+        children=store.children,
+        parents=store.parents,
+        vertices=vertices[vertex_idx],
+        ring_offsets=np.concatenate([[0], np.cumsum(ring_lengths[ring_order])]),
+        object_rings=store.object_rings,
+        # Adding 0 turns -0.0 into 0.0, which has other bytes.
+        centers=store.centers + 0.0,
+        radii=radii + 0.0,
+        rotations=rotations + 0.0,
+    )
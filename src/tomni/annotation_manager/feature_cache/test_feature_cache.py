@@ -0,0 +1,175 @@
+import os
+import pickle
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+from tomni.annotation_manager.annotations import Ellipse, Point, Polygon
+from tomni.annotation_manager.features import FEATURES, calculate_features
+from tomni.annotation_manager.store import AnnotationStore
+
+from .main import FeatureCache, canonical_geometry_hashes, geometry_hashes
+
+
+def _polygon(offset: int, id: str) -> Polygon:
+    points = [(0, 0), (5, 0), (10, 0), (10, 10), (0, 10)]
+    return Polygon(
+        points=[Point(x + offset, y) for x, y in points],
+        inner_points=[
+            [Point(2, 2), Point(4, 2), Point(4, 4), Point(3, 4), Point(2, 4)]
+        ],
+        id=id,
+    )
+
+
+class TestGeometryHashes(TestCase):
+    def test_same_geometry_same_hash(self):
+        store = AnnotationStore.from_annotations(
+            [
+                _polygon(0, "a"),
+                _polygon(0, "b"),
+                _polygon(1, "c"),
+                Ellipse(center=Point(5, 5), radius_x=3, radius_y=2, rotation=0, id="d"),
+                Ellipse(center=Point(5, 5), radius_x=3, radius_y=2, rotation=0, id="e"),
+                Ellipse(center=Point(5, 5), radius_x=2, radius_y=3, rotation=0, id="f"),
+            ]
+        )
+
+        hashes = geometry_hashes(store)
+
+        self.assertEqual(hashes.dtype, np.dtype("S16"))
+        self.assertEqual(hashes[0], hashes[1])
+        self.assertEqual(hashes[3], hashes[4])
+        self.assertEqual(len(set(hashes[[0, 2, 3, 5]].tolist())), 4)
+
+    def test_canonical_hash(self):
+        points = [Point(0, 0), Point(5, 0), Point(10, 0), Point(10, 10), Point(0, 10)]
+        holes = [
+            [Point(2, 2), Point(4, 2), Point(4, 4), Point(2, 4)],
+            [Point(6, 6), Point(8, 6), Point(8, 8), Point(6, 8)],
+        ]
+        store = AnnotationStore.from_annotations(
+            [
+                Polygon(points=points, inner_points=holes, id="a"),
+                Polygon(
+                    points=points[3:] + points[:3],
+                    inner_points=[holes[1][::-1], holes[0][1:] + holes[0][:1]],
+                    id="b",
+                ),
+                Polygon(points=points[::-1], inner_points=holes[:1], id="c"),
+                Ellipse(center=Point(5, 5), radius_x=3, radius_y=2, rotation=0, id="d"),
+                Ellipse(
+                    center=Point(5, 5), radius_x=2, radius_y=3, rotation=90, id="e"
+                ),
+                Ellipse(
+                    center=Point(5, 5), radius_x=3, radius_y=3, rotation=40, id="f"
+                ),
+                Ellipse(center=Point(5, 5), radius_x=3, radius_y=3, rotation=0, id="g"),
+            ]
+        )
+
+        hashes = canonical_geometry_hashes(store)
+
+        self.assertEqual(hashes.dtype, np.dtype("S16"))
+        self.assertEqual(hashes[0], hashes[1])
+        self.assertEqual(hashes[3], hashes[4])
+        self.assertEqual(hashes[5], hashes[6])
+        self.assertEqual(len(set(hashes[[0, 2, 3, 5]].tolist())), 4)
+        self.assertEqual(len(canonical_geometry_hashes(AnnotationStore.empty())), 0)
+
+
+class TestFeatureCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "features.sqlite")
+        self.cache = FeatureCache(self.path)
+        self.keys = np.array([b"a" * 16, b"b" * 16, b"c" * 16], dtype="S16")
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_get_put(self):
+        self.cache.put(self.keys[:2], ["area"], np.array([[1.5], [np.nan]]))
+        self.cache.put(self.keys[1:], ["perimeter"], np.array([[2.0], [3.0]]))
+
+        values, found = self.cache.get(self.keys, ["perimeter", "area", "roundness"])
+
+        np.testing.assert_array_equal(
+            values, [[np.nan, 1.5, np.nan], [2, np.nan, np.nan], [3, np.nan, np.nan]]
+        )
+        np.testing.assert_array_equal(
+            found, [[False, True, False], [True, True, False], [True, False, False]]
+        )
+
+    def test_persistent(self):
+        self.cache.put(self.keys, ["area"], np.array([[1.0], [2.0], [3.0]]))
+        self.cache.close()
+
+        values, found = FeatureCache(self.path).get(self.keys, ["area"])
+
+        np.testing.assert_array_equal(values, [[1], [2], [3]])
+        self.assertTrue(found.all())
+
+    def test_least_recently_used_are_evicted(self):
+        cache = FeatureCache(self.path, max_entries=2)
+        cache.put(self.keys[:1], ["area"], np.array([[1.0]]))
+        cache.put(self.keys[1:2], ["area"], np.array([[2.0]]))
+        cache.get(self.keys[:1], ["area"])
+
+        cache.put(self.keys[2:], ["area"], np.array([[3.0]]))
+
+        _, found = cache.get(self.keys, ["area"])
+        np.testing.assert_array_equal(found, [[True], [False], [True]])
+        self.assertEqual(len(cache), 2)
+        cache.close()
+
+    def test_pickle(self):
+        self.cache.put(self.keys, ["area"], np.array([[1.0], [2.0], [3.0]]))
+
+        cache = pickle.loads(pickle.dumps(self.cache))
+
+        self.assertEqual(cache.max_entries, self.cache.max_entries)
+        self.assertEqual(len(cache), 3)
+        cache.close()
+
+    def test_calculate_features(self):
+        annotations = [
+            _polygon(0, "a"),
+            _polygon(3, "b"),
+            Ellipse(center=Point(5, 5), radius_x=3, radius_y=2, rotation=10, id="c"),
+        ]
+        expected = calculate_features(
+            AnnotationStore.from_annotations(annotations), list(FEATURES)
+        )
+
+        first = calculate_features(
+            AnnotationStore.from_annotations(annotations), list(FEATURES), self.cache
+        )
+        with patch("cv2.fitEllipse", side_effect=AssertionError("not cached")):
+            second = calculate_features(
+                AnnotationStore.from_annotations(annotations[::-1]),
+                list(FEATURES),
+                self.cache,
+            )
+
+        for feature in FEATURES:
+            np.testing.assert_array_equal(first[feature], expected[feature])
+            np.testing.assert_array_equal(second[feature], expected[feature][::-1])
+
+    def test_calculate_features_partly_cached(self):
+        store = AnnotationStore.from_annotations([_polygon(0, "a")])
+        calculate_features(store, ["area"], self.cache)
+        store = AnnotationStore.from_annotations([_polygon(0, "a"), _polygon(7, "b")])
+
+        actual = calculate_features(store, ["area", "major_axis"], self.cache)
+
+        expected = calculate_features(
+            AnnotationStore.from_annotations([_polygon(0, "a"), _polygon(7, "b")]),
+            ["area", "major_axis"],
+        )
+        for feature in ["area", "major_axis"]:
+            np.testing.assert_array_equal(actual[feature], expected[feature])
+        self.assertEqual(len(self.cache), 2)
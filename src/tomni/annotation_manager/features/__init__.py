@@ -0,0 +1,7 @@
+from .main import (
+    FEATURES,
+    calculate_features,
+    feature_name,
+    scale_feature,
+    validate_features,
+)
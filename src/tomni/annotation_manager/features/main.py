@@ -0,0 +1,277 @@
+from typing import Callable, Dict, List, Union
+
+import cv2
+import numpy as np
+
+from tomni.annotation_manager.annotations.annotation import FEATURES
+from tomni.annotation_manager.feature_cache import (
+    FeatureCache,
+    canonical_geometry_hashes,
+    geometry_hashes,
+)
+from tomni.annotation_manager.store import POLYGON, AnnotationStore
+
+# cv2.arcLength sums the segment lengths in reversed blocks of this size.
+ARC_LENGTH_BLOCK_SIZE = 16
+
+
+def validate_features(features: Union[List[str], None]) -> List[str]:
+    """Returns all features if `features` is None, otherwise checks that all features are known.
+
+    Args:
+        features (Union[List[str], None]): The requested features.
+
+    Raises:
+        ValueError: If any of the features is not supported.
+
+    Returns:
+        List[str]: The features to calculate.
+    """
+    if features is None:
+        return list(FEATURES.keys())
+
+    missing_features = set(features).difference(set(FEATURES.keys()))
+    if missing_features:
+        raise ValueError(
+            f"The following features are not compatible with the Annotation Manager: {', '.join(missing_features)}"
+        )
+    return list(features)
+
+
+def feature_name(feature: str, metric_unit: str = "") -> str:
+    """Name of a feature in AxionBio format, e.g. "area" with metric unit "um" becomes "areaUm"."""
+    name = feature if FEATURES[feature]["is_ratio"] else feature + "_" + metric_unit
+
+    # Convert snake_casing to camelCasing
+    first_word, *remaining_words = name.split("_")
+    return "".join([first_word.lower(), *map(str.title, remaining_words)])
+
+
+def scale_feature(
+    feature: str, values: np.ndarray, feature_multiplier: float = 1
+) -> np.ndarray:
+    """Converts a feature column from pixel units with the feature_multiplier, e.g. 1/742."""
+    dimension = FEATURES[feature]["dimension"]
+    if dimension == 0 or feature_multiplier == 1:
+        return values
+    return values * feature_multiplier**dimension
+
+
+def calculate_features(
+    store: AnnotationStore,
+    features: List[str],
+    cache: Union[FeatureCache, None] = None,
+) -> Dict[str, np.ndarray]:
+    """Calculates features for all annotations of a store at once.
+
+    Columns are in pixel units and are cached on the store, so every feature is calculated once.
+
+    Args:
+        store (AnnotationStore): The annotations.
+        features (List[str]): The features to calculate, see FEATURES.
+        cache (Union[FeatureCache, None], optional): A persistent cache, features of geometries that are in the cache
+            are not calculated again and new values are added to it. Defaults to None.
+
+    Returns:
+        Dict[str, np.ndarray]: For every feature a float64 column with a value per annotation.
+    """
+    if cache is not None:
+        _load_from_cache(store, features, cache)
+    return {feature: _column(store, feature) for feature in features}
+
+
+def _load_from_cache(
+    store: AnnotationStore, features: List[str], cache: FeatureCache
+) -> None:
+    """Fills the feature columns of a store from the cache and only calculates the missing values."""
+    missing_features = [
+        feature for feature in dict.fromkeys(features) if feature not in store.features
+    ]
+    if not missing_features:
+        return
+
+    keys = _column(store, "_geometry_hash")
+    values, found = cache.get(keys, missing_features)
+    rows = np.flatnonzero(~found.all(axis=1))
+    if len(rows) > 0:
+        # Only the annotations that miss a feature are calculated, together so they share intermediate columns.
+        uncached = store.take(rows)
+        for column, feature in enumerate(missing_features):
+            missing = ~found[rows, column]
+            values[rows[missing], column] = _column(uncached, feature)[missing]
+        cache.put(keys[rows], missing_features, values[rows])
+
+    for column, feature in enumerate(missing_features):
+        store.features[feature] = values[:, column].copy()
+
+
+def _column(store: AnnotationStore, name: str) -> np.ndarray:
+    if name not in store.features:
+        store.features[name] = _CALCULATORS[name](store)
+    return store.features[name]
+
+
+def _ring_ids(store: AnnotationStore) -> np.ndarray:
+    """Index of the ring that every vertex belongs to."""
+    return np.repeat(np.arange(store.n_rings), np.diff(store.ring_offsets))
+
+
+def _previous_vertices(store: AnnotationStore) -> np.ndarray:
+    """Index of the previous vertex in the same ring, the first vertex wraps to the last."""
+    previous = np.arange(len(store.vertices)) - 1
+    previous[store.ring_offsets[:-1]] = store.ring_offsets[1:] - 1
+    return previous
+
+
+def _ring_areas(store: AnnotationStore) -> np.ndarray:
+    """Segmented shoelace formula, equal to cv2.contourArea for every ring."""
+    vertices = store.vertices.astype(np.float64)
+    previous = vertices[_previous_vertices(store)]
+    cross = previous[:, 0] * vertices[:, 1] - previous[:, 1] * vertices[:, 0]
+    areas = np.bincount(_ring_ids(store), weights=cross, minlength=store.n_rings)
+    return np.abs(areas * 0.5)
+
+
+def _ring_perimeters(store: AnnotationStore) -> np.ndarray:
+    """Summed segment lengths of every closed ring, equal to cv2.arcLength."""
+    vertices = store.vertices.astype(np.float32)
+    deltas = vertices - vertices[_previous_vertices(store)]
+    lengths = np.sqrt(deltas[:, 0] * deltas[:, 0] + deltas[:, 1] * deltas[:, 1])
+
+    # Sum in the same order as cv2.arcLength, so the results are identical.
+    ring_ids = _ring_ids(store)
+    local_idx = np.arange(len(lengths)) - store.ring_offsets[:-1][ring_ids]
+    ring_lengths = np.diff(store.ring_offsets)[ring_ids]
+    block_start = local_idx - local_idx % ARC_LENGTH_BLOCK_SIZE
+    block_length = np.minimum(ARC_LENGTH_BLOCK_SIZE, ring_lengths - block_start)
+    order = np.empty(len(lengths), dtype=np.int64)
+    order[
+        store.ring_offsets[:-1][ring_ids]
+        + block_start
+        + block_length
+        - 1
+        - local_idx % ARC_LENGTH_BLOCK_SIZE
+    ] = np.arange(len(lengths))
+
+    return np.bincount(ring_ids[order], weights=lengths[order], minlength=store.n_rings)
+
+
+def _polygon_column(
+    store: AnnotationStore,
+    ellipse_values: np.ndarray,
+    polygon_function: Callable[[np.ndarray], float],
+) -> np.ndarray:
+    """Calls a cv2 function on the outer contour of every polygon and fills ellipses with `ellipse_values`."""
+    column = np.array(ellipse_values, dtype=np.float64)
+    for row in np.flatnonzero(store.types == POLYGON):
+        column[row] = polygon_function(store.ring(store.object_rings[row]))
+    return column
+
+
+def _outer_areas(store: AnnotationStore) -> np.ndarray:
+    column = np.pi * store.radii[:, 0] * store.radii[:, 1]
+    is_polygon = store.types == POLYGON
+    column[is_polygon] = _ring_areas(store)[store.object_rings[:-1][is_polygon]]
+    return column
+
+
+def _areas(store: AnnotationStore) -> np.ndarray:
+    # Outer rings count positive, inner rings are holes.
+    signed_ring_areas = -_ring_areas(store)
+    signed_ring_areas[store.object_rings[:-1][store.types == POLYGON]] *= -1
+    owners = np.repeat(np.arange(len(store)), np.diff(store.object_rings))
+    polygon_areas = np.bincount(owners, weights=signed_ring_areas, minlength=len(store))
+
+    column = _column(store, "_outer_area").copy()
+    is_polygon = store.types == POLYGON
+    column[is_polygon] = polygon_areas[is_polygon]
+    return column
+
+
+def _perimeters(store: AnnotationStore) -> np.ndarray:
+    column = 2 * np.pi * np.sqrt((store.radii[:, 0] ** 2 + store.radii[:, 1] ** 2) / 2)
+    is_polygon = store.types == POLYGON
+    column[is_polygon] = _ring_perimeters(store)[store.object_rings[:-1][is_polygon]]
+    return column
+
+
+def _circularities(store: AnnotationStore) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (
+            4 * np.pi * _column(store, "_outer_area") / _column(store, "perimeter") ** 2
+        )
+
+
+def _convex_hull_areas(store: AnnotationStore) -> np.ndarray:
+    return _polygon_column(
+        store,
+        _column(store, "_outer_area"),
+        lambda contour: cv2.contourArea(cv2.convexHull(contour)),
+    )
+
+
+def _roundnesses(store: AnnotationStore) -> np.ndarray:
+    # The major axis of the ellipses, polygons use their enclosing circle instead of a fitted ellipse.
+    major_axis = store.radii.max(axis=1) * 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ellipse_values = np.where(
+            major_axis == 0,
+            0,
+            _column(store, "_outer_area") / ((major_axis / 2) ** 2 * np.pi),
+        )
+    enclosing_radii = _polygon_column(
+        store, ellipse_values, lambda contour: cv2.minEnclosingCircle(contour)[1]
+    )
+
+    column = ellipse_values
+    is_polygon = store.types == POLYGON
+    with np.errstate(divide="ignore", invalid="ignore"):
+        column[is_polygon] = _column(store, "_outer_area")[is_polygon] / (
+            enclosing_radii[is_polygon] ** 2 * np.pi
+        )
+    return column
+
+
+def _fitted_axes(store: AnnotationStore) -> np.ndarray:
+    axes = np.sort(store.radii * 2, axis=1)
+    for row in np.flatnonzero(store.types == POLYGON):
+        _, diameters, _ = cv2.fitEllipse(store.ring(store.object_rings[row]))
+        axes[row] = sorted(diameters)
+    return axes
+
+
+def _minor_axes(store: AnnotationStore) -> np.ndarray:
+    return _column(store, "_axes")[:, 0]
+
+
+def _major_axes(store: AnnotationStore) -> np.ndarray:
+    return _column(store, "_axes")[:, 1]
+
+
+def _average_diameters(store: AnnotationStore) -> np.ndarray:
+    return (_column(store, "major_axis") + _column(store, "minor_axis")) / 2
+
+
+def _aspect_ratios(store: AnnotationStore) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        column = _column(store, "minor_axis") / _column(store, "major_axis")
+    is_circle = (store.types != POLYGON) & (store.radii[:, 0] == store.radii[:, 1])
+    column[is_circle] = 1.0
+    return column
+
+
+_CALCULATORS = {
+    "_axes": _fitted_axes,
+    "_canonical_hash": canonical_geometry_hashes,
+    "_geometry_hash": geometry_hashes,
+    "_outer_area": _outer_areas,
+    "area": _areas,
+    "aspect_ratio": _aspect_ratios,
+    "average_diameter": _average_diameters,
+    "circularity": _circularities,
+    "convex_hull_area": _convex_hull_areas,
+    "major_axis": _major_axes,
+    "minor_axis": _minor_axes,
+    "perimeter": _perimeters,
+    "roundness": _roundnesses,
+}
@@ -0,0 +1,102 @@
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from tomni.annotation_manager import AnnotationManager
+from tomni.annotation_manager.annotations import Ellipse, Point, Polygon
+from tomni.annotation_manager.store import AnnotationStore
+
+from .main import (
+    FEATURES,
+    calculate_features,
+    feature_name,
+    scale_feature,
+    validate_features,
+)
+
+
+class TestCalculateFeatures(TestCase):
+    def setUp(self) -> None:
+        mask = np.zeros((200, 200), dtype=np.uint8)
+        cv2.ellipse(mask, (50, 50), (30, 20), 30, 0, 360, 1, -1)
+        cv2.circle(mask, (50, 50), 5, 0, -1)
+        cv2.rectangle(mask, (120, 120), (180, 150), 1, -1)
+        cv2.fillPoly(mask, [np.array([[10, 150], [60, 190], [40, 120], [25, 170]])], 1)
+        polygons = AnnotationManager.from_binary_mask(
+            mask, include_inner_contours=True
+        ).annotations
+
+        self.annotations = polygons + [
+            Ellipse(radius_x=10, radius_y=4, center=Point(5, 5), rotation=20, id="1"),
+            Ellipse(radius_x=3, center=Point(5, 5), rotation=0, id="2"),
+            Ellipse(radius_x=0, radius_y=0, center=Point(5, 5), rotation=0, id="3"),
+        ]
+        self.store = AnnotationStore.from_annotations(self.annotations)
+
+    def test_equal_to_annotation_properties(self):
+        columns = calculate_features(self.store, list(FEATURES))
+
+        for feature, column in columns.items():
+            expected = [getattr(annotation, feature) for annotation in self.annotations]
+            np.testing.assert_allclose(column, expected, rtol=1e-12, err_msg=feature)
+
+    def test_area_subtracts_inner_contours(self):
+        polygon = Polygon(
+            points=[
+                Point(0, 0),
+                Point(5, 0),
+                Point(10, 0),
+                Point(10, 10),
+                Point(0, 10),
+            ],
+            inner_points=[
+                [Point(2, 2), Point(4, 2), Point(4, 4), Point(3, 4), Point(2, 4)]
+            ],
+            id="1",
+        )
+        store = AnnotationStore.from_annotations([polygon])
+
+        columns = calculate_features(store, ["area", "perimeter"])
+
+        np.testing.assert_array_equal(columns["area"], [96])
+        np.testing.assert_array_equal(columns["perimeter"], [40])
+
+    def test_columns_are_cached(self):
+        first = calculate_features(self.store, ["roundness"])["roundness"]
+        second = calculate_features(self.store, ["roundness"])["roundness"]
+
+        self.assertIs(first, second)
+        self.assertIn("_outer_area", self.store.features)
+        # Roundness does not fit ellipses to the polygons.
+        self.assertNotIn("_axes", self.store.features)
+
+    def test_cached_columns_follow_take(self):
+        calculate_features(self.store, ["area"])
+        subset = self.store.take([len(self.store) - 2])
+
+        np.testing.assert_array_equal(subset.features["area"], [np.pi * 9])
+
+    def test_empty_store(self):
+        columns = calculate_features(AnnotationStore.empty(), list(FEATURES))
+
+        for column in columns.values():
+            self.assertEqual(len(column), 0)
+
+    def test_validate_features(self):
+        self.assertEqual(validate_features(None), list(FEATURES))
+        self.assertEqual(validate_features(["area"]), ["area"])
+        with self.assertRaises(ValueError):
+            validate_features(["area", "volume"])
+
+    def test_feature_name(self):
+        self.assertEqual(feature_name("convex_hull_area", "um"), "convexHullAreaUm")
+        self.assertEqual(feature_name("aspect_ratio", "um"), "aspectRatio")
+        self.assertEqual(feature_name("area"), "area")
+
+    def test_scale_feature(self):
+        values = np.array([2.0, 4.0])
+
+        np.testing.assert_array_equal(scale_feature("area", values, 0.5), [0.5, 1.0])
+        np.testing.assert_array_equal(scale_feature("perimeter", values, 0.5), [1, 2])
+        np.testing.assert_array_equal(scale_feature("roundness", values, 0.5), values)
@@ -1,14 +1,54 @@
-import uuid
-from typing import Dict, List, Tuple, Union
+import io
+import operator
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    TextIO,
+    Tuple,
+    Union,
+)
 
 import cv2
 import numpy as np
 
 from tomni.annotation_manager.utils.contours2polygons import contours2polygons
+from tomni.annotation_manager.utils.dump_json import dump_json
+from tomni.annotation_manager.utils.find_label_objects import find_label_objects
+from tomni.annotation_manager.utils.load_json import load_json
+from tomni.annotation_manager.utils.tiled_contours import find_contours_tiled
+from tomni.make_mask.rasterize import label_dtype, overlap_order
+from tomni.mask_bands import find_contours_in_bands
 from .annotations import Annotation, Ellipse, Point, Polygon
-from .utils import parse_points_to_contour
+from .annotations.polygon.main import compress_rings
+from .dedup import duplicate_rows, suppressed_rows
+from .dedup.main import _is_same_geometry
+from .feature_cache import FeatureCache
+from .features import (
+    FEATURES,
+    calculate_features,
+    feature_name,
+    scale_feature,
+    validate_features,
+)
+from .serialization import load_store, save_store
+from .spatial import MaskIndex
+from .store import POLYGON, AnnotationStore
+from .summary import FeatureSummary
+from .summary.main import DEFAULT_PERCENTILES
+from .tracking import link_stores
 
 MIN_NR_POINTS_POLYGON = 5
+# Annotations per chunk of iter_dicts and write_json.
+DEFAULT_CHUNK_SIZE = 10000
 
 
 class AnnotationManager(object):
@@ -19,98 +59,120 @@ class AnnotationManager(object):
             annotations (List[Annotation]): Collection of annotations, e.g. polygon or ellipse.
         """
         self._annotations = annotations
+        self._store = None
+        # Copy of the annotations list when the store or id index was created from it, to notice in place changes of the list.
+        self._synced_annotations: Union[List[Annotation], None] = None
+        # Position of the first annotation with every id, created on first lookup.
+        self._id_index: Union[Dict[str, int], None] = None
+        # Opt-in persistent cache of feature values, see FeatureCache.
+        self.feature_cache: Union[FeatureCache, None] = None
+
+    @classmethod
+    def from_store(cls, store: AnnotationStore):
+        """
+        Initializes an AnnotationManager object from an AnnotationStore.
+        Polygon and Ellipse objects are only created when the annotations are accessed.
+
+        Args:
+            cls ('AnnotationManager'): The class itself.
+            store (AnnotationStore): Struct-of-arrays collection of annotations.
+
+        Returns:
+            AnnotationManager: A new AnnotationManager object backed by the store.
+        """
+        manager = cls([])
+        manager._annotations = None
+        manager._store = store
+        return manager
 
     @classmethod
     def from_dicts(
         cls,
-        dicts: List[dict],
+        dicts: Union[List[dict], bytes, str, os.PathLike],
     ):
         """
         Initializes the class with a list of dictionaries containing annotations.
 
         Args:
             cls ('AnnotationManager'): The class itself.
-            dicts (List[dict]): A list of dicts containing annotations.
+            dicts (Union[List[dict], bytes, str, os.PathLike]): A list of dicts containing annotations,
+                the raw bytes of a JSON file with this list or the path to such a JSON file.
 
         Raises:
             ValueError: Raised if the input dictionaries are not properly formatted.
 
         Note:
-            Only Polygon and Ellipse annotations are supported.
+            - Only Polygon and Ellipse annotations are supported.
+            - The dicts are parsed straight into an AnnotationStore. Polygon and Ellipse objects are only created when the annotations are accessed.
+            - JSON is parsed with orjson when it is installed.
+            - Polygon points are stored as int32 pixel coordinates. Polygons with non-integral points are also
+              created from their dicts, so their points are kept exactly.
 
         Returns:
             AnnotationManager: An instance of the AnnotationManager class containing the parsed annotations.
         """
-        TYPE_KEY = "type"
-        LABEL_KEY = "label"
-        CHILDREN_KEY = "children"
-        PARENTS_KEY = "parents"
-        ID_KEY = "id"
-        CENTER_KEY = "center"
-        annotations = []
-
-        for d in dicts:
-            if d[TYPE_KEY] == "ellipse":
-                annotation = Ellipse(
-                    label=d.get(LABEL_KEY, None),
-                    id=d.get(ID_KEY, str(uuid.uuid4())),
-                    children=d.get(CHILDREN_KEY, []),
-                    parents=d.get(PARENTS_KEY, []),
-                    radius_x=d["radiusX"],
-                    radius_y=d.get("radiusY", None),
-                    center=Point(x=d[CENTER_KEY]["x"], y=d[CENTER_KEY]["y"]),
-                    rotation=d["angleOfRotation"],
-                    accuracy=d.get("accuracy", 1),
-                )
-            elif d[TYPE_KEY] == "polygon":
-                if len(d["points"]) < MIN_NR_POINTS_POLYGON:
-                    continue
-                if "inner_points" in d:
-                    inner_points = [
-                        [Point(x=pi["x"], y=pi["y"]) for pi in inner_contour]
-                        for inner_contour in d["inner_points"]
-                    ]
-                else:
-                    inner_points = []
-
-                annotation = Polygon(
-                    label=d.get(LABEL_KEY, None),
-                    id=d.get(ID_KEY, str(uuid.uuid4())),
-                    children=d.get(CHILDREN_KEY, []),
-                    parents=d.get(PARENTS_KEY, []),
+        if isinstance(dicts, (bytes, bytearray, str, os.PathLike)):
+            dicts = load_json(dicts)
+
+        store, fractional_dicts = AnnotationStore._from_dicts(dicts)
+        manager = cls.from_store(store)
+        if fractional_dicts:
+            annotations = store.to_annotations()
+            for row, d in fractional_dicts.items():
+                annotations[row] = Polygon(
                     points=[Point(x=p["x"], y=p["y"]) for p in d["points"]],
-                    inner_points=inner_points,
-                    accuracy=d.get("accuracy", 1),
-                )
-            else:
-                raise ValueError(
-                    f"CDF cannot be created. Dict with id {d.get('id', None)} misses type-key with value ellipse or polygon."
+                    inner_points=[
+                        [Point(x=pi["x"], y=pi["y"]) for pi in inner_contour]
+                        for inner_contour in d.get("inner_points", [])
+                    ],
+                    id=store.ids[row],
+                    label=store.label(row),
+                    children=store.children[row],
+                    parents=store.parents[row],
+                    accuracy=float(store.accuracy[row]),
                 )
-            annotations.append(annotation)
-
-        return cls(annotations)
+            manager._set_annotations(annotations, store)
+        return manager
 
     @classmethod
     def from_binary_mask(
-        cls, mask: np.ndarray, include_inner_contours: bool = False, label: str = ""
+        cls,
+        mask: np.ndarray,
+        include_inner_contours: bool = False,
+        label: str = "",
+        tile_size: Union[int, None] = None,
+        max_workers: Union[int, None] = None,
     ):
         """
         Initializes an AnnotationManager object from a binary mask.
 
         Args:
             cls ('AnnotationManager'): The class itself.
-            mask (np.ndarray): Binary mask input.
+            mask (np.ndarray): Binary mask input, or any array that supports 2D slicing, e.g. a memory-mapped array.
+                Only the bands of rows that contain foreground are loaded.
             include_inner_contours (bool, optional): Include annotations that are contained within another annotation.
                 Defaults to False.
             label (str, optional): A label to assign to the annotations. Defaults to "".
+            tile_size (Union[int, None], optional): Read the mask in tiles of this size and stitch objects that cross
+                tile seams, which keeps memory bounded for whole well scans. The annotations equal those of the
+                untiled mask. Defaults to None, which processes every band of rows with foreground at once.
+            max_workers (Union[int, None], optional): The number of threads that process tiles. Defaults to None,
+                which uses the default of ThreadPoolExecutor.
 
         Returns:
             AnnotationManager: A new AnnotationManager object created from the binary mask.
         """
 
-        mask = mask.astype(np.uint8)
-        mode = cv2.RETR_CCOMP if include_inner_contours else cv2.RETR_EXTERNAL
-        contours, hierarchy = cv2.findContours(mask, mode, cv2.CHAIN_APPROX_SIMPLE)
+        if tile_size is None:
+            mode = cv2.RETR_CCOMP if include_inner_contours else cv2.RETR_EXTERNAL
+            contours, hierarchy = find_contours_in_bands(mask, mode)
+        else:
+            contours, hierarchy = find_contours_tiled(
+                mask,
+                include_inner_contours=include_inner_contours,
+                tile_size=tile_size,
+                max_workers=max_workers,
+            )
 
         annotations = contours2polygons(
             contours=contours,
@@ -127,6 +189,7 @@ class AnnotationManager(object):
         mask: np.ndarray,
         labels: Union[List[str], str] = "",
         include_inner_contours: bool = False,
+        max_workers: Union[int, None] = None,
     ):
         """
         Initializes an AnnotationManager object from a labeled mask.
@@ -137,9 +200,15 @@ class AnnotationManager(object):
             mask (np.ndarray): A labeled mask with a maximum number of components limited by max(np.uint32).
             labels (Union[List[str], str], optional): A list of class names to add to Polygon labels. Defaults to "".
                 Should have the same number of unique pixel values as classes.
-                Class names in order of low pixel value to high pixel value.
+                Class names in order of low pixel value to high pixel value: pixel value v gets the label labels[v - 1].
             include_inner_contours (bool, optional): Include annotations that are contained within another annotation.
                 Defaults to False.
+            max_workers (Union[int, None], optional): The number of threads that extract the contours of the pixel values
+                when `labels` is a list. Defaults to None, which uses the default of ThreadPoolExecutor.
+
+        Note:
+            With a list of labels, contours are only searched in the bounding box of each pixel value.
+            The bounding boxes are found in one pass over the mask.
 
         Example input with multiple pixel values::
 
@@ -149,6 +218,9 @@ class AnnotationManager(object):
                 [0, 0, 2, 0, 0]
             ]
 
+        Raises:
+            ValueError: If labels is not a string or a list, or if a pixel value has no label in `labels`.
+
         Returns:
             AnnotationManager: A new AnnotationManager object.
         """
@@ -168,61 +240,318 @@ class AnnotationManager(object):
             )
 
         elif isinstance(labels, List):
-            unique_values = np.unique(mask)
-            unique_values = unique_values[unique_values != 0]
+            unique_values, regions = find_label_objects(mask)
 
             if len(labels) < len(unique_values):
                 raise ValueError(
                     f"Not enough labels for unique pixel values. {len(labels)} labels for {len(unique_values)} unique pixel values."
                 )
+            has_label = (
+                (unique_values >= 1)
+                & (unique_values <= len(labels))
+                & (unique_values == np.round(unique_values))
+            )
+            if not has_label.all():
+                raise ValueError(
+                    f"Pixel values must be integers from 1 to {len(labels)} to have a label, got {unique_values[~has_label][0]}."
+                )
 
-            # Generate seperate mask for each class and find contours.
-            for pixel_value in unique_values:
-                class_mask = np.uint8(mask == pixel_value)
+            def extract_polygons(idx: int) -> List[Polygon]:
+                region = regions[idx]
+                # Pad by one pixel, so contours on the edge of the box are found as in the full mask.
+                class_mask = np.zeros(
+                    (
+                        region[0].stop - region[0].start + 2,
+                        region[1].stop - region[1].start + 2,
+                    ),
+                    dtype=np.uint8,
+                )
+                class_mask[1:-1, 1:-1] = mask[region] == unique_values[idx]
                 contours, hierarchy = cv2.findContours(
-                    class_mask, mode, cv2.CHAIN_APPROX_SIMPLE
+                    class_mask,
+                    mode,
+                    cv2.CHAIN_APPROX_SIMPLE,
+                    offset=(region[1].start - 1, region[0].start - 1),
                 )
-                annotations.extend(
-                    contours2polygons(
-                        contours=contours,
-                        hierarchy=hierarchy,
-                        include_inner_contours=include_inner_contours,
-                        label=labels[pixel_value - 1],
-                    )
+                return contours2polygons(
+                    contours=contours,
+                    hierarchy=hierarchy,
+                    include_inner_contours=include_inner_contours,
+                    label=labels[int(unique_values[idx]) - 1],
                 )
+
+            # OpenCV releases the GIL, so the pixel values are processed in parallel.
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for polygons in executor.map(extract_polygons, range(len(regions))):
+                    annotations.extend(polygons)
         else:
             raise ValueError("Labels must be either a string or a list of strings.")
 
         return cls(annotations)
 
+    @classmethod
+    def map_masks(
+        cls,
+        masks: Iterable[np.ndarray],
+        pipeline: Callable[["AnnotationManager"], Any],
+        workers: Union[int, None] = None,
+        max_in_flight: Union[int, None] = None,
+        include_inner_contours: bool = False,
+        label: str = "",
+    ) -> Iterator[Any]:
+        """
+        Runs a pipeline on the AnnotationManager of every binary mask in a pool of processes.
+
+        Args:
+            cls ('AnnotationManager'): The class itself.
+            masks (Iterable[np.ndarray]): Binary masks, e.g. a generator that loads the masks of a plate one by one.
+            pipeline (Callable[[AnnotationManager], Any]): Function that gets the AnnotationManager of a mask,
+                e.g. `lambda manager: manager.to_dict(features=["area"])`. Must be picklable when workers > 0,
+                so use a function defined at module level instead of a lambda.
+            workers (Union[int, None], optional): The number of processes. Defaults to None, which uses the number of CPUs.
+                With 0 the masks are processed in the calling process.
+            max_in_flight (Union[int, None], optional): The maximum number of masks that are submitted but not yet yielded.
+                Defaults to None, which is twice the number of workers.
+            include_inner_contours (bool, optional): Include annotations that are contained within another annotation.
+                Defaults to False.
+            label (str, optional): A label to assign to the annotations. Defaults to "".
+
+        Note:
+            - Results are yielded in the order of the masks, as soon as they are ready.
+            - Masks are only read from `masks` when there is room in flight, so memory stays bounded for long generators.
+            - AnnotationManagers in the results are sent back as the arrays of their AnnotationStore.
+
+        Yields:
+            Any: The result of the pipeline for every mask.
+        """
+        if workers == 0:
+            for mask in masks:
+                yield _run_mask_pipeline(mask, pipeline, include_inner_contours, label)
+            return
+
+        workers = workers or os.cpu_count() or 1
+        max_in_flight = max_in_flight or 2 * workers
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = deque()
+            for mask in masks:
+                if len(in_flight) >= max_in_flight:
+                    yield in_flight.popleft().result()
+                in_flight.append(
+                    executor.submit(
+                        _run_mask_pipeline,
+                        mask,
+                        pipeline,
+                        include_inner_contours,
+                        label,
+                    )
+                )
+            while in_flight:
+                yield in_flight.popleft().result()
+
     @classmethod
     def from_darwin(cls, dicts: List[dict]):
         """must be an option"""
         pass
 
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike], mmap: bool = True):
+        """
+        Initializes an AnnotationManager object from a file written by `save`.
+
+        Args:
+            cls ('AnnotationManager'): The class itself.
+            path (Union[str, os.PathLike]): The file to read.
+            mmap (bool, optional): Memory-map the file, so the geometry is not copied into memory and
+                only the pages that are used are read. Defaults to True.
+
+        Raises:
+            ValueError: If the file is not an annotation file or is written by a newer version of tomni.
+
+        Returns:
+            AnnotationManager: A new AnnotationManager object backed by the stored annotations.
+        """
+        return cls.from_store(load_store(path, mmap=mmap))
+
     @property
     def annotations(self) -> List[Annotation]:
+        if self._annotations is None:
+            self._annotations = self._store.to_annotations()
+            self._synced_annotations = list(self._annotations)
         return self._annotations
 
     @annotations.setter
     def annotations(self, other_annotations: List[Annotation]):
         """I doubt this setter should be allowed to exist."""
 
+    @property
+    def store(self) -> AnnotationStore:
+        """Struct-of-arrays representation of the annotations, used for bulk operations.
+        It is created on first access and shares the vertex buffer with polygons created from it.
+        It is created again when the list of `annotations` has been changed in place, e.g. with del or append.
+        """
+        self._sync()
+        if self._store is None:
+            self._store = AnnotationStore.from_annotations(self._annotations)
+            self._synced_annotations = list(self._annotations)
+        return self._store
+
+    def _sync(self) -> None:
+        """Drops the store and the id index when the list of `annotations` has been changed since they were created."""
+        if self._annotations is None or self._synced_annotations is None:
+            return
+        if len(self._annotations) != len(self._synced_annotations) or not all(
+            map(operator.is_, self._annotations, self._synced_annotations)
+        ):
+            self._store = None
+            self._synced_annotations = None
+            self._id_index = None
+
+    def _set_annotations(
+        self,
+        annotations: List[Annotation],
+        store: Union[AnnotationStore, None] = None,
+    ) -> None:
+        self._annotations = annotations
+        self._store = store
+        self._synced_annotations = (
+            None if annotations is None or store is None else list(annotations)
+        )
+        self._id_index = None
+
     def __len__(self) -> int:
+        if self._annotations is None:
+            return len(self._store)
         return len(self._annotations)
 
+    def __getstate__(self) -> dict:
+        """Pickles the store instead of the annotations, so Point and Polygon objects are not sent between processes.
+        The annotations are pickled as before when the store does not hold them exactly,
+        e.g. polygons with non-integral points or subclasses of Polygon and Ellipse.
+        """
+        state = self.__dict__.copy()
+        state["_synced_annotations"] = None
+        state["_id_index"] = None
+        if self._is_store_exact():
+            state["_store"] = self.store
+            state["_annotations"] = None
+        else:
+            state["_store"] = None
+        return state
+
+    def _is_store_exact(self) -> bool:
+        """Whether the annotations can be created again from the store without losing anything."""
+        return self._annotations is None or _is_stored_exactly(self._annotations)
+
+    def _take(self, rows: np.ndarray) -> "AnnotationManager":
+        """A new AnnotationManager with the selected rows, given as indices or a boolean mask.
+        It is backed by the store, unless the store does not hold the annotations exactly,
+        then the selected annotations are kept as they are.
+        """
+        store = self.store.take(rows)
+        if self._is_store_exact():
+            return AnnotationManager.from_store(store)
+
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        manager = AnnotationManager([self._annotations[row] for row in rows.tolist()])
+        manager._set_annotations(manager._annotations, store)
+        return manager
+
     def __eq__(self, other: object) -> bool:
-        """To check equality of to CDF objects
-        Thats bit of a tricky one because you must compare all annotations IMO.
-        Ex: cdf1 = AnnotationManager.from_something()
-        cdf2 = AnnotationManager.from_something()
-        is cdf1 == cdf2 must be possible.
+        """Two AnnotationManagers are equal when they contain the same geometries, in any order.
+        Geometries are compared by their canonical hash, so polygons with shifted or reversed points are equal,
+        as in `Polygon.__eq__`. Ids, labels and accuracy are not compared.
+        When a store does not hold the geometry exactly, e.g. polygons with non-integral points,
+        annotations with the same hash are also compared with `__eq__`.
         """
-        pass
+        if not isinstance(other, AnnotationManager):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        if self._is_store_exact() and other._is_store_exact():
+            return np.array_equal(
+                np.sort(self._canonical_hashes()), np.sort(other._canonical_hashes())
+            )
 
-    def __contains__(self, other: Annotation):
-        """to check if self.annotations contains other."""
-        pass
+        other_rows: Dict[bytes, List[int]] = {}
+        for row, geometry_hash in enumerate(other._canonical_hashes().tolist()):
+            other_rows.setdefault(geometry_hash, []).append(row)
+        other_annotations = other.annotations
+        for annotation, geometry_hash in zip(
+            self.annotations, self._canonical_hashes().tolist()
+        ):
+            rows = other_rows.get(geometry_hash, [])
+            matches = [
+                i
+                for i, row in enumerate(rows)
+                if _is_same_geometry(annotation, other_annotations[row])
+            ]
+            if not matches:
+                return False
+            rows.pop(matches[0])
+        return True
+
+    def __contains__(self, other: Union[Annotation, str]) -> bool:
+        """Checks if an annotation with the same geometry as `other`, or with id `other`, is in the AnnotationManager."""
+        if isinstance(other, str):
+            return other in self._id_positions()
+        return len(self._rows_of(other)) > 0
+
+    def _id_positions(self) -> Dict[str, int]:
+        """Position of the first annotation with every id. It is created on first use and kept up to date
+        by `add_annotations`, deletions and `filter(inplace=True)`.
+        """
+        self._sync()
+        if self._id_index is None:
+            ids = (
+                self._store.ids.tolist()
+                if self._annotations is None
+                else [annotation._id for annotation in self._annotations]
+            )
+            if self._annotations is not None and self._synced_annotations is None:
+                self._synced_annotations = list(self._annotations)
+            # Reversed, so the first position of a repeated id is kept.
+            self._id_index = dict(zip(reversed(ids), range(len(ids) - 1, -1, -1)))
+        return self._id_index
+
+    def get_annotation(self, id: str) -> Annotation:
+        """Returns the first annotation with an id.
+
+        Args:
+            id (str): The id of the annotation.
+
+        Raises:
+            KeyError: If no annotation has the id.
+
+        Returns:
+            Annotation: The annotation, store-backed annotations are created on access.
+        """
+        row = self._id_positions()[id]
+        if self._annotations is None:
+            return self._store.annotation(row)
+        return self._annotations[row]
+
+    def add_annotations(self, annotations: Sequence[Annotation]) -> None:
+        """Appends annotations in place, without dropping duplicates as `merge` does.
+
+        Args:
+            annotations (Sequence[Annotation]): The annotations to add.
+        """
+        annotations = list(annotations)
+        n_annotations = len(self)
+        self._sync()
+        if self._store is not None:
+            self._store = AnnotationStore.concatenate(
+                [self._store, AnnotationStore.from_annotations(annotations)]
+            )
+        if self._annotations is not None:
+            self._annotations = self._annotations + annotations
+            if self._synced_annotations is not None:
+                self._synced_annotations = list(self._annotations)
+        if self._id_index is not None:
+            for row, annotation in enumerate(annotations, start=n_annotations):
+                self._id_index.setdefault(annotation._id, row)
 
     def __iter__(self):
         self.idx = 0
@@ -241,6 +570,7 @@ class AnnotationManager(object):
         decimals: int = 2,
         mask_json: Union[List[dict], None] = None,
         min_overlap: float = 0.9,
+        overlap_backend: str = "shapely",
         features: Union[List[str], None] = None,
         metric_unit: str = "",
         feature_multiplier: float = 1,
@@ -255,6 +585,8 @@ class AnnotationManager(object):
                 Defaults to None.
             min_overlap (float, optional): Minimum overlap required between the polygon and the mask, expressed as a value between 0 and 1.
                 Defaults to 0.9.
+            overlap_backend (str, optional): How the overlap with the mask is calculated: "shapely" intersects the shapes,
+                "raster" counts the pixels they share, see `overlap_matrix`. Defaults to "shapely".
             features (Union[List[str], None], optional): The features you want to calculate and add to the dictionary objects.
                 Defaults to None, which returns all features.
             metric_unit (str, optional): The suffix to add to the dictionary keys' names in camelCasing. Defaults to "".
@@ -264,40 +596,176 @@ class AnnotationManager(object):
             - If a `mask_json` is provided, the method filters annotations based on their overlap with the mask.
             - Only annotations meeting the specified `min_overlap` criteria are included in the output.
             - If no `mask_json` is provided, all annotations are included in the output.
+            - The mask regions are put in a spatial index once, so every annotation is only compared with the regions it intersects.
+            - Features are calculated for all annotations at once and cached in pixel units on the store.
 
         Returns:
             List[Dict]: Output is a list of dictionaries in AxionBio format.
         """
 
+        features = validate_features(features)
+        annotations = self.annotations
+        rows = np.arange(len(annotations))
         if mask_json is not None:
-            filtered_annotations = self._annotations.copy()
-            filtered_annotations = [
-                annotation
-                for annotation in filtered_annotations
-                if annotation.is_in_mask(mask_json, min_overlap)
-            ]
+            mask_index = MaskIndex(mask_json, backend=overlap_backend)
+            is_in_mask = mask_index.is_in_mask(
+                mask_index.shapes(self.store), min_overlap
+            )
+            rows = np.flatnonzero(is_in_mask)
+
+        columns = self._feature_columns(features, feature_multiplier)
+        return list(
+            self._annotation_dicts(
+                [annotations[row] for row in rows.tolist()],
+                {feature: columns[feature][rows] for feature in features},
+                decimals,
+                metric_unit,
+                **kwargs,
+            )
+        )
+
+    def iter_dicts(
+        self,
+        decimals: int = 2,
+        mask_json: Union[List[dict], None] = None,
+        min_overlap: float = 0.9,
+        overlap_backend: str = "shapely",
+        features: Union[List[str], None] = None,
+        metric_unit: str = "",
+        feature_multiplier: float = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs,
+    ) -> Iterator[Dict]:
+        """
+        Generates the dictionaries of `to_dict` one by one, so the output never has to be in memory at once.
+
+        Args:
+            decimals (int, optional): The number of decimals to use when rounding. Defaults to 2.
+            mask_json (Union[dict, None], optional): The dictionary mask that indicates the area to include in the output.
+                Defaults to None.
+            min_overlap (float, optional): Minimum overlap required between the polygon and the mask, expressed as a value between 0 and 1.
+                Defaults to 0.9.
+            overlap_backend (str, optional): How the overlap with the mask is calculated: "shapely" intersects the shapes,
+                "raster" counts the pixels they share, see `overlap_matrix`. Defaults to "shapely".
+            features (Union[List[str], None], optional): The features you want to calculate and add to the dictionary objects.
+                Defaults to None, which returns all features.
+            metric_unit (str, optional): The suffix to add to the dictionary keys' names in camelCasing. Defaults to "".
+            feature_multiplier (float, optional): A multiplier used during feature calculation, e.g., 1/742. Defaults to 1.
+            chunk_size (int, optional): The number of annotations processed at once. Defaults to 10000.
+
+        Note:
+            - Features and the overlap with the mask are calculated in batch per chunk. Features that are already
+              cached on the store are reused, other features are not cached, so memory stays bounded by the chunk size.
+
+        Yields:
+            Dict: The annotations in AxionBio format, in the same order as `to_dict`.
+        """
+        features = validate_features(features)
+        store = self.store
+        mask_index = (
+            None if mask_json is None else MaskIndex(mask_json, backend=overlap_backend)
+        )
 
-            return [
-                annotation.to_dict(
-                    decimals=decimals,
-                    features=features,
-                    metric_unit=metric_unit,
-                    feature_multiplier=feature_multiplier,
-                    **kwargs,
+        for start in range(0, len(store), chunk_size):
+            rows = np.arange(start, min(start + chunk_size, len(store)))
+            chunk = store.take(rows)
+            if mask_index is not None:
+                is_in_mask = mask_index.is_in_mask(
+                    mask_index.shapes(chunk), min_overlap
                 )
-                for annotation in filtered_annotations
-            ]
+                rows = rows[is_in_mask]
+                chunk = chunk.take(is_in_mask)
 
-        return [
-            annotation.to_dict(
-                decimals=decimals,
-                features=features,
-                metric_unit=metric_unit,
-                feature_multiplier=feature_multiplier,
-                **kwargs,
+            if self._annotations is None:
+                annotations = chunk.to_annotations()
+            else:
+                annotations = [self._annotations[row] for row in rows.tolist()]
+            columns = {
+                feature: scale_feature(feature, column, feature_multiplier)
+                for feature, column in calculate_features(
+                    chunk, features, cache=self.feature_cache
+                ).items()
+            }
+            yield from self._annotation_dicts(
+                annotations, columns, decimals, metric_unit, **kwargs
             )
-            for annotation in self._annotations
-        ]
+
+    def write_json(
+        self,
+        fp: Union[str, os.PathLike, BinaryIO, TextIO],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs,
+    ) -> None:
+        """
+        Writes the output of `to_dict` as a JSON array, chunk by chunk, to a file, socket or path.
+
+        Args:
+            fp (Union[str, os.PathLike, BinaryIO, TextIO]): A path, or a binary or text file-like object with `write`,
+                e.g. a file or `socket.makefile("wb")`.
+            chunk_size (int, optional): The number of annotations serialized at once. Defaults to 10000.
+            **kwargs: The arguments of `iter_dicts`, e.g. features, metric_unit and feature_multiplier.
+        """
+        if isinstance(fp, (str, os.PathLike)):
+            with open(fp, "wb") as f:
+                return self.write_json(f, chunk_size=chunk_size, **kwargs)
+
+        is_text = isinstance(fp, io.TextIOBase)
+        separator = b"["
+        chunk = []
+        for annotation_dict in self.iter_dicts(chunk_size=chunk_size, **kwargs):
+            chunk.append(annotation_dict)
+            if len(chunk) == chunk_size:
+                _write(fp, separator + dump_json(chunk)[1:-1], is_text)
+                separator = b","
+                chunk = []
+        if chunk:
+            _write(fp, separator + dump_json(chunk)[1:-1], is_text)
+            separator = b","
+        _write(fp, b"[]" if separator == b"[" else b"]", is_text)
+
+    @staticmethod
+    def _annotation_dicts(
+        annotations: Sequence[Annotation],
+        columns: Dict[str, np.ndarray],
+        decimals: int,
+        metric_unit: str,
+        **kwargs,
+    ) -> Iterator[Dict]:
+        """AxionBio dicts of annotations with a value per annotation of every feature column added.
+        With do_compress, the rings of all polygons are compressed in one call of `simplify_rings`.
+        """
+        if kwargs.get("do_compress", False):
+            annotations = _compress_polygons(
+                annotations, kwargs.get("epsilon", 3), kwargs.get("max_vertices")
+            )
+            kwargs = {**kwargs, "do_compress": False}
+
+        feature_names = [feature_name(feature, metric_unit) for feature in columns]
+        feature_values = np.round(
+            (
+                np.column_stack(list(columns.values()))
+                if columns
+                else np.zeros((len(annotations), 0))
+            ),
+            decimals,
+        ).tolist()
+
+        for annotation, values in zip(annotations, feature_values):
+            annotation_dict = annotation.to_dict(
+                decimals=decimals, features=[], **kwargs
+            )
+            annotation_dict.update(zip(feature_names, values))
+            yield annotation_dict
+
+    def _feature_columns(
+        self, features: List[str], feature_multiplier: float = 1
+    ) -> Dict[str, np.ndarray]:
+        """Feature columns of all annotations, computed in batch on the store and scaled by the feature_multiplier."""
+        columns = calculate_features(self.store, features, cache=self.feature_cache)
+        return {
+            feature: scale_feature(feature, column, feature_multiplier)
+            for feature, column in columns.items()
+        }
 
     def to_contours(self) -> List[np.ndarray]:
         """
@@ -319,19 +787,17 @@ class AnnotationManager(object):
               the contour, and each point has (x, y) coordinates.
         """
 
-        if not all(
-            [isinstance(annotation, Polygon) for annotation in self._annotations]
-        ):
+        store = self.store
+        if not np.all(store.types == POLYGON):
             raise ValueError("`to_contours is only supported on polygon-annotations.`")
 
-        contours = [
-            parse_points_to_contour(annotation.points)
-            for annotation in self._annotations
-        ]
+        contours = [store.ring(ring_idx).copy() for ring_idx in store.object_rings[:-1]]
 
         return contours
 
-    def to_binary_mask(self, shape: Tuple[int, int]) -> np.ndarray:
+    def to_binary_mask(
+        self, shape: Tuple[int, int], out: Union[np.ndarray, None] = None
+    ) -> np.ndarray:
         """
         Transform an AnnotationManager object to a binary mask.
 
@@ -340,6 +806,8 @@ class AnnotationManager(object):
 
         Args:
             shape (Tuple[int, int]): The shape (width, height) of the new binary mask.
+            out (Union[np.ndarray, None], optional): A canvas of `shape` to draw the annotations on.
+                Annotations are drawn on top of its current content. Defaults to None, which creates a new mask.
 
         Returns:
             np.ndarray: A binary mask where annotated regions are represented by 1 (True) and
@@ -348,61 +816,62 @@ class AnnotationManager(object):
         Note:
             - This method supports annotations of type Polygon and Ellipse for conversion to a binary mask.
             - The binary mask represents annotated regions with 1 and non-annotated regions with 0.
+            - All annotations are drawn directly into one canvas, each only touching its bounding box.
         """
 
-        mask = np.zeros(shape, dtype=np.uint8)
-        for annotation in self.annotations:
-            mask = cv2.bitwise_or(mask, annotation.to_binary_mask(shape))
+        mask = np.zeros(shape, dtype=np.uint8) if out is None else out
+        return self.store.draw(mask, values=1)
 
-        return mask
-
-    def to_labeled_mask(self, shape: Tuple[int, int]) -> np.ndarray:
+    def to_labeled_mask(
+        self,
+        shape: Tuple[int, int],
+        overlap: str = "last",
+        return_lookup: bool = False,
+    ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
         """
         Transform an Annotation Manager object to a labeled mask. This method generates a labeled mask from the annotations stored in the AnnotationManager object. Supported
         annotation types for conversion are polygon and ellipse.
 
         Args:
             shape (Tuple[int, int]): The shape (width, height) of the new labeled mask.
+            overlap (str, optional): Which annotation keeps the pixels where annotations overlap.
+                "last" keeps the annotation that comes last, "accuracy" keeps the annotation with the highest accuracy
+                and "smallest" keeps the annotation with the smallest area. Defaults to "last".
+            return_lookup (bool, optional): Also return a lookup table from label to annotation index. Defaults to False.
 
         Returns:
-            np.ndarray: A new labeled mask where each labeled region corresponds to an annotation.
+            Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]: A new labeled mask where each labeled region corresponds to an annotation.
+                With `return_lookup` also the lookup table, where lookup[label] is the index of the annotation and lookup[0] is -1 for the background.
 
         Raises:
-            TypeError: If the AnnotationManager contains annotations of unsupported types.
+            ValueError: If the overlap policy is unknown.
 
         Note:
             - This method supports annotations of type Polygon and Ellipse for conversion to a labeled mask.
             - Each labeled region in the generated mask corresponds to an annotation, and the regions are labeled with unique integer values starting from 1.
+            - The dtype of the mask is the smallest of uint8, uint16 and uint32 that fits all labels.
+            - Inner contours of polygons are left out of the labeled region.
+            - Per annotation statistics can be calculated in one pass, e.g. `np.bincount(mask.ravel(), weights=image.ravel())`.
         """
+        store = self.store
+        n_annotations = len(store)
+        order = overlap_order(
+            overlap,
+            n_annotations,
+            accuracy=store.accuracy,
+            areas=(
+                calculate_features(store, ["area"], cache=self.feature_cache)["area"]
+                if overlap == "smallest"
+                else None
+            ),
+        )
 
-        mask = np.zeros(shape, dtype=np.uint8)
-        label_color = 1
-
-        for annotation in self._annotations:
-            if isinstance(annotation, Polygon):
-                points = np.array(
-                    [[point.x, point.y] for point in annotation.points], dtype=np.int32
-                )
-                cv2.fillPoly(mask, [points], color=label_color)
-            elif isinstance(annotation, Ellipse):
-                cv2.ellipse(
-                    mask,
-                    center=(annotation.center.x, annotation.center.y),
-                    axes=(annotation.radius_x, annotation.radius_y),
-                    angle=annotation.rotation,
-                    startAngle=0,
-                    endAngle=360,
-                    color=label_color,
-                    thickness=-1,
-                )
-            else:
-                raise TypeError(
-                    "Innapropiate annotation type for `to_labeled_mask`. Supported annotations are ellipse and polygon."
-                )
-
-            # increase color for every annotation.
-            label_color += 1
+        mask = np.zeros(shape, dtype=label_dtype(n_annotations))
+        store.draw(mask, values=np.arange(1, n_annotations + 1), order=order)
 
+        if return_lookup:
+            lookup = np.arange(-1, n_annotations, dtype=np.int64)
+            return mask, lookup
         return mask
 
     def to_darwin(self) -> List[Dict]:
@@ -410,31 +879,277 @@ class AnnotationManager(object):
         TODO: Convert annotations to darwin format (v7).
         """
 
-    def __add__(self, other):
-        """Ability to add to CDF objects together
-        cdf1 + cdf2.
+    def save(
+        self, path: Union[str, os.PathLike], include_features: bool = True
+    ) -> None:
+        """
+        Writes the annotations to a compact binary file that `load` reads back.
+        Vertices, offsets and ellipse parameters are stored as raw arrays, labels in a string table,
+        and the file carries a format version.
 
-        or possiby
-        - cdf + dict
-        - cdf + darwin
-        - ...
+        Args:
+            path (Union[str, os.PathLike]): The file to write to.
+            include_features (bool, optional): Also store the features that have been calculated,
+                so they are not calculated again after loading. Defaults to True.
         """
-        pass
+        save_store(self.store, path, include_features=include_features)
+
+    def __add__(self, other):
+        """Merges two AnnotationManagers, or an AnnotationManager and a list of annotations, into a new one.
+        Exact duplicates are dropped, see `merge`.
+        """
+        if not isinstance(other, (AnnotationManager, list, tuple)):
+            return NotImplemented
+        return self.merge(other)
 
     def __radd__(self, other):
-        """Reverse of __add__
-        if you do:
-        dict + cdf -> error
-        radd should flip the two parts and call add.
-        so, dict + cdf becomes cdf + dict.
+        """Reverse of __add__, so a list of annotations comes first in `annotations + manager`.
+        Adding to 0 returns a merged copy, which lets `sum(managers)` merge many AnnotationManagers.
         """
-        pass
+        if isinstance(other, int) and other == 0:
+            return self.merge()
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+        return AnnotationManager(list(other)).merge(self)
 
-    def delete_annotation(self, item: Annotation):
-        """Remove an annotation from self.annotations.
-        Find and delete.
+    def merge(
+        self,
+        *others: Union["AnnotationManager", Sequence[Annotation]],
+        iou_threshold: Union[float, None] = None,
+    ) -> "AnnotationManager":
         """
-        pass
+        Combines the annotations of this and other AnnotationManagers into a new one and drops the duplicates,
+        e.g. to combine the results of overlapping fields of view.
+
+        Args:
+            *others (Union[AnnotationManager, Sequence[Annotation]]): AnnotationManagers or lists of annotations.
+            iou_threshold (Union[float, None], optional): Also drop annotations whose intersection over union
+                with an earlier annotation is at least this value. Defaults to None, which only drops exact duplicates.
+
+        Returns:
+            AnnotationManager: A new AnnotationManager backed by a store with the unique annotations,
+            its Polygon and Ellipse objects are only created when accessed.
+
+        Note:
+            - Exact duplicates have the same geometry after sorting the points, see `canonical_geometry_hashes`.
+            - Of every group of duplicates the first annotation is kept, this AnnotationManager comes first.
+            - Near duplicates are only compared with annotations whose geometry intersects, using an STRtree.
+            - When the store does not hold all annotations exactly, e.g. polygons with non-integral points,
+              exact duplicates are confirmed with `__eq__` and the kept annotations are the original objects.
+        """
+        managers = [self] + [
+            (
+                other
+                if isinstance(other, AnnotationManager)
+                else AnnotationManager(list(other))
+            )
+            for other in others
+        ]
+        stores = [manager.store for manager in managers]
+        # Hashing every store first caches the hashes on the stores for later merges.
+        for store in stores:
+            calculate_features(store, ["_canonical_hash"])
+        merged = AnnotationManager.from_store(AnnotationStore.concatenate(stores))
+        if all(manager._is_store_exact() for manager in managers):
+            return merged._take(~duplicate_rows(merged.store, iou_threshold))
+
+        annotations = [
+            annotation for manager in managers for annotation in manager.annotations
+        ]
+        merged._set_annotations(annotations, merged.store)
+        return merged._take(
+            ~duplicate_rows(merged.store, iou_threshold, annotations=annotations)
+        )
+
+    def nms(
+        self, iou_threshold: float = 0.5, by: str = "accuracy"
+    ) -> "AnnotationManager":
+        """
+        Non-maximum suppression of overlapping detections: of annotations that overlap too much,
+        only the one with the highest score is kept.
+
+        Args:
+            iou_threshold (float, optional): Annotations whose intersection over union with an annotation
+                with a higher score is above this value are removed. Defaults to 0.5.
+            by (str, optional): The score, "accuracy" or a feature such as "area". Defaults to "accuracy".
+
+        Returns:
+            AnnotationManager: A new AnnotationManager with the kept annotations, in their original order.
+            It is backed by a store, unless the store does not hold the annotations exactly,
+            e.g. polygons with non-integral points, then the kept annotations are the original objects.
+
+        Note:
+            - Polygons and ellipses are suppressed together.
+            - Candidate pairs are found with an STRtree, only overlapping annotations are compared.
+            - Ties in the score are won by the annotation that comes first.
+        """
+        scores = self._feature_values(by, 1.0)
+        is_suppressed = suppressed_rows(self.store, scores, iou_threshold)
+        return self._take(~is_suppressed)
+
+    def simplify(
+        self,
+        epsilon: Union[float, None] = None,
+        max_vertices: Union[int, None] = None,
+    ) -> "AnnotationManager":
+        """
+        Simplifies the polygons of all annotations at once, e.g. to limit the size of the JSON sent to a viewer.
+
+        Args:
+            epsilon (Union[float, None], optional): Epsilon value in Ramer-Douglas-Peucker algorithm, the same
+                simplification as `to_dict` with do_compress. Defaults to None.
+            max_vertices (Union[int, None], optional): The maximum number of vertices of every ring of a polygon,
+                the vertices with the smallest contribution to the shape are removed (Visvalingam-Whyatt). Defaults to None.
+
+        Returns:
+            AnnotationManager: A new AnnotationManager backed by a store with the simplified polygons.
+
+        Note:
+            - The store holds integer vertices, use `to_dict` with do_compress for polygons with non-integer points.
+            - Ellipses are not changed.
+        """
+        return AnnotationManager.from_store(
+            self.store.simplify(epsilon=epsilon, max_vertices=max_vertices)
+        )
+
+    def link(
+        self,
+        next_manager: "AnnotationManager",
+        method: str = "iou",
+        max_distance: Union[float, None] = None,
+        min_iou: float = 0.0,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Links the annotations of this frame to the annotations of the next frame of a time-lapse,
+        every annotation to at most one annotation of the other frame.
+        The id of the linked annotation is written to the children of this frame and the parents of the next frame.
+
+        Args:
+            next_manager (AnnotationManager): The annotations of the next frame.
+            method (str, optional): "iou" links annotations whose geometries overlap, preferring a high
+                intersection over union. "centroid" links annotations whose centroids are within `max_distance`,
+                preferring a small distance. Defaults to "iou".
+            max_distance (Union[float, None], optional): The largest distance in pixels between the centroids of
+                linked annotations. Required for "centroid". Defaults to None.
+            min_iou (float, optional): With "iou" linked annotations have an intersection over union above this value.
+                Defaults to 0.
+
+        Raises:
+            ValueError: If the method is unknown or "centroid" is used without a `max_distance`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The indices of the linked annotations in this frame
+            and the indices of the annotations in the next frame they are linked to.
+
+        Note:
+            - The children of this frame and the parents of the next frame are replaced,
+              annotations without a link get an empty list.
+            - Candidates are found with a spatial index and the assignment is solved on the sparse graph of
+              candidates, so frames with many thousands of cells link quickly, also when they are confluent.
+            - To track a time-lapse, link every frame to the next: `frames[t].link(frames[t + 1])`.
+        """
+        rows, next_rows = link_stores(
+            self.store, next_manager.store, method, max_distance, min_iou
+        )
+
+        children = [[] for _ in range(len(self))]
+        parents = [[] for _ in range(len(next_manager))]
+        ids, next_ids = self.store.ids, next_manager.store.ids
+        for row, next_row in zip(rows.tolist(), next_rows.tolist()):
+            children[row] = [next_ids[next_row]]
+            parents[next_row] = [ids[row]]
+        self._set_links(children=children)
+        next_manager._set_links(parents=parents)
+        return rows, next_rows
+
+    def _set_links(
+        self,
+        children: Union[List[List[str]], None] = None,
+        parents: Union[List[List[str]], None] = None,
+    ) -> None:
+        """Replaces the children or parents in the store and in the annotations that have been created."""
+        for attribute, links in [("children", children), ("parents", parents)]:
+            if links is None:
+                continue
+            if self._store is not None:
+                column = np.empty(len(links), dtype=object)
+                for row, link in enumerate(links):
+                    column[row] = link
+                setattr(self._store, attribute, column)
+            for annotation, link in zip(self._annotations or [], links):
+                setattr(annotation, "_" + attribute, link)
+
+    def delete_annotation(self, item: Union[Annotation, str]) -> None:
+        """Removes the first annotation with the same geometry as `item`, as `list.remove` does.
+        If `item` is a string, the first annotation with that id is removed.
+
+        Args:
+            item (Union[Annotation, str]): The annotation or the id of the annotation to remove.
+
+        Raises:
+            ValueError: If the annotation is not in the AnnotationManager.
+        """
+        self.delete_annotations([item])
+
+    def delete_annotations(self, items: Iterable[Union[Annotation, str]]) -> None:
+        """Removes annotations by id or geometry, see `delete_annotation`.
+        The annotations and the store are compacted once for all items.
+
+        Args:
+            items (Iterable[Union[Annotation, str]]): The annotations or ids of the annotations to remove.
+
+        Raises:
+            ValueError: If any of the annotations is not in the AnnotationManager, nothing is removed then.
+        """
+        is_kept = np.ones(len(self), dtype=bool)
+        id_positions = self._id_positions()
+        for item in items:
+            if isinstance(item, str):
+                rows = [id_positions[item]] if item in id_positions else []
+            else:
+                rows = self._rows_of(item)
+            # Every item removes another annotation, also when items are repeated.
+            rows = [row for row in rows if is_kept[row]]
+            if len(rows) == 0:
+                raise ValueError(
+                    f"The annotation {item} is not in the AnnotationManager."
+                )
+            is_kept[rows[0]] = False
+
+        if is_kept.all():
+            return
+        annotations = self._annotations
+        if annotations is not None:
+            annotations = [
+                annotation
+                for annotation, keep in zip(annotations, is_kept.tolist())
+                if keep
+            ]
+        store = self._store
+        if store is not None:
+            store = store.take(is_kept)
+        self._set_annotations(annotations, store)
+
+    def _canonical_hashes(self) -> np.ndarray:
+        return calculate_features(self.store, ["_canonical_hash"])["_canonical_hash"]
+
+    def _rows_of(self, annotation: Annotation) -> np.ndarray:
+        """Rows of the annotations with the same geometry as `annotation`.
+        Rows are found by canonical hash. When the store does not hold the geometry exactly, e.g. polygons
+        with non-integral points, every match is confirmed with `__eq__` on the annotations.
+        """
+        if not isinstance(annotation, (Polygon, Ellipse)):
+            return np.zeros(0, dtype=np.int64)
+        hashes = calculate_features(
+            AnnotationStore.from_annotations([annotation]), ["_canonical_hash"]
+        )["_canonical_hash"]
+        rows = np.flatnonzero(self._canonical_hashes() == hashes[0])
+        if self._is_store_exact() and _is_stored_exactly([annotation]):
+            return rows
+        annotations = self.annotations
+        return rows[
+            [_is_same_geometry(annotations[row], annotation) for row in rows.tolist()]
+        ]
 
     def filter(
         self,
@@ -465,37 +1180,203 @@ class AnnotationManager(object):
         Note:
             - This method filters annotations based on a specified feature within the provided value range.
             - The `feature_multiplier` parameter allows scaling of the feature calculation if needed.
+            - Features are calculated for all annotations at once and cached in pixel units on the store.
         """
 
-        filtered_annotations = []
+        annotations = self.annotations
+        values = self._feature_values(feature, feature_multiplier)
 
-        for annotation in self._annotations:
-            annotation._feature_multiplier = feature_multiplier
-            feature_value = getattr(annotation, feature)
-            if min_val <= feature_value <= max_val:
-                filtered_annotations.append(annotation)
+        is_kept = (min_val <= values) & (values <= max_val)
+        filtered_annotations = [annotations[row] for row in np.flatnonzero(is_kept)]
 
         if inplace:
-            self._annotations = filtered_annotations
+            self._set_annotations(filtered_annotations, self.store.take(is_kept))
             return self
 
         return filtered_annotations
 
-    @classmethod
-    def get_circularity_summary(self):
-        """loops the cdf items to get avg, std, min, max."""
+    def query(
+        self,
+        ranges: Union[
+            Dict[str, Tuple[Union[float, None], Union[float, None]]], None
+        ] = None,
+        labels: Union[str, List[str], None] = None,
+        feature_multiplier: float = 1.0,
+        return_indices: bool = False,
+    ) -> Union["AnnotationManager", np.ndarray]:
+        """
+        Select annotations that meet several conditions at once.
+
+        Every condition is evaluated as a boolean mask over a feature column and the masks are combined,
+        so each feature is calculated once for all annotations.
+
+        Args:
+            ranges (Union[Dict[str, Tuple[Union[float, None], Union[float, None]]], None], optional): For every feature
+                the (min_val, max_val) range it must be in, bounds are inclusive and None is unbounded.
+                Besides the features also "accuracy" can be used, e.g. `{"area": (100, None), "accuracy": (0.5, None)}`.
+                Defaults to None, which does not filter on features.
+            labels (Union[str, List[str], None], optional): The label or labels to keep. Defaults to None, which keeps all labels.
+            feature_multiplier (float, optional): A multiplier used in feature calculations. Defaults to 1.
+            return_indices (bool, optional): Return the indices of the selected annotations instead of an AnnotationManager.
+                Defaults to False.
+
+        Returns:
+            Union[AnnotationManager, np.ndarray]: A new AnnotationManager backed by a store with the selected rows,
+            its Polygon and Ellipse objects are only created when accessed. With `return_indices` the indices of the selected annotations.
+            When the store does not hold the annotations exactly, e.g. polygons with non-integral points,
+            the selected annotations are the original objects.
+
+        Note:
+            - The original AnnotationManager is not changed.
+            - Cached feature columns are carried over to the new AnnotationManager.
+        """
+        store = self.store
+        is_kept = np.ones(len(store), dtype=bool)
+
+        for feature, (min_val, max_val) in (ranges or {}).items():
+            values = self._feature_values(feature, feature_multiplier)
+            if min_val is not None:
+                is_kept &= min_val <= values
+            if max_val is not None:
+                is_kept &= values <= max_val
+
+        if labels is not None:
+            labels = [labels] if isinstance(labels, str) else labels
+            label_codes = [
+                code for code, label in enumerate(store.label_table) if label in labels
+            ]
+            is_kept &= np.isin(store.label_codes, label_codes)
+
+        rows = np.flatnonzero(is_kept)
+        if return_indices:
+            return rows
+        return self._take(rows)
+
+    def _feature_values(self, feature: str, feature_multiplier: float) -> np.ndarray:
+        """The value of a feature, accuracy or other annotation attribute for every annotation."""
+        if feature in FEATURES:
+            return self._feature_columns([feature], feature_multiplier)[feature]
+        elif feature == "accuracy":
+            return self.store.accuracy
+        return np.array(
+            [getattr(annotation, feature) for annotation in self.annotations]
+        )
 
-    def get_feature_summaries(self, features: List[str]) -> Dict:
-        """Pass a list of features to calculated.
+    def get_circularity_summary(
+        self, percentiles: Sequence[float] = DEFAULT_PERCENTILES
+    ) -> Dict[str, float]:
+        """Statistics of the circularity of all annotations, see `get_feature_summaries`.
 
-        This is not ideal and i am for suggestion. I want to avoid having to calculate over and over.
+        Args:
+            percentiles (Sequence[float], optional): The percentiles to add. Defaults to (5, 25, 50, 75, 95).
+
+        Returns:
+            Dict[str, float]: The count, mean, std, min, max and percentiles of the circularity.
+        """
+        return self.get_feature_summaries(["circularity"])["circularity"].to_dict(
+            percentiles
+        )
+
+    def get_feature_summaries(
+        self,
+        features: Union[List[str], None] = None,
+        feature_multiplier: float = 1,
+        relative_accuracy: float = 0.01,
+    ) -> Dict[str, FeatureSummary]:
         """
-        circularity = []
-        for cdf_item in self._cdf_data:
-            circularity.append(cdf_item.circularity)
+        Summarize features of all annotations in one pass over the cached feature columns.
 
+        Args:
+            features (Union[List[str], None], optional): The features to summarize. Defaults to None, which summarizes all features.
+            feature_multiplier (float, optional): A multiplier used during feature calculation, e.g., 1/742. Defaults to 1.
+            relative_accuracy (float, optional): The maximum relative error of the percentiles. Defaults to 0.01.
+
+        Raises:
+            ValueError: If any of the features is not supported.
+
+        Returns:
+            Dict[str, FeatureSummary]: A summary per feature with count, mean, std, min, max and percentiles,
+            use `to_dict` of a summary for the statistics.
+
+        Note:
+            - Summaries of different images or processes can be combined with `merge_summaries`,
+              e.g. to get plate level statistics from the summaries of every image.
+            - NaN values, e.g. the circularity of an annotation without perimeter, are not counted.
+        """
+        features = validate_features(features)
+        columns = self._feature_columns(features, feature_multiplier)
         return {
-            "circularity": {"avg": 1, "std": 1, "min": 1, "max": 1},
-            "...": "...",
-            "feature_n": {"avg_n": 1, "std_n": 1, "min_n": 1, "max_n": 1},
+            feature: FeatureSummary.from_values(columns[feature], relative_accuracy)
+            for feature in features
         }
+
+
+def _run_mask_pipeline(
+    mask: np.ndarray,
+    pipeline: Callable[[AnnotationManager], Any],
+    include_inner_contours: bool,
+    label: str,
+) -> Any:
+    manager = AnnotationManager.from_binary_mask(
+        mask, include_inner_contours=include_inner_contours, label=label
+    )
+    return pipeline(manager)
+
+
+def _is_stored_exactly(annotations: Sequence[Annotation]) -> bool:
+    """Whether an AnnotationStore holds the annotations exactly: only Polygon and Ellipse objects,
+    and polygons with integral points, since the store keeps int32 vertices.
+    """
+    for annotation in annotations:
+        if type(annotation) is Ellipse:
+            continue
+        if type(annotation) is not Polygon:
+            return False
+        # Polygons without points are created from int32 contours.
+        rings = [] if annotation._points is None else [annotation._points]
+        if annotation._inner_points is not None:
+            rings.extend(annotation._inner_points)
+        for ring in rings:
+            for point in ring:
+                if not (float(point.x).is_integer() and float(point.y).is_integer()):
+                    return False
+    return True
+
+
+def _compress_polygons(
+    annotations: Sequence[Annotation],
+    epsilon: Union[float, None],
+    max_vertices: Union[int, None],
+) -> List[Annotation]:
+    """Annotations with the rings of all polygons compressed at once, ellipses are returned as they are."""
+    polygons = [
+        annotation for annotation in annotations if isinstance(annotation, Polygon)
+    ]
+    polygon_rings = [polygon._rings() for polygon in polygons]
+    compressed_rings = iter(
+        compress_rings(
+            [ring for rings in polygon_rings for ring in rings], epsilon, max_vertices
+        )
+    )
+    compressed_polygons = iter(
+        [
+            Polygon(
+                points=next(compressed_rings),
+                id=polygon._id,
+                inner_points=[next(compressed_rings) for _ in rings[1:]],
+                label=polygon.label,
+                children=polygon._children,
+                parents=polygon._parents,
+                accuracy=polygon.accuracy,
+            )
+            for polygon, rings in zip(polygons, polygon_rings)
+        ]
+    )
+    return [
+        next(compressed_polygons) if isinstance(annotation, Polygon) else annotation
+        for annotation in annotations
+    ]
+
+
+def _write(fp: Union[BinaryIO, TextIO], data: bytes, is_text: bool) -> None:
+    fp.write(data.decode() if is_text else data)
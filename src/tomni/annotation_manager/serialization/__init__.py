@@ -0,0 +1 @@
+from .main import FORMAT_VERSION, load_store, save_store
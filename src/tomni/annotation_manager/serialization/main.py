@@ -0,0 +1,168 @@
+import json
+import os
+import struct
+from typing import Dict, Union
+
+import numpy as np
+
+from tomni.annotation_manager.store import AnnotationStore
+from tomni.annotation_manager.store.main import _object_array
+from tomni.annotation_manager.utils.load_json import load_json
+
+MAGIC = b"TOMNIAM\x00"
+# Readers refuse files with a newer version; sections they do not know are ignored.
+FORMAT_VERSION = 1
+# Magic, format version and header length.
+PREFIX = struct.Struct("<8sIQ")
+# Sections start at multiples of this, so every array can be viewed without copying.
+ALIGNMENT = 64
+
+ARRAY_COLUMNS = (
+    "types",
+    "label_codes",
+    "accuracy",
+    "vertices",
+    "ring_offsets",
+    "object_rings",
+    "centers",
+    "radii",
+    "rotations",
+)
+FEATURE_PREFIX = "features/"
+
+
+def save_store(
+    store: AnnotationStore, path: Union[str, os.PathLike], include_features: bool = True
+) -> None:
+    """Writes a store to a binary file.
+
+    The file starts with a magic number, the format version and a JSON header that describes the sections.
+    Every array column is stored raw and little-endian in its own aligned section, so it can be memory-mapped.
+    The label table is part of the header and ids, children and parents are stored as one JSON section.
+    The file is written next to `path` and then moved, so an existing file is replaced at once.
+
+    Args:
+        store (AnnotationStore): The store to write.
+        path (Union[str, os.PathLike]): The file to write to.
+        include_features (bool, optional): Also store the cached feature columns. Defaults to True.
+    """
+    arrays = {name: getattr(store, name) for name in ARRAY_COLUMNS}
+    if include_features:
+        arrays.update(
+            {FEATURE_PREFIX + name: column for name, column in store.features.items()}
+        )
+    arrays = {
+        name: np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+        for name, array in arrays.items()
+    }
+    metadata = json.dumps(
+        {
+            "ids": store.ids.tolist(),
+            "children": store.children.tolist(),
+            "parents": store.parents.tolist(),
+        }
+    ).encode()
+    arrays["metadata"] = np.frombuffer(metadata, dtype=np.uint8)
+
+    sections = {}
+    offset = 0
+    for name, array in arrays.items():
+        sections[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps(
+        {
+            "n_annotations": len(store),
+            "label_table": store.label_table,
+            "sections": sections,
+        }
+    ).encode()
+
+    # Stores loaded from `path` keep their memory map of the old file when it is replaced.
+    temporary_path = f"{os.fspath(path)}.{os.getpid()}.tmp"
+    try:
+        with open(temporary_path, "wb") as f:
+            f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            data_start = _align(PREFIX.size + len(header))
+            for name, array in arrays.items():
+                f.write(b"\x00" * (data_start + sections[name]["offset"] - f.tell()))
+                f.write(array.data)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def load_store(path: Union[str, os.PathLike], mmap: bool = True) -> AnnotationStore:
+    """Reads a store written by `save_store`.
+
+    Args:
+        path (Union[str, os.PathLike]): The file to read.
+        mmap (bool, optional): Memory-map the file, so the array columns are read-only views on the file
+            and only the pages that are used are read. Otherwise the file is read into memory at once.
+            Defaults to True.
+
+    Raises:
+        ValueError: If the file is not an annotation file or is written by a newer version.
+
+    Returns:
+        AnnotationStore: The stored annotations.
+    """
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        buffer = np.fromfile(path, dtype=np.uint8)
+
+    if len(buffer) < PREFIX.size:
+        raise ValueError(f"{path} is not an annotation file.")
+    magic, version, header_length = PREFIX.unpack(buffer[: PREFIX.size].tobytes())
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not an annotation file.")
+    if version > FORMAT_VERSION:
+        raise ValueError(
+            f"{path} has format version {version}, this version of tomni reads up to version {FORMAT_VERSION}."
+        )
+
+    header = load_json(buffer[PREFIX.size : PREFIX.size + header_length].tobytes())
+    data_start = _align(PREFIX.size + header_length)
+    arrays = {
+        name: _view(buffer, data_start, section)
+        for name, section in header["sections"].items()
+    }
+    metadata = load_json(arrays["metadata"].tobytes())
+
+    return AnnotationStore(
+        ids=_object_array(metadata["ids"]),
+        label_table=header["label_table"],
+        children=_object_array(metadata["children"]),
+        parents=_object_array(metadata["parents"]),
+        features=_features(arrays),
+        **{name: arrays[name] for name in ARRAY_COLUMNS},
+    )
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _view(buffer: np.ndarray, data_start: int, section: dict) -> np.ndarray:
+    dtype = np.dtype(section["dtype"])
+    start = data_start + section["offset"]
+    nbytes = int(np.prod(section["shape"], dtype=np.int64)) * dtype.itemsize
+    array = buffer[start : start + nbytes].view(dtype).reshape(section["shape"])
+    # Plain arrays behave as every other column, the memory map stays open through the base.
+    return array.view(np.ndarray)
+
+
+def _features(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    return {
+        name[len(FEATURE_PREFIX) :]: array
+        for name, array in arrays.items()
+        if name.startswith(FEATURE_PREFIX)
+    }
@@ -0,0 +1,125 @@
+import os
+import struct
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from tomni.annotation_manager.annotations import Ellipse, Point, Polygon
+from tomni.annotation_manager.features import calculate_features
+from tomni.annotation_manager.store import AnnotationStore
+
+from .main import FORMAT_VERSION, MAGIC, PREFIX, load_store, save_store
+
+
+class TestSerialization(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "annotations.tam")
+
+        square = [Point(0, 0), Point(5, 0), Point(10, 0), Point(10, 10), Point(0, 10)]
+        hole = [Point(2, 2), Point(4, 2), Point(4, 4), Point(3, 4), Point(2, 4)]
+        self.store = AnnotationStore.from_annotations(
+            [
+                Polygon(
+                    points=square,
+                    inner_points=[hole],
+                    id="a",
+                    label="cell",
+                    children=["b"],
+                    accuracy=0.5,
+                ),
+                Ellipse(
+                    center=Point(20, 30),
+                    radius_x=4,
+                    radius_y=2.5,
+                    rotation=30,
+                    id="b",
+                    parents=["a"],
+                ),
+                Polygon(points=square, id="c", label=None),
+            ]
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_stores_equal(self, expected, actual):
+        for column in [
+            "types",
+            "label_codes",
+            "accuracy",
+            "vertices",
+            "ring_offsets",
+            "object_rings",
+            "centers",
+            "radii",
+            "rotations",
+        ]:
+            np.testing.assert_array_equal(
+                getattr(actual, column), getattr(expected, column), err_msg=column
+            )
+            self.assertEqual(
+                getattr(actual, column).dtype, getattr(expected, column).dtype
+            )
+        self.assertEqual(actual.ids.tolist(), expected.ids.tolist())
+        self.assertEqual(actual.children.tolist(), expected.children.tolist())
+        self.assertEqual(actual.parents.tolist(), expected.parents.tolist())
+        self.assertEqual(actual.label_table, expected.label_table)
+
+    def test_round_trip(self):
+        for mmap in [True, False]:
+            save_store(self.store, self.path)
+
+            actual = load_store(self.path, mmap=mmap)
+
+            self.assert_stores_equal(self.store, actual)
+            self.assertEqual(
+                [a.to_dict() for a in actual.to_annotations()],
+                [a.to_dict() for a in self.store.to_annotations()],
+            )
+            del actual
+
+    def test_memory_mapped_columns_are_read_only(self):
+        save_store(self.store, self.path)
+
+        actual = load_store(self.path)
+
+        self.assertFalse(actual.vertices.flags.writeable)
+        self.assertIsInstance(actual.vertices, np.ndarray)
+        del actual
+
+    def test_features(self):
+        columns = calculate_features(self.store, ["area", "major_axis"])
+
+        save_store(self.store, self.path)
+        with_features = load_store(self.path)
+        save_store(self.store, self.path, include_features=False)
+        without_features = load_store(self.path)
+
+        np.testing.assert_array_equal(with_features.features["area"], columns["area"])
+        self.assertIn("_axes", with_features.features)
+        self.assertEqual(without_features.features, {})
+        del with_features, without_features
+
+    def test_empty_store(self):
+        save_store(AnnotationStore.empty(), self.path)
+
+        actual = load_store(self.path)
+
+        self.assertEqual(len(actual), 0)
+        self.assertEqual(actual.vertices.shape, (0, 2))
+        del actual
+
+    def test_newer_version(self):
+        save_store(self.store, self.path)
+        with open(self.path, "r+b") as f:
+            f.write(struct.pack("<8sI", MAGIC, FORMAT_VERSION + 1))
+
+        self.assertRaises(ValueError, load_store, self.path)
+
+    def test_not_an_annotation_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"[]" * PREFIX.size)
+
+        self.assertRaises(ValueError, load_store, self.path)
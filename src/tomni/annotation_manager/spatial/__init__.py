@@ -0,0 +1 @@
+from .main import MaskIndex, iou_pairs, store_footprints, store_geometries
@@ -0,0 +1,243 @@
+from typing import List, Tuple, Union
+
+import numpy as np
+import shapely
+
+from tomni.annotation_manager.store import POLYGON, AnnotationStore
+from tomni.annotation_manager.store.main import concatenated_ranges
+from tomni.annotation_manager.utils.overlap_object.main import (
+    Footprints,
+    create_ellipses,
+    ellipse_footprint,
+    objects2footprints,
+    objects2shapes,
+    overlap_matrix,
+    polygon_footprint,
+    repair_polygon,
+    validate_overlap_backend,
+)
+
+
+def store_geometries(store: AnnotationStore) -> np.ndarray:
+    """Creates the shapely geometry of every annotation, the same shapes `object2shape` creates from their dicts.
+
+    The outer contours of all polygons are converted in one call, only invalid polygons are repaired one by one.
+    Ellipses are created at once with `create_ellipses`.
+    Inner contours are ignored, as in `is_in_mask` of the annotations.
+
+    Args:
+        store (AnnotationStore): The annotations.
+
+    Returns:
+        np.ndarray: Object array with a shapely geometry per annotation.
+    """
+    geometries = np.empty(len(store), dtype=object)
+    geometries[:] = [shapely.Polygon()] * len(store)
+
+    rows = np.flatnonzero(store.types == POLYGON)
+    outer_rings = store.object_rings[:-1][rows]
+    starts = store.ring_offsets[outer_rings]
+    counts = store.ring_offsets[outer_rings + 1] - starts
+    # Fewer than 3 points do not enclose an area.
+    has_area = counts >= 3
+    rows, starts, counts = rows[has_area], starts[has_area], counts[has_area]
+
+    if len(rows):
+        coordinates = store.vertices[concatenated_ranges(starts, counts)]
+        ring_indices = np.repeat(np.arange(len(rows)), counts)
+        polygons = shapely.polygons(
+            shapely.linearrings(coordinates, indices=ring_indices)
+        )
+        for idx in np.flatnonzero(~shapely.is_valid(polygons)):
+            polygons[idx] = repair_polygon(polygons[idx])
+        geometries[rows] = polygons
+
+    rows = np.flatnonzero(store.types != POLYGON)
+    if len(rows):
+        geometries[rows] = create_ellipses(
+            store.centers[rows], store.radii[rows], store.rotations[rows]
+        )
+    return geometries
+
+
+def store_footprints(store: AnnotationStore) -> Footprints:
+    """Draws every annotation into a binary footprint of its bounding box, for the raster backend of `overlap_matrix`.
+    Inner contours are ignored, as in `store_geometries`.
+
+    Args:
+        store (AnnotationStore): The annotations.
+
+    Returns:
+        Footprints: The boolean footprint of every annotation and an array of shape [N, 2] with their top left corners.
+    """
+    footprints = []
+    corners = np.zeros((len(store), 2), dtype=np.int64)
+    for row in range(len(store)):
+        if store.types[row] == POLYGON:
+            footprint, corners[row] = polygon_footprint(store.outer_contour(row))
+        else:
+            center_x, center_y, radius_x, radius_y, rotation = store.ellipse_parameters(
+                row
+            )
+            footprint, corners[row] = ellipse_footprint(
+                (center_x, center_y), (radius_x, radius_y), rotation
+            )
+        footprints.append(footprint)
+    return footprints, corners
+
+
+def iou_pairs(
+    geometries: np.ndarray,
+    other_geometries: Union[np.ndarray, None] = None,
+    min_iou: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Finds the pairs of intersecting geometries with an STRtree and calculates their intersection over union in bulk.
+
+    Args:
+        geometries (np.ndarray): Shapely geometries, e.g. from `store_geometries`.
+        other_geometries (Union[np.ndarray, None], optional): Geometries to pair with. Defaults to None,
+            which pairs the geometries with each other, every pair once with the lowest index first.
+        min_iou (float, optional): Pairs that certainly have a lower intersection over union, judged by their areas
+            and the overlap of their bounding boxes, are skipped without intersecting them. Defaults to 0.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Index of the first geometry of every pair, index of the second
+        geometry (in `other_geometries` if given) and their intersection over union, 0 for geometries without area.
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    is_self = other_geometries is None
+    other_geometries = (
+        geometries if is_self else np.asarray(other_geometries, dtype=object)
+    )
+    first, second = shapely.STRtree(other_geometries).query(
+        geometries, predicate="intersects"
+    )
+    if is_self:
+        is_pair = first < second
+        first, second = first[is_pair], second[is_pair]
+
+    areas = shapely.area(geometries)[first]
+    other_areas = shapely.area(other_geometries)[second]
+    if min_iou > 0:
+        # The intersection is at most the smaller area and the overlap of the bounding boxes.
+        bounds = shapely.bounds(geometries)[first]
+        other_bounds = shapely.bounds(other_geometries)[second]
+        overlap = np.prod(
+            np.clip(
+                np.minimum(bounds[:, 2:], other_bounds[:, 2:])
+                - np.maximum(bounds[:, :2], other_bounds[:, :2]),
+                0,
+                None,
+            ),
+            axis=1,
+        )
+        max_intersections = np.minimum(np.minimum(areas, other_areas), overlap)
+        # A little slack keeps pairs whose intersection over union equals min_iou despite rounding.
+        is_candidate = max_intersections >= (1 - 1e-9) * min_iou * (
+            areas + other_areas - max_intersections
+        )
+        first, second = first[is_candidate], second[is_candidate]
+        areas, other_areas = areas[is_candidate], other_areas[is_candidate]
+
+    intersections = shapely.area(
+        shapely.intersection(geometries[first], other_geometries[second])
+    )
+    unions = areas + other_areas - intersections
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ious = np.where(unions > 0, intersections / unions, 0.0)
+    return first.astype(np.int64), second.astype(np.int64), ious
+
+
+class MaskIndex:
+    """A spatial index over the regions of a mask in AxionBio dict format.
+
+    The geometries of the mask regions are created and prepared once and stored in an STRtree,
+    so the overlap of many annotations with the mask is found with one query instead of a loop over every region.
+
+    Args:
+        mask_json (List[dict]): A list of dict masks in AxionBio dict format.
+        backend (str, optional): "shapely" intersects the geometries, "raster" counts the shared pixels of
+            footprints, see `overlap_matrix`. Defaults to "shapely".
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+
+    def __init__(self, mask_json: List[dict], backend: str = "shapely"):
+        self.backend = validate_overlap_backend(backend)
+        if backend == "raster":
+            self.footprints = objects2footprints(mask_json)
+            return
+        self.geometries = objects2shapes(mask_json)
+        shapely.prepare(self.geometries)
+        self.tree = shapely.STRtree(self.geometries)
+
+    def __len__(self) -> int:
+        if self.backend == "raster":
+            return len(self.footprints[0])
+        return len(self.geometries)
+
+    def shapes(self, store: AnnotationStore) -> Union[np.ndarray, Footprints]:
+        """The annotations of a store in the representation of the backend:
+        `store_geometries` for "shapely" and `store_footprints` for "raster".
+        """
+        if self.backend == "raster":
+            return store_footprints(store)
+        return store_geometries(store)
+
+    def overlap_ratios(self, geometries: Union[np.ndarray, Footprints]) -> np.ndarray:
+        """Calculates for every geometry the largest fraction of its area that overlaps with a single mask region.
+
+        Args:
+            geometries (Union[np.ndarray, Footprints]): Shapely geometries, e.g. from `store_geometries`,
+                or footprints for the raster backend, e.g. from `shapes`.
+
+        Returns:
+            np.ndarray: The overlap ratio per geometry between 0 and 1, 0 if it overlaps with no region.
+        """
+        if self.backend == "raster":
+            ratios = np.zeros(len(geometries[0]))
+            if len(self) > 0 and len(ratios) > 0:
+                ratios[:] = (
+                    overlap_matrix(geometries, self.footprints, backend="raster")
+                    .max(axis=1)
+                    .toarray()
+                    .ravel()
+                )
+            return ratios
+
+        geometries = np.asarray(geometries, dtype=object)
+        ratios = np.zeros(len(geometries))
+        if len(self) == 0 or len(geometries) == 0:
+            return ratios
+
+        input_idx, mask_idx = self.tree.query(geometries, predicate="intersects")
+        intersections = shapely.intersection(
+            geometries[input_idx], self.geometries[mask_idx]
+        )
+        pair_ratios = shapely.area(intersections) / (
+            shapely.area(geometries[input_idx]) + 1e-17
+        )
+        np.maximum.at(ratios, input_idx, pair_ratios)
+        return ratios
+
+    def is_in_mask(
+        self, geometries: Union[np.ndarray, Footprints], min_overlap: float = 0.9
+    ) -> np.ndarray:
+        """Checks for every geometry if it overlaps enough with any of the mask regions.
+
+        Args:
+            geometries (Union[np.ndarray, Footprints]): Shapely geometries, e.g. from `store_geometries`,
+                or footprints for the raster backend, e.g. from `shapes`.
+            min_overlap (float, optional): Minimum overlap required between a geometry and a mask region,
+                expressed as a value between 0 and 1. Defaults to 0.9.
+
+        Returns:
+            np.ndarray: Boolean array, True if the geometry is within a mask region and meets the required overlap.
+        """
+        if len(self) == 0:
+            n_geometries = len(
+                geometries[0] if self.backend == "raster" else geometries
+            )
+            return np.zeros(n_geometries, dtype=bool)
+        return self.overlap_ratios(geometries) >= min_overlap
@@ -0,0 +1,148 @@
+from unittest import TestCase
+
+import cv2
+import numpy as np
+import shapely
+
+from tomni.annotation_manager import AnnotationManager
+from tomni.annotation_manager.annotations import Ellipse, Point, Polygon
+from tomni.annotation_manager.store import AnnotationStore
+from tomni.annotation_manager.utils.overlap_object.main import (
+    object2shape,
+    objects2footprints,
+)
+
+from .main import MaskIndex, store_footprints, store_geometries
+
+
+class TestSpatial(TestCase):
+    def setUp(self) -> None:
+        mask = np.zeros((300, 300), dtype=np.uint8)
+        rng = np.random.default_rng(0)
+        for x, y in rng.integers(10, 290, size=(40, 2)):
+            cv2.circle(mask, (int(x), int(y)), int(rng.integers(3, 12)), 1, -1)
+        polygons = AnnotationManager.from_binary_mask(mask).annotations
+        bowtie = Polygon(
+            points=[
+                Point(100, 100),
+                Point(140, 140),
+                Point(140, 100),
+                Point(120, 120),
+                Point(100, 140),
+            ],
+            id="bowtie",
+        )
+        ellipses = [
+            Ellipse(radius_x=8, radius_y=4, center=Point(60, 60), rotation=30, id="1"),
+            Ellipse(radius_x=5, radius_y=5, center=Point(150, 250), rotation=0, id="2"),
+        ]
+        self.annotations = polygons + [bowtie] + ellipses
+        self.store = AnnotationStore.from_annotations(self.annotations)
+
+        self.mask_json = [
+            {
+                "type": "polygon",
+                "points": [
+                    {"x": 0, "y": 0},
+                    {"x": 150, "y": 0},
+                    {"x": 150, "y": 150},
+                    {"x": 0, "y": 150},
+                ],
+            },
+            {
+                "type": "ellipse",
+                "center": {"x": 220, "y": 220},
+                "radiusX": 70,
+                "radiusY": 50,
+                "angleOfRotation": 20,
+            },
+        ]
+
+    def test_store_geometries_equal_object2shape(self):
+        geometries = store_geometries(self.store)
+
+        for geometry, annotation in zip(geometries, self.annotations):
+            annotation_dict = annotation.to_dict(features=[])
+            if annotation_dict["type"] == "polygon":
+                annotation_dict["points"] = [
+                    {"x": point.x, "y": point.y} for point in annotation.points
+                ]
+            self.assertTrue(
+                shapely.equals_exact(geometry, object2shape(annotation_dict))
+            )
+
+    def test_overlap_ratios(self):
+        square = shapely.box(140, 10, 160, 30)
+        outside = shapely.box(200, 10, 210, 20)
+
+        actual = MaskIndex(self.mask_json).overlap_ratios([square, outside])
+
+        np.testing.assert_allclose(actual, [0.5, 0])
+
+    def test_is_in_mask_equals_annotations(self):
+        expected = [
+            annotation.is_in_mask(self.mask_json, 0.9)
+            for annotation in self.annotations
+        ]
+
+        actual = MaskIndex(self.mask_json).is_in_mask(store_geometries(self.store), 0.9)
+
+        np.testing.assert_array_equal(actual, expected)
+        self.assertTrue(actual.any())
+        self.assertFalse(actual.all())
+
+    def test_empty_mask(self):
+        actual = MaskIndex([]).is_in_mask(store_geometries(self.store), 0)
+
+        np.testing.assert_array_equal(actual, np.zeros(len(self.store), dtype=bool))
+
+    def test_store_footprints_equal_objects2footprints(self):
+        annotation_dicts = []
+        for annotation in self.annotations:
+            annotation_dict = annotation.to_dict(features=[])
+            if annotation_dict["type"] == "polygon":
+                annotation_dict["points"] = [
+                    {"x": point.x, "y": point.y} for point in annotation.points
+                ]
+            annotation_dicts.append(annotation_dict)
+
+        footprints, corners = store_footprints(self.store)
+        expected_footprints, expected_corners = objects2footprints(annotation_dicts)
+
+        np.testing.assert_array_equal(corners, expected_corners)
+        for footprint, expected in zip(footprints, expected_footprints):
+            np.testing.assert_array_equal(footprint, expected)
+
+    def test_raster_is_in_mask_equals_annotations(self):
+        expected = [
+            annotation.is_in_mask(self.mask_json, 0.9, backend="raster")
+            for annotation in self.annotations
+        ]
+        mask_index = MaskIndex(self.mask_json, backend="raster")
+
+        actual = mask_index.is_in_mask(mask_index.shapes(self.store), 0.9)
+
+        np.testing.assert_array_equal(actual, expected)
+        self.assertTrue(actual.any())
+        self.assertFalse(actual.all())
+
+    def test_raster_overlap_ratios_close_to_shapely(self):
+        shapely_index = MaskIndex(self.mask_json)
+        raster_index = MaskIndex(self.mask_json, backend="raster")
+
+        expected = shapely_index.overlap_ratios(shapely_index.shapes(self.store))
+        actual = raster_index.overlap_ratios(raster_index.shapes(self.store))
+
+        # Only objects on the border of a region differ, by their boundary pixels.
+        np.testing.assert_allclose(actual, expected, atol=0.25)
+        np.testing.assert_array_equal(actual == 0, expected == 0)
+
+    def test_raster_empty_mask(self):
+        mask_index = MaskIndex([], backend="raster")
+
+        actual = mask_index.is_in_mask(mask_index.shapes(self.store), 0)
+
+        np.testing.assert_array_equal(actual, np.zeros(len(self.store), dtype=bool))
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, MaskIndex, self.mask_json, backend="gpu")
@@ -0,0 +1,579 @@
+import uuid
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from tomni.annotation_manager.annotations import Annotation, Ellipse, Polygon
+from tomni.annotation_manager.annotations.polygon.main import MIN_NR_POINTS_POLYGON
+from tomni.annotation_manager.utils.simplify_rings import simplify_rings
+from tomni.make_mask.rasterize import fill_ellipse, fill_polygon
+
+POLYGON = 0
+ELLIPSE = 1
+
+
+def concatenated_ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenates the ranges [start, start + count) without a Python loop.
+
+    Args:
+        starts (np.ndarray): First index of every range.
+        counts (np.ndarray): Length of every range.
+
+    Returns:
+        np.ndarray: All indices of the ranges after each other.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # Offset of every range in the output, so each range restarts at its own start.
+    range_offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - range_offsets, counts) + np.arange(total, dtype=np.int64)
+
+
+class AnnotationStore(object):
+    def __init__(
+        self,
+        types: np.ndarray,
+        ids: np.ndarray,
+        label_codes: np.ndarray,
+        label_table: List[Union[str, None]],
+        accuracy: np.ndarray,
+        children: np.ndarray,
+        parents: np.ndarray,
+        vertices: np.ndarray,
+        ring_offsets: np.ndarray,
+        object_rings: np.ndarray,
+        centers: np.ndarray,
+        radii: np.ndarray,
+        rotations: np.ndarray,
+        features: Union[Dict[str, np.ndarray], None] = None,
+    ):
+        """Initializes an AnnotationStore: a struct-of-arrays representation of a collection of annotations.
+
+        All polygon vertices are kept in one flat int32 buffer. Every polygon consists of one or more rings:
+        the first ring is the outer contour, the remaining rings are the inner contours.
+        Row `i` owns the rings `object_rings[i]:object_rings[i + 1]` and ring `r` owns the vertices
+        `ring_offsets[r]:ring_offsets[r + 1]`. Ellipses own no rings.
+
+        Args:
+            types (np.ndarray): Type of every annotation, POLYGON or ELLIPSE. Shape [N].
+            ids (np.ndarray): Object array with the id of every annotation. Shape [N].
+            label_codes (np.ndarray): Index into `label_table` for every annotation. Shape [N].
+            label_table (List[Union[str, None]]): The unique labels.
+            accuracy (np.ndarray): Accuracy of every annotation. Shape [N].
+            children (np.ndarray): Object array with the children of every annotation. Shape [N].
+            parents (np.ndarray): Object array with the parents of every annotation. Shape [N].
+            vertices (np.ndarray): The vertices of all rings. Shape [V, 2] with dtype int32.
+            ring_offsets (np.ndarray): Start of every ring in `vertices`. Shape [R + 1].
+            object_rings (np.ndarray): Start of every annotation in the rings. Shape [N + 1].
+            centers (np.ndarray): Center (x, y) of the ellipses, 0 for polygons. Shape [N, 2].
+            radii (np.ndarray): Radii (x, y) of the ellipses, 0 for polygons. Shape [N, 2].
+            rotations (np.ndarray): Rotation in degrees of the ellipses, 0 for polygons. Shape [N].
+            features (Union[Dict[str, np.ndarray], None], optional): Cached feature columns in pixel units.
+                Defaults to None, which starts with an empty cache.
+        """
+        self.types = types
+        self.ids = ids
+        self.label_codes = label_codes
+        self.label_table = label_table
+        self.accuracy = accuracy
+        self.children = children
+        self.parents = parents
+        self.vertices = vertices
+        self.ring_offsets = ring_offsets
+        self.object_rings = object_rings
+        self.centers = centers
+        self.radii = radii
+        self.rotations = rotations
+        self.features = {} if features is None else features
+
+    @classmethod
+    def empty(cls) -> "AnnotationStore":
+        """Creates a store without annotations."""
+        return cls.from_annotations([])
+
+    @classmethod
+    def from_annotations(cls, annotations: Sequence[Annotation]) -> "AnnotationStore":
+        """Creates a store from Polygon and Ellipse objects.
+
+        Args:
+            annotations (Sequence[Annotation]): Collection of polygons and ellipses.
+
+        Raises:
+            TypeError: If an annotation is not a Polygon or an Ellipse.
+
+        Returns:
+            AnnotationStore: A store with the geometry and metadata of the annotations.
+        """
+        n_annotations = len(annotations)
+        types = np.zeros(n_annotations, dtype=np.uint8)
+        ids = np.empty(n_annotations, dtype=object)
+        children = np.empty(n_annotations, dtype=object)
+        parents = np.empty(n_annotations, dtype=object)
+        accuracy = np.ones(n_annotations, dtype=np.float64)
+        centers = np.zeros((n_annotations, 2), dtype=np.float64)
+        radii = np.zeros((n_annotations, 2), dtype=np.float64)
+        rotations = np.zeros(n_annotations, dtype=np.float64)
+        labels = []
+        rings = []
+        rings_per_object = np.zeros(n_annotations, dtype=np.int64)
+
+        for i, annotation in enumerate(annotations):
+            ids[i] = annotation._id
+            children[i] = annotation._children
+            parents[i] = annotation._parents
+            accuracy[i] = annotation._accuracy
+            labels.append(annotation._label)
+
+            if isinstance(annotation, Polygon):
+                types[i] = POLYGON
+                object_rings = [annotation._contour, *annotation._inner_contours]
+                rings.extend(object_rings)
+                rings_per_object[i] = len(object_rings)
+            elif isinstance(annotation, Ellipse):
+                types[i] = ELLIPSE
+                centers[i] = (annotation.center.x, annotation.center.y)
+                radii[i] = (annotation.radius_x, annotation.radius_y)
+                rotations[i] = annotation.rotation
+            else:
+                raise TypeError(
+                    f"AnnotationStore only supports Polygon and Ellipse annotations, not {type(annotation).__name__}."
+                )
+
+        label_table, label_codes = _encode_labels(labels)
+        ring_lengths = np.array([len(ring) for ring in rings], dtype=np.int64)
+        if rings:
+            vertices = np.concatenate([ring.reshape(-1, 2) for ring in rings])
+        else:
+            vertices = np.zeros((0, 2), dtype=np.int32)
+
+        return cls(
+            types=types,
+            ids=ids,
+            label_codes=label_codes,
+            label_table=label_table,
+            accuracy=accuracy,
+            children=children,
+            parents=parents,
+            vertices=vertices.astype(np.int32, copy=False),
+            ring_offsets=_lengths_to_offsets(ring_lengths),
+            object_rings=_lengths_to_offsets(rings_per_object),
+            centers=centers,
+            radii=radii,
+            rotations=rotations,
+        )
+
+    @classmethod
+    def from_dicts(cls, dicts: Sequence[dict]) -> "AnnotationStore":
+        """Creates a store from dicts in AxionBio format without creating Point, Polygon or Ellipse objects.
+
+        The coordinates of all polygons are collected in one pass and converted to the vertex buffer at once.
+        Polygons with fewer than 5 points are skipped and missing ids get a uuid4, as in `AnnotationManager.from_dicts`.
+        Non-integral coordinates are truncated to int32, as in the contours of a Polygon.
+
+        Args:
+            dicts (Sequence[dict]): Annotations in AxionBio format.
+
+        Raises:
+            ValueError: If a dict is not a polygon or an ellipse.
+
+        Returns:
+            AnnotationStore: A store with the geometry and metadata of the dicts.
+        """
+        return cls._from_dicts(dicts)[0]
+
+    @classmethod
+    def _from_dicts(
+        cls, dicts: Sequence[dict]
+    ) -> Tuple["AnnotationStore", Dict[int, dict]]:
+        """`from_dicts` that also returns the dicts of the polygons with non-integral coordinates by row,
+        since their points are not kept exactly in the vertex buffer.
+        """
+        get_xy = itemgetter("x", "y")
+        types = []
+        ids = []
+        labels = []
+        children = []
+        parents = []
+        accuracy = []
+        row_dicts = []
+        ellipse_rows = []
+        ellipse_values = []
+        coordinates = []
+        ring_lengths = []
+        rings_per_object = []
+
+        for d in dicts:
+            if d["type"] == "ellipse":
+                center = d["center"]
+                ellipse_rows.append(len(types))
+                ellipse_values.append(
+                    (
+                        center["x"],
+                        center["y"],
+                        d["radiusX"],
+                        # A missing or zero radius y is a circle, as in Ellipse.
+                        d.get("radiusY", None) or d["radiusX"],
+                        d["angleOfRotation"],
+                    )
+                )
+                types.append(ELLIPSE)
+                rings_per_object.append(0)
+            elif d["type"] == "polygon":
+                if len(d["points"]) < MIN_NR_POINTS_POLYGON:
+                    continue
+                object_rings = [d["points"], *d.get("inner_points", [])]
+                for ring in object_rings:
+                    coordinates.extend(map(get_xy, ring))
+                    ring_lengths.append(len(ring))
+                types.append(POLYGON)
+                rings_per_object.append(len(object_rings))
+            else:
+                raise ValueError(
+                    f"CDF cannot be created. Dict with id {d.get('id', None)} misses type-key with value ellipse or polygon."
+                )
+
+            row_dicts.append(d)
+            ids.append(d["id"] if "id" in d else str(uuid.uuid4()))
+            labels.append(d.get("label", None))
+            children.append(d.get("children", []))
+            parents.append(d.get("parents", []))
+            accuracy.append(d.get("accuracy", 1))
+
+        n_annotations = len(types)
+        vertices = np.fromiter(
+            chain.from_iterable(coordinates),
+            dtype=np.float64,
+            count=2 * len(coordinates),
+        ).reshape(-1, 2)
+        rings_per_object = np.array(rings_per_object, dtype=np.int64)
+        ring_lengths = np.array(ring_lengths, dtype=np.int64)
+        is_fractional = np.any(vertices != np.trunc(vertices), axis=1)
+        fractional_rows = np.unique(
+            np.repeat(
+                np.repeat(np.arange(n_annotations), rings_per_object), ring_lengths
+            )[is_fractional]
+        )
+
+        centers = np.zeros((n_annotations, 2), dtype=np.float64)
+        radii = np.zeros((n_annotations, 2), dtype=np.float64)
+        rotations = np.zeros(n_annotations, dtype=np.float64)
+        if ellipse_rows:
+            ellipse_values = np.array(ellipse_values, dtype=np.float64)
+            # Same normalisation as the rotation setter of Ellipse: rotations in [0, 90) with swapped radii.
+            ellipse_rotations = np.mod(ellipse_values[:, 4], 180)
+            is_flipped = ellipse_rotations >= 90
+            ellipse_values[is_flipped, 2:4] = ellipse_values[is_flipped, 3:1:-1]
+            ellipse_rotations[is_flipped] = np.mod(ellipse_rotations[is_flipped], 90)
+            centers[ellipse_rows] = ellipse_values[:, :2]
+            radii[ellipse_rows] = ellipse_values[:, 2:4]
+            rotations[ellipse_rows] = ellipse_rotations
+
+        label_table, label_codes = _encode_labels(labels)
+        store = cls(
+            types=np.array(types, dtype=np.uint8),
+            ids=_object_array(ids),
+            label_codes=label_codes,
+            label_table=label_table,
+            accuracy=np.array(accuracy, dtype=np.float64),
+            children=_object_array(children),
+            parents=_object_array(parents),
+            vertices=vertices.astype(np.int32),
+            ring_offsets=_lengths_to_offsets(ring_lengths),
+            object_rings=_lengths_to_offsets(rings_per_object),
+            centers=centers,
+            radii=radii,
+            rotations=rotations,
+        )
+        return store, {row: row_dicts[row] for row in fractional_rows.tolist()}
+
+    @classmethod
+    def concatenate(cls, stores: Sequence["AnnotationStore"]) -> "AnnotationStore":
+        """Concatenates stores into one store, keeping the order of the rows.
+
+        Args:
+            stores (Sequence[AnnotationStore]): The stores to concatenate.
+
+        Returns:
+            AnnotationStore: A store with the rows of all stores.
+        """
+        stores = [store for store in stores if len(store) > 0]
+        if len(stores) == 0:
+            return cls.empty()
+        if len(stores) == 1:
+            return stores[0]
+
+        label_table = []
+        label_codes = []
+        for store in stores:
+            code_map = np.array(
+                [_add_label(label_table, label) for label in store.label_table],
+                dtype=np.int32,
+            )
+            label_codes.append(code_map[store.label_codes])
+
+        ring_offsets = [np.zeros(1, dtype=np.int64)]
+        object_rings = [np.zeros(1, dtype=np.int64)]
+        n_vertices = 0
+        n_rings = 0
+        for store in stores:
+            ring_offsets.append(store.ring_offsets[1:] + n_vertices)
+            object_rings.append(store.object_rings[1:] + n_rings)
+            n_vertices += len(store.vertices)
+            n_rings += store.n_rings
+
+        return cls(
+            types=np.concatenate([store.types for store in stores]),
+            ids=np.concatenate([store.ids for store in stores]),
+            label_codes=np.concatenate(label_codes),
+            label_table=label_table,
+            accuracy=np.concatenate([store.accuracy for store in stores]),
+            children=np.concatenate([store.children for store in stores]),
+            parents=np.concatenate([store.parents for store in stores]),
+            vertices=np.concatenate([store.vertices for store in stores]),
+            ring_offsets=np.concatenate(ring_offsets),
+            object_rings=np.concatenate(object_rings),
+            centers=np.concatenate([store.centers for store in stores]),
+            radii=np.concatenate([store.radii for store in stores]),
+            rotations=np.concatenate([store.rotations for store in stores]),
+            features={
+                name: np.concatenate([store.features[name] for store in stores])
+                for name in set.intersection(*[set(store.features) for store in stores])
+            },
+        )
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    @property
+    def n_rings(self) -> int:
+        return len(self.ring_offsets) - 1
+
+    @property
+    def labels(self) -> np.ndarray:
+        """Object array with the label of every annotation."""
+        label_table = np.empty(len(self.label_table), dtype=object)
+        label_table[:] = self.label_table
+        return label_table[self.label_codes]
+
+    @property
+    def outer_rings(self) -> np.ndarray:
+        """Index of the outer ring of every polygon, -1 for ellipses."""
+        return np.where(self.types == POLYGON, self.object_rings[:-1], -1)
+
+    def label(self, row: int) -> Union[str, None]:
+        return self.label_table[self.label_codes[row]]
+
+    def ring(self, ring_idx: int) -> np.ndarray:
+        """Returns a ring as cv2 contour of shape [N, 1, 2] that shares memory with the vertex buffer."""
+        start, stop = self.ring_offsets[ring_idx], self.ring_offsets[ring_idx + 1]
+        return self.vertices[start:stop].reshape(-1, 1, 2)
+
+    def outer_contour(self, row: int) -> np.ndarray:
+        if self.types[row] != POLYGON:
+            raise TypeError(f"Annotation at row {row} is not a polygon.")
+        return self.ring(self.object_rings[row])
+
+    def inner_contours(self, row: int) -> List[np.ndarray]:
+        first_ring, end_ring = self.object_rings[row], self.object_rings[row + 1]
+        return [self.ring(ring_idx) for ring_idx in range(first_ring + 1, end_ring)]
+
+    def ellipse_parameters(self, row: int) -> Tuple[float, float, float, float, float]:
+        """Returns the center x, center y, radius x, radius y and rotation of an ellipse.
+        Integral values are returned as int, so they can be passed to cv2 directly."""
+        if self.types[row] != ELLIPSE:
+            raise TypeError(f"Annotation at row {row} is not an ellipse.")
+        values = (*self.centers[row], *self.radii[row], self.rotations[row])
+        return tuple(int(v) if float(v).is_integer() else float(v) for v in values)
+
+    def annotation(self, row: int) -> Annotation:
+        """Returns the Polygon or Ellipse of a row. Polygons are views on the vertex buffer."""
+        if self.types[row] == POLYGON:
+            return Polygon._from_store(self, row)
+        return Ellipse._from_store(self, row)
+
+    def to_annotations(self) -> List[Annotation]:
+        return [self.annotation(row) for row in range(len(self))]
+
+    def take(self, indices: Union[np.ndarray, Sequence[int]]) -> "AnnotationStore":
+        """Creates a new store with the selected rows. The vertex buffer is compacted in one pass.
+
+        Args:
+            indices (Union[np.ndarray, Sequence[int]]): Row indices or a boolean mask over the rows.
+
+        Returns:
+            AnnotationStore: A store with only the selected rows, in the order of `indices`.
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        indices = indices.astype(np.int64, copy=False)
+
+        rings_per_object = np.diff(self.object_rings)[indices]
+        ring_indices = concatenated_ranges(self.object_rings[indices], rings_per_object)
+        ring_lengths = np.diff(self.ring_offsets)[ring_indices]
+        vertex_indices = concatenated_ranges(
+            self.ring_offsets[ring_indices], ring_lengths
+        )
+
+        return AnnotationStore(
+            types=self.types[indices],
+            ids=self.ids[indices],
+            label_codes=self.label_codes[indices],
+            label_table=self.label_table,
+            accuracy=self.accuracy[indices],
+            children=self.children[indices],
+            parents=self.parents[indices],
+            vertices=self.vertices[vertex_indices],
+            ring_offsets=_lengths_to_offsets(ring_lengths),
+            object_rings=_lengths_to_offsets(rings_per_object),
+            centers=self.centers[indices],
+            radii=self.radii[indices],
+            rotations=self.rotations[indices],
+            features={name: column[indices] for name, column in self.features.items()},
+        )
+
+    def simplify(
+        self,
+        epsilon: Union[float, None] = None,
+        max_vertices: Union[int, None] = None,
+    ) -> "AnnotationStore":
+        """Creates a new store with the rings of all polygons simplified in one call of `simplify_rings`.
+        Ellipses are kept as they are. Feature columns are not kept, since the geometry changes.
+
+        Args:
+            epsilon (Union[float, None], optional): Epsilon value in Ramer-Douglas-Peucker algorithm, as in
+                `compress_polygon_points`. Defaults to None.
+            max_vertices (Union[int, None], optional): The maximum number of vertices of every ring, vertices are
+                removed with the Visvalingam-Whyatt algorithm. Defaults to None.
+
+        Raises:
+            ValueError: If epsilon is negative or max_vertices is smaller than MIN_NR_POINTS_POLYGON.
+
+        Returns:
+            AnnotationStore: A store with the simplified polygons.
+        """
+        keep = simplify_rings(
+            self.vertices,
+            self.ring_offsets,
+            epsilon=epsilon,
+            max_vertices=max_vertices,
+            min_vertices=MIN_NR_POINTS_POLYGON,
+        )
+        ring_ids = np.repeat(np.arange(self.n_rings), np.diff(self.ring_offsets))
+        ring_lengths = np.bincount(ring_ids[keep], minlength=self.n_rings)
+
+        return AnnotationStore(
+            types=self.types,
+            ids=self.ids,
+            label_codes=self.label_codes,
+            label_table=self.label_table,
+            accuracy=self.accuracy,
+            children=self.children,
+            parents=self.parents,
+            vertices=self.vertices[keep],
+            ring_offsets=_lengths_to_offsets(ring_lengths),
+            object_rings=self.object_rings,
+            centers=self.centers,
+            radii=self.radii,
+            rotations=self.rotations,
+        )
+
+    def draw(
+        self,
+        canvas: np.ndarray,
+        values: Union[np.ndarray, int, float] = 1,
+        order: Union[np.ndarray, Sequence[int], None] = None,
+    ) -> np.ndarray:
+        """Draws all annotations into one canvas in place. Every annotation only touches its bounding box
+        and holes of polygons are cut per annotation, so they never erase other annotations.
+
+        Args:
+            canvas (np.ndarray): The 2D canvas to draw on.
+            values (Union[np.ndarray, int, float], optional): Pixel value of every annotation or one value for all.
+                Defaults to 1.
+            order (Union[np.ndarray, Sequence[int], None], optional): The rows in drawing order.
+                Later rows overwrite earlier rows. Defaults to None, which draws all rows in store order.
+
+        Returns:
+            np.ndarray: The canvas.
+        """
+        values = np.broadcast_to(values, (len(self),)).tolist()
+        rows = range(len(self)) if order is None else np.asarray(order).tolist()
+        for row in rows:
+            if self.types[row] == POLYGON:
+                fill_polygon(
+                    canvas,
+                    self.outer_contour(row),
+                    self.inner_contours(row),
+                    value=values[row],
+                )
+            else:
+                center_x, center_y, radius_x, radius_y, rotation = (
+                    self.ellipse_parameters(row)
+                )
+                fill_ellipse(
+                    canvas,
+                    (center_x, center_y),
+                    (radius_x, radius_y),
+                    rotation,
+                    value=values[row],
+                )
+        return canvas
+
+    def bounding_boxes(self) -> np.ndarray:
+        """Calculates the bounding box of every annotation.
+        Polygons use the extremes of their outer contour, ellipses use center -/+ radii.
+
+        Returns:
+            np.ndarray: Array of shape [N, 4] with min_x, min_y, max_x and max_y of every annotation.
+        """
+        bboxes = np.empty((len(self), 4), dtype=np.float64)
+        bboxes[:, :2] = self.centers - self.radii
+        bboxes[:, 2:] = self.centers + self.radii
+
+        is_polygon = self.types == POLYGON
+        if np.any(is_polygon):
+            outer_rings = self.object_rings[:-1][is_polygon]
+            starts = self.ring_offsets[:-1][outer_rings]
+            # Every outer ring is followed by its own inner rings, which lie within it.
+            bboxes[is_polygon, :2] = np.minimum.reduceat(self.vertices, starts, axis=0)
+            bboxes[is_polygon, 2:] = np.maximum.reduceat(self.vertices, starts, axis=0)
+        return bboxes
+
+
+def _lengths_to_offsets(lengths: np.ndarray) -> np.ndarray:
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def _object_array(values: List) -> np.ndarray:
+    """1D object array, also when the values are lists of equal length."""
+    array = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        array[i] = value
+    return array
+
+
+def _add_label(label_table: List[Union[str, None]], label: Union[str, None]) -> int:
+    try:
+        return label_table.index(label)
+    except ValueError:
+        label_table.append(label)
+        return len(label_table) - 1
+
+
+def _encode_labels(
+    labels: List[Union[str, None]]
+) -> Tuple[List[Union[str, None]], np.ndarray]:
+    codes_by_label = {}
+    label_codes = np.empty(len(labels), dtype=np.int32)
+    for i, label in enumerate(labels):
+        label_codes[i] = codes_by_label.setdefault(label, len(codes_by_label))
+    return list(codes_by_label), label_codes
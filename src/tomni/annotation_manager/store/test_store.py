@@ -0,0 +1,261 @@
+from unittest import TestCase
+
+import numpy as np
+
+from tomni.annotation_manager import AnnotationManager
+from tomni.annotation_manager.annotations import Ellipse, Point, Polygon
+
+from .main import ELLIPSE, POLYGON, AnnotationStore, concatenated_ranges
+
+
+class TestAnnotationStore(TestCase):
+    def setUp(self) -> None:
+        self.square = Polygon(
+            points=[
+                Point(0, 0),
+                Point(5, 0),
+                Point(10, 0),
+                Point(10, 10),
+                Point(0, 10),
+            ],
+            inner_points=[
+                [Point(2, 2), Point(4, 2), Point(4, 4), Point(3, 4), Point(2, 4)]
+            ],
+            id="square",
+            label="cell",
+            accuracy=0.5,
+        )
+        self.ellipse = Ellipse(
+            radius_x=3,
+            radius_y=2,
+            center=Point(20, 30),
+            rotation=10,
+            id="ellipse",
+            label="well",
+        )
+        self.triangle = Polygon(
+            points=[
+                Point(50, 50),
+                Point(55, 50),
+                Point(60, 50),
+                Point(55, 55),
+                Point(50, 55),
+            ],
+            id="triangle",
+            label="cell",
+        )
+        self.store = AnnotationStore.from_annotations(
+            [self.square, self.ellipse, self.triangle]
+        )
+
+    def test_columns(self):
+        np.testing.assert_array_equal(self.store.types, [POLYGON, ELLIPSE, POLYGON])
+        self.assertEqual(list(self.store.ids), ["square", "ellipse", "triangle"])
+        self.assertEqual(list(self.store.labels), ["cell", "well", "cell"])
+        self.assertEqual(self.store.label_table, ["cell", "well"])
+        np.testing.assert_array_equal(self.store.accuracy, [0.5, 1, 1])
+        self.assertEqual(self.store.vertices.dtype, np.int32)
+        self.assertEqual(self.store.vertices.shape, (15, 2))
+        np.testing.assert_array_equal(self.store.ring_offsets, [0, 5, 10, 15])
+        np.testing.assert_array_equal(self.store.object_rings, [0, 2, 2, 3])
+
+    def test_outer_and_inner_contours(self):
+        np.testing.assert_array_equal(self.store.outer_contour(0), self.square._contour)
+        inner_contours = self.store.inner_contours(0)
+        self.assertEqual(len(inner_contours), 1)
+        np.testing.assert_array_equal(inner_contours[0], self.square._inner_contours[0])
+        self.assertEqual(self.store.inner_contours(2), [])
+
+    def test_outer_contour_of_ellipse(self):
+        with self.assertRaises(TypeError):
+            self.store.outer_contour(1)
+
+    def test_views(self):
+        annotations = self.store.to_annotations()
+
+        self.assertEqual(annotations[0], self.square)
+        self.assertEqual(annotations[0].inner_points, self.square.inner_points)
+        self.assertEqual(annotations[1], self.ellipse)
+        self.assertEqual(annotations[2].label, "cell")
+        self.assertEqual(annotations[0].area, self.square.area)
+        self.assertTrue(np.shares_memory(annotations[2]._contour, self.store.vertices))
+
+    def test_view_to_dict(self):
+        view = self.store.annotation(0)
+
+        self.assertEqual(view.to_dict(), self.square.to_dict())
+
+    def test_take(self):
+        subset = self.store.take([2, 0])
+
+        self.assertEqual(list(subset.ids), ["triangle", "square"])
+        np.testing.assert_array_equal(subset.ring_offsets, [0, 5, 10, 15])
+        np.testing.assert_array_equal(subset.object_rings, [0, 1, 3])
+        np.testing.assert_array_equal(subset.outer_contour(1), self.square._contour)
+        np.testing.assert_array_equal(
+            subset.inner_contours(1)[0], self.square._inner_contours[0]
+        )
+
+    def test_take_boolean(self):
+        subset = self.store.take(np.array([False, True, False]))
+
+        self.assertEqual(len(subset), 1)
+        self.assertEqual(len(subset.vertices), 0)
+        self.assertEqual(subset.annotation(0), self.ellipse)
+
+    def test_simplify(self):
+        angles = np.linspace(0, 2 * np.pi, 40, endpoint=False)
+        circle = Polygon(
+            points=[
+                Point(int(100 + 50 * np.cos(a)), int(100 + 50 * np.sin(a)))
+                for a in angles
+            ],
+            id="circle",
+        )
+        store = AnnotationStore.from_annotations([circle, self.ellipse, self.square])
+
+        simplified = store.simplify(max_vertices=6)
+        unchanged = store.simplify(epsilon=3)
+
+        self.assertEqual(list(simplified.ids), ["circle", "ellipse", "square"])
+        self.assertEqual(len(simplified.outer_contour(0)), 6)
+        self.assertEqual(simplified.annotation(1), self.ellipse)
+        # The rings of the square are too small to simplify.
+        self.assertEqual(simplified.annotation(2), self.square)
+        self.assertLess(len(unchanged.outer_contour(0)), 40)
+        np.testing.assert_array_equal(
+            unchanged.inner_contours(2)[0], self.square._inner_contours[0]
+        )
+
+    def test_concatenate(self):
+        other = AnnotationStore.from_annotations(
+            [
+                Ellipse(
+                    radius_x=1, center=Point(1, 1), rotation=0, id="a", label="other"
+                ),
+                self.triangle,
+            ]
+        )
+        combined = AnnotationStore.concatenate([self.store, other])
+
+        self.assertEqual(len(combined), 5)
+        self.assertEqual(
+            list(combined.labels), ["cell", "well", "cell", "other", "cell"]
+        )
+        np.testing.assert_array_equal(combined.object_rings, [0, 2, 2, 3, 3, 4])
+        np.testing.assert_array_equal(combined.outer_contour(4), self.triangle._contour)
+
+    def test_bounding_boxes(self):
+        expected = np.array(
+            [
+                [0, 0, 10, 10],
+                [17, 28, 23, 32],
+                [50, 50, 60, 55],
+            ]
+        )
+
+        np.testing.assert_array_equal(self.store.bounding_boxes(), expected)
+
+    def test_empty(self):
+        store = AnnotationStore.empty()
+
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.bounding_boxes().shape, (0, 4))
+        self.assertEqual(store.to_annotations(), [])
+
+    def test_from_dicts(self):
+        dicts = [
+            self.square.to_dict(features=[]),
+            {
+                "type": "ellipse",
+                "center": {"x": 20, "y": 30},
+                "radiusX": 2,
+                "radiusY": 3,
+                "angleOfRotation": 100,
+                "id": "ellipse",
+                "label": "well",
+            },
+            self.triangle.to_dict(features=[]),
+        ]
+        expected = AnnotationStore.from_annotations(
+            [
+                self.square,
+                Ellipse(
+                    radius_x=2,
+                    radius_y=3,
+                    center=Point(20, 30),
+                    rotation=100,
+                    id="ellipse",
+                    label="well",
+                ),
+                self.triangle,
+            ]
+        )
+
+        actual = AnnotationStore.from_dicts(dicts)
+
+        for column in [
+            "types",
+            "ids",
+            "label_codes",
+            "accuracy",
+            "vertices",
+            "ring_offsets",
+            "object_rings",
+            "centers",
+            "radii",
+            "rotations",
+        ]:
+            np.testing.assert_array_equal(
+                getattr(actual, column), getattr(expected, column), err_msg=column
+            )
+        self.assertEqual(actual.label_table, expected.label_table)
+
+    def test_from_dicts_skips_small_polygons(self):
+        dicts = [
+            {"type": "polygon", "points": [{"x": 0, "y": 0}, {"x": 1, "y": 1}]},
+            {"type": "ellipse", "center": {"x": 5, "y": 5}, "radiusX": 2},
+        ]
+
+        store = AnnotationStore.from_dicts([{**d, "angleOfRotation": 0} for d in dicts])
+
+        np.testing.assert_array_equal(store.types, [ELLIPSE])
+        np.testing.assert_array_equal(store.radii, [[2, 2]])
+        self.assertEqual(len(store.ids[0]), 36)
+        self.assertIsNone(store.label(0))
+
+    def test_from_dicts_fractional_rows(self):
+        fractional = self.triangle.to_dict(features=[])
+        fractional["points"][2] = {"x": 4.5, "y": -1.5}
+        dicts = [self.square.to_dict(features=[]), fractional]
+
+        store, fractional_dicts = AnnotationStore._from_dicts(dicts)
+
+        self.assertEqual(fractional_dicts, {1: fractional})
+        np.testing.assert_array_equal(store.outer_contour(1).reshape(-1, 2)[2], [4, -1])
+
+    def test_from_dicts_unknown_type(self):
+        with self.assertRaises(ValueError):
+            AnnotationStore.from_dicts([{"type": "point", "x": 1, "y": 2}])
+
+    def test_concatenated_ranges(self):
+        actual = concatenated_ranges(np.array([5, 0, 10]), np.array([2, 0, 3]))
+
+        np.testing.assert_array_equal(actual, [5, 6, 10, 11, 12])
+
+    def test_manager_from_store(self):
+        manager = AnnotationManager.from_store(self.store)
+
+        self.assertEqual(len(manager), 3)
+        self.assertIsNone(manager._annotations)
+        self.assertEqual(len(manager.to_dict(features=["area"])), 3)
+        self.assertIs(manager.store, self.store)
+
+    def test_manager_store_is_rebuilt_after_filter(self):
+        manager = AnnotationManager([self.square, self.triangle])
+        self.assertEqual(len(manager.store), 2)
+
+        manager.filter(feature="area", min_val=60, max_val=100, inplace=True)
+
+        self.assertEqual(len(manager.store), 1)
+        self.assertEqual(list(manager.store.ids), ["square"])
@@ -0,0 +1 @@
+from .main import FeatureSummary, merge_summaries
@@ -0,0 +1,211 @@
+import math
+from typing import Dict, Iterable, Sequence
+
+import numpy as np
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class FeatureSummary(object):
+    def __init__(self, relative_accuracy: float = 0.01):
+        """Initializes an empty, mergeable summary of the values of one feature.
+
+        Count, mean and standard deviation are accumulated with Welford's method, extended to batches.
+        Percentiles come from a logarithmic histogram (DDSketch) in which every bucket covers values within
+        `relative_accuracy` of each other, so percentiles have a bounded relative error without keeping the values.
+        Summaries of different images or processes are combined with `merge`.
+
+        Args:
+            relative_accuracy (float, optional): The maximum relative error of the percentiles. Defaults to 0.01.
+
+        Raises:
+            ValueError: If the relative accuracy is not between 0 and 1.
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1.")
+
+        self.relative_accuracy = relative_accuracy
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive_bins: Dict[int, int] = {}
+        self._negative_bins: Dict[int, int] = {}
+        self._zero_count = 0
+
+    @classmethod
+    def from_values(
+        cls, values: np.ndarray, relative_accuracy: float = 0.01
+    ) -> "FeatureSummary":
+        """Creates a summary of a collection of values."""
+        return cls(relative_accuracy).update(values)
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation, NaN without values."""
+        if self.count == 0:
+            return math.nan
+        return math.sqrt(self.m2 / self.count)
+
+    def update(self, values: np.ndarray) -> "FeatureSummary":
+        """Adds a batch of values to the summary. Values that are NaN or infinite are ignored.
+
+        Args:
+            values (np.ndarray): The values to add.
+
+        Returns:
+            FeatureSummary: The summary itself.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+
+        batch_mean = float(values.mean())
+        batch_m2 = float(np.sum((values - batch_mean) ** 2))
+        self._merge_moments(len(values), batch_mean, batch_m2)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        self._add_to_bins(self._positive_bins, values[values > 0])
+        self._add_to_bins(self._negative_bins, -values[values < 0])
+        self._zero_count += int(np.count_nonzero(values == 0))
+        return self
+
+    def merge(self, other: "FeatureSummary") -> "FeatureSummary":
+        """Adds the values of another summary to this summary, as if all values were added to this summary.
+
+        Args:
+            other (FeatureSummary): A summary with the same relative accuracy.
+
+        Raises:
+            ValueError: If the relative accuracies of the summaries differ.
+
+        Returns:
+            FeatureSummary: The summary itself.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError(
+                "Only summaries with the same relative accuracy can be merged."
+            )
+        if other.count == 0:
+            return self
+
+        self._merge_moments(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for bins, other_bins in [
+            (self._positive_bins, other._positive_bins),
+            (self._negative_bins, other._negative_bins),
+        ]:
+            for key, count in other_bins.items():
+                bins[key] = bins.get(key, 0) + count
+        self._zero_count += other._zero_count
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Estimates the q-th quantile, with q between 0 and 1.
+
+        Args:
+            q (float): The quantile, e.g. 0.5 for the median.
+
+        Returns:
+            float: The estimated value, NaN without values.
+        """
+        if self.count == 0:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        negative_keys = np.array(
+            sorted(self._negative_bins, reverse=True), dtype=np.int64
+        )
+        positive_keys = np.array(sorted(self._positive_bins), dtype=np.int64)
+        values = np.concatenate(
+            [-self._bin_values(negative_keys), [0.0], self._bin_values(positive_keys)]
+        )
+        counts = np.concatenate(
+            [
+                [self._negative_bins[key] for key in negative_keys.tolist()],
+                [self._zero_count],
+                [self._positive_bins[key] for key in positive_keys.tolist()],
+            ]
+        )
+
+        rank = q * (self.count - 1)
+        idx = int(np.searchsorted(np.cumsum(counts), rank, side="right"))
+        return float(min(max(values[idx], self.min), self.max))
+
+    def percentile(self, p: float) -> float:
+        """Estimates the p-th percentile, with p between 0 and 100."""
+        return self.quantile(p / 100)
+
+    def to_dict(
+        self, percentiles: Sequence[float] = DEFAULT_PERCENTILES
+    ) -> Dict[str, float]:
+        """The statistics of the summary, e.g. {"count": 3, "mean": 2.0, "std": 0.8, "min": 1.0, "max": 3.0, "p50": 2.0}.
+
+        Args:
+            percentiles (Sequence[float], optional): The percentiles to add as "p<percentile>".
+                Defaults to (5, 25, 50, 75, 95).
+
+        Returns:
+            Dict[str, float]: The statistics, NaN for all but count without values.
+        """
+        is_empty = self.count == 0
+        summary = {
+            "count": self.count,
+            "mean": math.nan if is_empty else self.mean,
+            "std": self.std,
+            "min": math.nan if is_empty else self.min,
+            "max": math.nan if is_empty else self.max,
+        }
+        for p in percentiles:
+            summary[f"p{p:g}"] = self.percentile(p)
+        return summary
+
+    def _merge_moments(self, count: int, mean: float, m2: float) -> None:
+        """Chan et al.'s parallel variant of Welford's algorithm."""
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta**2 * self.count * count / total
+        self.count = total
+
+    def _add_to_bins(self, bins: Dict[int, int], magnitudes: np.ndarray) -> None:
+        if len(magnitudes) == 0:
+            return
+        keys = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        for key, count in zip(unique_keys.tolist(), counts.tolist()):
+            bins[key] = bins.get(key, 0) + count
+
+    def _bin_values(self, keys: np.ndarray) -> np.ndarray:
+        """Representative value of buckets, within the relative accuracy of all values in them."""
+        return 2 * self._gamma ** keys.astype(np.float64) / (self._gamma + 1)
+
+
+def merge_summaries(
+    summaries: Iterable[Dict[str, FeatureSummary]]
+) -> Dict[str, FeatureSummary]:
+    """Combines the feature summaries of e.g. the images of a plate into one summary per feature.
+
+    Args:
+        summaries (Iterable[Dict[str, FeatureSummary]]): Summaries per feature, e.g. from `get_feature_summaries`.
+
+    Returns:
+        Dict[str, FeatureSummary]: New summaries with the values of all summaries per feature.
+    """
+    merged = {}
+    for feature_summaries in summaries:
+        for feature, summary in feature_summaries.items():
+            if feature not in merged:
+                merged[feature] = FeatureSummary(summary.relative_accuracy)
+            merged[feature].merge(summary)
+    return merged
@@ -0,0 +1,80 @@
+import math
+import pickle
+from unittest import TestCase
+
+import numpy as np
+
+from .main import FeatureSummary, merge_summaries
+
+
+class TestFeatureSummary(TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.values = np.concatenate(
+            [rng.lognormal(5, 1.5, size=5000), -rng.lognormal(1, 1, size=500), [0] * 50]
+        )
+        rng.shuffle(self.values)
+
+    def test_moments(self):
+        summary = FeatureSummary.from_values(self.values)
+
+        self.assertEqual(summary.count, len(self.values))
+        self.assertAlmostEqual(summary.mean, np.mean(self.values))
+        self.assertAlmostEqual(summary.std, np.std(self.values))
+        self.assertEqual(summary.min, np.min(self.values))
+        self.assertEqual(summary.max, np.max(self.values))
+
+    def test_percentiles_within_relative_accuracy(self):
+        summary = FeatureSummary.from_values(self.values, relative_accuracy=0.01)
+
+        for p in [0, 1, 5, 25, 50, 75, 95, 99, 100]:
+            expected = np.percentile(self.values, p, method="lower")
+            self.assertLessEqual(
+                abs(summary.percentile(p) - expected), 0.01 * abs(expected), msg=p
+            )
+
+    def test_merge_equals_one_pass(self):
+        expected = FeatureSummary.from_values(self.values)
+
+        parts = [
+            pickle.loads(pickle.dumps(FeatureSummary.from_values(part)))
+            for part in np.array_split(self.values, 7)
+        ]
+        actual = FeatureSummary()
+        for part in parts:
+            actual.merge(part)
+
+        np.testing.assert_allclose(
+            list(actual.to_dict().values()), list(expected.to_dict().values())
+        )
+
+    def test_merge_different_accuracy(self):
+        with self.assertRaises(ValueError):
+            FeatureSummary(0.01).merge(FeatureSummary.from_values([1.0], 0.02))
+
+    def test_ignores_nan(self):
+        summary = FeatureSummary.from_values([1.0, np.nan, 3.0, np.inf])
+
+        self.assertEqual(summary.count, 2)
+        self.assertEqual(summary.mean, 2)
+
+    def test_empty(self):
+        actual = FeatureSummary().to_dict(percentiles=[50])
+
+        self.assertEqual(actual["count"], 0)
+        for key in ["mean", "std", "min", "max", "p50"]:
+            self.assertTrue(math.isnan(actual[key]), msg=key)
+
+    def test_merge_summaries(self):
+        first = {"area": FeatureSummary.from_values([1.0, 2.0])}
+        second = {
+            "area": FeatureSummary.from_values([3.0]),
+            "perimeter": FeatureSummary.from_values([4.0]),
+        }
+
+        actual = merge_summaries([first, second])
+
+        self.assertEqual(actual["area"].count, 3)
+        self.assertEqual(actual["area"].mean, 2)
+        self.assertEqual(actual["perimeter"].count, 1)
+        self.assertEqual(first["area"].count, 2)
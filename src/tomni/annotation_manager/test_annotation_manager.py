@@ -1,3 +1,9 @@
+import copy
+import io
+import json
+import os
+import pickle
+import tempfile
 from unittest import TestCase
 
 import cv2
@@ -6,7 +12,22 @@ import numpy as np
 from tomni.annotation_manager.annotations import Ellipse, Point, Polygon
 from tomni.annotation_manager.utils import overlap_object
 
+from .feature_cache import FeatureCache, geometry_hashes
 from .main import AnnotationManager
+from .store import AnnotationStore
+
+
+def count_large_annotations(manager: AnnotationManager) -> int:
+    return len(manager.filter(feature="area", min_val=20, max_val=10000))
+
+
+def keep_large_annotations(manager: AnnotationManager) -> AnnotationManager:
+    manager.filter(feature="area", min_val=20, max_val=10000, inplace=True)
+    return manager
+
+
+class Cell(Polygon):
+    pass
 
 
 class TestAnnotationManager(TestCase):
@@ -106,6 +127,464 @@ class TestAnnotationManager(TestCase):
     def tearDown(self):
         del self.manager
 
+    def test_from_dicts(self):
+        dicts = self.manager.to_dict(features=[])
+
+        actual = AnnotationManager.from_dicts(dicts)
+
+        self.assertIsNone(actual._annotations)
+        self.assertEqual(len(actual), len(dicts))
+        self.assertEqual(actual.to_dict(features=[]), dicts)
+
+    def test_from_dicts_json_bytes(self):
+        dicts = self.manager.to_dict(features=["area"])
+
+        actual = AnnotationManager.from_dicts(json.dumps(dicts).encode())
+
+        self.assertEqual(actual.to_dict(features=["area"]), dicts)
+
+    def test_from_dicts_fractional_points(self):
+        dicts = self.manager.to_dict(features=[])
+        dicts[1]["points"] = [
+            {"x": p["x"] + 0.6, "y": p["y"] + 0.7} for p in dicts[1]["points"]
+        ]
+        dicts[1]["inner_points"] = [[{"x": 21.5, "y": 25.5}] * 5]
+
+        actual = AnnotationManager.from_dicts(dicts)
+
+        self.assertEqual(actual.to_dict(features=[]), dicts)
+        self.assertEqual(actual.annotations[1].points[0], Point(10.6, 30.7))
+        self.assertEqual(
+            AnnotationManager.from_dicts(json.dumps(dicts).encode()).to_dict(
+                features=[]
+            ),
+            dicts,
+        )
+        self.assertEqual(
+            actual.to_dict(features=["area"])[1]["area"],
+            actual.annotations[1].area,
+        )
+
+    def test_pickle_sends_store(self):
+        dicts = self.manager.to_dict(features=["area"])
+
+        data = pickle.dumps(self.manager)
+        actual = pickle.loads(data)
+
+        self.assertIsNone(actual._annotations)
+        self.assertEqual(actual.to_dict(features=["area"]), dicts)
+        self.assertLess(len(data), len(pickle.dumps(self.manager.annotations)))
+
+    def test_pickle_fractional_points(self):
+        points = [Point(1.5, 1.5), Point(1.5, 9), Point(9, 9), Point(9, 5), Point(9, 1)]
+        manager = AnnotationManager(
+            [
+                Polygon(points=points, id="1"),
+                Cell(points=[Point(20, 20)] + points[1:], id="2"),
+            ]
+        )
+
+        for actual in [pickle.loads(pickle.dumps(manager)), copy.deepcopy(manager)]:
+            self.assertEqual(actual, manager)
+            self.assertEqual(actual.annotations[0].points, points)
+            self.assertEqual(actual.annotations[0].points[0].x, 1.5)
+            self.assertIsInstance(actual.annotations[1], Cell)
+            self.assertEqual(actual.to_dict(), manager.to_dict())
+
+    def test_iter_dicts(self):
+        features = ["area", "circularity"]
+        expected = self.manager.to_dict(features=features, feature_multiplier=0.5)
+        store = self.manager.store.take(range(len(self.manager)))
+        store.features = {}
+        stored = AnnotationManager.from_store(store)
+
+        for manager in [self.manager, stored]:
+            actual = list(
+                manager.iter_dicts(
+                    features=features, feature_multiplier=0.5, chunk_size=2
+                )
+            )
+
+            self.assertEqual(actual, expected)
+        self.assertEqual(stored.store.features, {})
+
+    def test_iter_dicts_mask_json(self):
+        mask_json = [
+            {
+                "type": "polygon",
+                "points": [
+                    {"x": 0, "y": 0},
+                    {"x": 60, "y": 0},
+                    {"x": 60, "y": 60},
+                    {"x": 0, "y": 60},
+                    {"x": 0, "y": 30},
+                ],
+            }
+        ]
+        expected = self.manager.to_dict(mask_json=mask_json, features=["area"])
+
+        actual = list(
+            self.manager.iter_dicts(
+                mask_json=mask_json, features=["area"], chunk_size=2
+            )
+        )
+
+        self.assertEqual(actual, expected)
+
+    def test_write_json(self):
+        expected = self.manager.to_dict(features=["area"])
+        binary, text = io.BytesIO(), io.StringIO()
+
+        self.manager.write_json(binary, chunk_size=2, features=["area"])
+        self.manager.write_json(text, chunk_size=4, features=["area"])
+        AnnotationManager([]).write_json(empty := io.BytesIO())
+
+        self.assertEqual(json.loads(binary.getvalue()), expected)
+        self.assertEqual(json.loads(text.getvalue()), expected)
+        self.assertEqual(json.loads(empty.getvalue()), [])
+
+    def test_feature_cache(self):
+        expected = self.manager.to_dict(feature_multiplier=0.5, metric_unit="um")
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = FeatureCache(os.path.join(directory, "features.sqlite"))
+            for _ in range(2):
+                manager = AnnotationManager.from_dicts(
+                    self.manager.to_dict(features=[])
+                )
+                manager.feature_cache = cache
+
+                actual = manager.to_dict(feature_multiplier=0.5, metric_unit="um")
+
+                self.assertEqual(actual, expected)
+            self.assertEqual(
+                len(cache), len(set(geometry_hashes(self.manager.store).tolist()))
+            )
+            cache.close()
+
+    def test_save_load(self):
+        dicts = self.manager.to_dict(features=["area", "roundness"])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "annotations.tam")
+            self.manager.save(path)
+            actual = AnnotationManager.load(path)
+
+            self.assertIsNone(actual._annotations)
+            self.assertIn("roundness", actual.store.features)
+            self.assertEqual(actual.to_dict(features=["area", "roundness"]), dicts)
+            del actual
+
+    def test_add(self):
+        annotations = self.manager.annotations
+        shifted = Polygon(
+            points=annotations[0].points[2:] + annotations[0].points[:2], id="1"
+        )
+        ellipse = Ellipse(radius_x=5, center=Point(80, 80), rotation=0, id="2")
+
+        actual = self.manager + AnnotationManager([shifted, ellipse])
+        actual_reversed = [ellipse] + self.manager
+
+        # The last annotation of the manager duplicates the second one.
+        self.assertEqual(len(actual), 6)
+        self.assertEqual(actual.annotations[:5], annotations[:5])
+        self.assertEqual(actual.annotations[5], ellipse)
+        self.assertEqual(actual_reversed.annotations[0], ellipse)
+        self.assertEqual(len(sum([self.manager, self.manager])), 5)
+
+    def test_merge_iou_threshold(self):
+        first = AnnotationManager(
+            [Ellipse(radius_x=10, center=Point(50, 50), rotation=0, id="1")]
+        )
+        second = AnnotationManager(
+            [
+                Ellipse(radius_x=10, center=Point(51, 50), rotation=0, id="2"),
+                Ellipse(radius_x=10, center=Point(65, 50), rotation=0, id="3"),
+            ]
+        )
+
+        self.assertEqual(len(first.merge(second)), 3)
+        actual = first.merge(second, iou_threshold=0.5)
+        self.assertEqual([a._id for a in actual.annotations], ["1", "3"])
+
+    def test_merge_fractional_points(self):
+        dicts = self.manager.to_dict(features=[])
+        for d in dicts:
+            d["points"] = [{"x": p["x"] + 0.5, "y": p["y"]} for p in d["points"]]
+        first = AnnotationManager.from_dicts(dicts[:3])
+        second = AnnotationManager.from_dicts(dicts[3:])
+
+        for actual in [first.merge(second), first + second, sum([first, second])]:
+            # The last annotation duplicates the second one.
+            self.assertEqual(actual.to_dict(features=[]), dicts[:5])
+            self.assertEqual(len(actual.store), 5)
+
+    def test_eq(self):
+        reversed_manager = AnnotationManager(self.manager.annotations[::-1])
+
+        self.assertEqual(self.manager, reversed_manager)
+        self.assertNotEqual(
+            self.manager, AnnotationManager(self.manager.annotations[1:])
+        )
+        self.assertNotEqual(self.manager, self.manager.annotations)
+
+    def test_eq_fractional_points(self):
+        square = [(0, 0), (0, 5), (5, 5), (5, 2), (5, 0)]
+        first, second, shifted = [
+            AnnotationManager(
+                [Polygon(points=[Point(x + offset, y) for x, y in points], id="1")]
+            )
+            for offset, points in [
+                (0.2, square),
+                (0.7, square),
+                (0.2, square[2:] + square[:2]),
+            ]
+        ]
+
+        self.assertNotEqual(first.annotations[0], second.annotations[0])
+        self.assertNotEqual(first, second)
+        self.assertEqual(first, shifted)
+        self.assertEqual(
+            first + second, AnnotationManager(second.annotations + first.annotations)
+        )
+
+    def test_contains_delete_annotation(self):
+        star = self.manager.annotations[1]
+        mirrored = Polygon(points=star.points[::-1], id="1")
+        ellipse = Ellipse(radius_x=5, center=Point(80, 80), rotation=0, id="2")
+
+        self.assertIn(mirrored, self.manager)
+        self.assertNotIn(ellipse, self.manager)
+
+        self.manager.delete_annotation(mirrored)
+        self.assertEqual(len(self.manager), 5)
+        self.assertEqual(len(self.manager.store), 5)
+        self.assertIn(mirrored, self.manager)
+        self.manager.delete_annotation(star)
+        self.assertNotIn(star, self.manager)
+        self.assertRaises(ValueError, self.manager.delete_annotation, star)
+
+    def test_contains_delete_fractional_points(self):
+        square = [(0, 0), (0, 5), (5, 5), (5, 2), (5, 0)]
+        polygons = [
+            Polygon(points=[Point(x + offset, y) for x, y in square], id=id)
+            for offset, id in [(0.2, "a"), (0.7, "b"), (0.5, "c")]
+        ]
+        manager = AnnotationManager(polygons[:2])
+
+        self.assertNotIn(polygons[2], manager)
+        self.assertRaises(ValueError, manager.delete_annotation, polygons[2])
+
+        manager.delete_annotation(manager.get_annotation("b"))
+
+        self.assertEqual([a._id for a in manager.annotations], ["a"])
+        self.assertIn(polygons[0], manager)
+        self.assertNotIn(polygons[1], manager)
+
+    def test_id_index(self):
+        ellipses = [
+            Ellipse(radius_x=5, center=Point(80, 80), rotation=0, id=str(i))
+            for i in range(4)
+        ]
+        managers = [
+            AnnotationManager(list(ellipses)),
+            AnnotationManager.from_store(AnnotationStore.from_annotations(ellipses)),
+        ]
+
+        for manager in managers:
+            self.assertIn("2", manager)
+            self.assertEqual(manager.get_annotation("2"), ellipses[2])
+
+            manager.delete_annotations(["0", "2"])
+            manager.add_annotations(
+                [Ellipse(radius_x=6, center=Point(9, 9), rotation=0, id="4")]
+            )
+
+            self.assertNotIn("2", manager)
+            self.assertEqual(manager.get_annotation("3")._id, "3")
+            self.assertEqual(manager.get_annotation("4").radius_x, 6)
+            self.assertEqual([a._id for a in manager.annotations], ["1", "3", "4"])
+            self.assertEqual(list(manager.store.ids), ["1", "3", "4"])
+            self.assertRaises(KeyError, manager.get_annotation, "0")
+            self.assertRaises(ValueError, manager.delete_annotations, ["1", "0"])
+            self.assertEqual(len(manager), 3)
+
+            manager.filter("area", 100, 200, inplace=True)
+            self.assertEqual(manager.get_annotation("4").radius_x, 6)
+            self.assertNotIn("1", manager)
+
+    def test_annotations_changed_in_place(self):
+        square = Polygon(
+            points=[
+                Point(0, 0),
+                Point(0, 10),
+                Point(10, 10),
+                Point(10, 5),
+                Point(10, 0),
+            ],
+            id="1",
+        )
+        rectangle = Polygon(
+            points=[
+                Point(20, 0),
+                Point(20, 5),
+                Point(40, 5),
+                Point(40, 2),
+                Point(40, 0),
+            ],
+            id="2",
+        )
+        manager = AnnotationManager([square, rectangle])
+        self.assertEqual(len(manager.to_dict(features=["area"])), 2)
+        self.assertIn("1", manager)
+
+        del manager.annotations[0]
+
+        actual = manager.to_dict(features=["area"])
+        self.assertEqual([d["id"] for d in actual], ["2"])
+        self.assertEqual(actual[0]["area"], rectangle.area)
+        self.assertEqual(manager.to_binary_mask((50, 50))[:11, :11].sum(), 0)
+        self.assertNotIn("1", manager)
+
+        manager.annotations.append(square)
+
+        actual = manager.to_dict(features=["area"])
+        self.assertEqual([d["id"] for d in actual], ["2", "1"])
+        self.assertEqual([d["area"] for d in actual], [rectangle.area, square.area])
+        self.assertEqual(manager.get_annotation("1"), square)
+
+    def test_id_index_repeated_ids(self):
+        self.manager.delete_annotation("132132132123132")
+
+        self.assertEqual(len(self.manager), 5)
+        self.assertEqual(
+            self.manager.get_annotation("132132132123132").points[0], Point(10, 30)
+        )
+
+    def test_nms(self):
+        manager = AnnotationManager.from_dicts(
+            [
+                {
+                    "type": "ellipse",
+                    "center": {"x": x, "y": 50},
+                    "radiusX": 10,
+                    "radiusY": 10,
+                    "angleOfRotation": 0,
+                    "accuracy": accuracy,
+                    "id": str(x),
+                }
+                for x, accuracy in [(50, 0.5), (52, 0.9), (80, 0.1)]
+            ]
+        )
+
+        actual = manager.nms(iou_threshold=0.5)
+        actual_area = manager.nms(iou_threshold=0.5, by="area")
+
+        self.assertEqual([a._id for a in actual.annotations], ["52", "80"])
+        self.assertEqual([a._id for a in actual_area.annotations], ["50", "80"])
+        self.assertEqual(len(manager), 3)
+
+    def test_nms_fractional_points(self):
+        dicts = self.manager.to_dict(features=[])
+        dicts[1]["points"] = [
+            {"x": p["x"] + 0.25, "y": p["y"] - 0.5} for p in dicts[1]["points"]
+        ]
+        manager = AnnotationManager.from_dicts(dicts)
+
+        actual = manager.nms(iou_threshold=0.5)
+
+        # The last annotation overlaps the second one and has a lower accuracy.
+        self.assertEqual(actual.to_dict(features=[]), dicts[:5])
+
+    def test_simplify(self):
+        actual = self.manager.simplify(max_vertices=5)
+
+        self.assertEqual(len(actual), len(self.manager))
+        for annotation in actual.annotations:
+            if isinstance(annotation, Polygon):
+                self.assertLessEqual(len(annotation.points), 5)
+
+    def test_to_dict_compression_max_vertices(self):
+        angles = np.linspace(0, 2 * np.pi, 40, endpoint=False)
+        manager = AnnotationManager(
+            [
+                Polygon(
+                    points=[
+                        Point(100 + 50 * np.cos(a), 100 + 50 * np.sin(a))
+                        for a in angles
+                    ],
+                    id="circle",
+                )
+            ]
+        )
+
+        actual = manager.to_dict(features=[], do_compress=True, max_vertices=8)
+        expected = manager.annotations[0].to_dict(
+            features=[], do_compress=True, max_vertices=8
+        )
+
+        self.assertEqual(len(actual[0]["points"]), 8)
+        self.assertEqual(actual[0], expected)
+
+    def test_link(self):
+        frames = [
+            [
+                Ellipse(
+                    radius_x=10, center=Point(50 + t * 3, 50), rotation=0, id=f"{t}a"
+                ),
+                Ellipse(
+                    radius_x=10, center=Point(90, 50 + t * 3), rotation=0, id=f"{t}b"
+                ),
+            ]
+            for t in range(3)
+        ]
+        managers = [
+            AnnotationManager(frames[0]),
+            AnnotationManager.from_store(AnnotationStore.from_annotations(frames[1])),
+            AnnotationManager(frames[2]),
+        ]
+
+        for manager, next_manager in zip(managers[:-1], managers[1:]):
+            manager.link(next_manager)
+
+        dicts = managers[1].to_dict(features=[])
+        self.assertEqual(dicts[0]["parents"], ["0a"])
+        self.assertEqual(dicts[0]["children"], ["2a"])
+        self.assertEqual(dicts[1]["parents"], ["0b"])
+        self.assertEqual(frames[0][1]._children, ["1b"])
+        self.assertEqual(frames[2][1]._parents, ["1b"])
+        self.assertEqual(frames[0][0]._parents, [])
+
+    def test_map_masks(self):
+        masks = []
+        for n_cells in [3, 0, 5, 1]:
+            mask = np.zeros((50, 50), dtype=np.uint8)
+            for i in range(n_cells):
+                cv2.circle(mask, (5 + 10 * i, 10), 4, 1, -1)
+                cv2.circle(mask, (5 + 10 * i, 30), 1, 1, -1)
+            masks.append(mask)
+
+        actual = list(
+            AnnotationManager.map_masks(
+                iter(masks), count_large_annotations, workers=2, max_in_flight=2
+            )
+        )
+        actual_serial = list(
+            AnnotationManager.map_masks(masks, count_large_annotations, workers=0)
+        )
+        managers = list(
+            AnnotationManager.map_masks(masks, keep_large_annotations, workers=2)
+        )
+
+        self.assertEqual(actual, [3, 0, 5, 1])
+        self.assertEqual(actual_serial, actual)
+        self.assertEqual([len(manager) for manager in managers], actual)
+        expected = keep_large_annotations(AnnotationManager.from_binary_mask(masks[0]))
+        self.assertEqual(
+            [d["points"] for d in managers[0].to_dict(features=[])],
+            [d["points"] for d in expected.to_dict(features=[])],
+        )
+
     def test_filter_single(self):
         actual = self.manager.filter(feature="area", min_val=500, max_val=5000000)
         expected_n_items = 3
@@ -145,6 +624,61 @@ class TestAnnotationManager(TestCase):
         self.assertIsInstance(actual, AnnotationManager)
         self.assertEqual(len(self.manager), expected_n_items)
 
+    def test_query_equals_chained_filter(self):
+        expected = self.manager.filter(feature="area", min_val=0, max_val=500)
+        expected = AnnotationManager(expected).filter(
+            feature="circularity", min_val=0.5, max_val=1
+        )
+
+        actual = self.manager.query(ranges={"area": (0, 500), "circularity": (0.5, 1)})
+
+        self.assertIsInstance(actual, AnnotationManager)
+        self.assertEqual(list(actual.store.ids), [a._id for a in expected])
+        self.assertIn("area", actual.store.features)
+
+    def test_query_indices(self):
+        actual = self.manager.query(
+            ranges={"accuracy": (0.5, None), "area": (None, 100000)},
+            return_indices=True,
+        )
+
+        np.testing.assert_array_equal(actual, [0, 1, 2])
+
+    def test_query_labels(self):
+        manager = AnnotationManager(
+            self.manager.annotations[:2]
+            + [Ellipse(radius_x=5, center=Point(5, 5), rotation=0, id="e", label="dot")]
+        )
+
+        self.assertEqual(len(manager.query(labels="dot")), 1)
+        self.assertEqual(len(manager.query(labels=["dot", "star"])), 3)
+        self.assertEqual(len(manager.query(labels="circle")), 0)
+        self.assertEqual(len(manager), 3)
+
+    def test_query_fractional_points(self):
+        points = [Point(1.5, 1.5), Point(1.5, 9), Point(9, 9), Point(9, 5), Point(9, 1)]
+        manager = AnnotationManager(
+            [Polygon(points=points, id="1", label="cell")] + self.manager.annotations
+        )
+
+        actual = manager.query(labels="cell")
+
+        self.assertEqual(actual.annotations[0].points, points)
+
+    def test_get_feature_summaries(self):
+        areas = [annotation.area for annotation in self.manager.annotations]
+
+        actual = self.manager.get_feature_summaries(["area", "circularity"])
+
+        self.assertEqual(set(actual), {"area", "circularity"})
+        self.assertEqual(actual["area"].count, len(areas))
+        self.assertAlmostEqual(actual["area"].mean, np.mean(areas))
+        self.assertEqual(actual["area"].max, max(areas))
+        self.assertEqual(
+            self.manager.get_circularity_summary(),
+            actual["circularity"].to_dict(),
+        )
+
     def test_filter_feature_multiplier(self):
         temp_manager = AnnotationManager(
             [
@@ -705,6 +1239,21 @@ class TestAnnotationManager(TestCase):
 
         np.testing.assert_array_equal(actual, expected)
 
+    def test_to_binary_mask_out(self):
+        ellipse = Ellipse(
+            radius_x=2, radius_y=1, center=Point(4, 4), rotation=0, id="1"
+        )
+        manager = AnnotationManager([ellipse])
+        out = np.zeros((7, 7), dtype=np.uint8)
+        out[0, 0] = 1
+        expected = ellipse.to_binary_mask((7, 7))
+        expected[0, 0] = 1
+
+        actual = manager.to_binary_mask((7, 7), out=out)
+
+        self.assertIs(actual, out)
+        np.testing.assert_array_equal(actual, expected)
+
     def test_to_labeled_mask(self):
         polygons = [
             Polygon(
@@ -752,6 +1301,43 @@ class TestAnnotationManager(TestCase):
 
         np.testing.assert_array_equal(actual, expected)
 
+    def test_to_labeled_mask_many_annotations(self):
+        ellipses = [
+            Ellipse(
+                radius_x=1, radius_y=1, center=Point(x, y), rotation=0, id=f"{x}-{y}"
+            )
+            for y in range(1, 60, 3)
+            for x in range(1, 60, 3)
+        ]
+        manager = AnnotationManager(ellipses)
+
+        actual, lookup = manager.to_labeled_mask((60, 60), return_lookup=True)
+
+        self.assertEqual(actual.dtype, np.uint16)
+        self.assertEqual(len(np.unique(actual)), len(ellipses) + 1)
+        self.assertEqual(
+            manager.annotations[lookup[actual[4, 58]]].center, Point(58, 4)
+        )
+        self.assertEqual(lookup[0], -1)
+
+    def test_to_labeled_mask_overlap(self):
+        big = Polygon(
+            points=[Point(0, 0), Point(3, 0), Point(6, 0), Point(6, 6), Point(0, 6)],
+            id="big",
+            accuracy=0.9,
+        )
+        small = Polygon(
+            points=[Point(2, 2), Point(3, 2), Point(4, 2), Point(4, 4), Point(2, 4)],
+            id="small",
+            accuracy=0.5,
+        )
+        manager = AnnotationManager([small, big])
+
+        self.assertEqual(manager.to_labeled_mask((7, 7))[2, 2], 2)
+        self.assertEqual(manager.to_labeled_mask((7, 7), overlap="accuracy")[2, 2], 2)
+        self.assertEqual(manager.to_labeled_mask((7, 7), overlap="smallest")[2, 2], 1)
+        self.assertRaises(ValueError, manager.to_labeled_mask, (7, 7), "largest")
+
     def test_binary_mask_double_donut(self):
         input_mask = np.array(
             [
@@ -895,6 +1481,29 @@ class TestAnnotationManager(TestCase):
 
         np.testing.assert_array_equal(expected, actual)
 
+    def test_from_binary_mask_tiled(self):
+        mask = np.zeros((120, 150), dtype=np.uint8)
+        cv2.circle(mask, (60, 60), 50, 1, -1)
+        cv2.circle(mask, (60, 60), 30, 0, -1)
+        cv2.circle(mask, (60, 60), 10, 1, -1)
+        cv2.rectangle(mask, (115, 10), (140, 110), 1, -1)
+
+        for include_inner_contours in [False, True]:
+            expected = AnnotationManager.from_binary_mask(
+                mask, include_inner_contours=include_inner_contours
+            )
+            actual = AnnotationManager.from_binary_mask(
+                mask,
+                include_inner_contours=include_inner_contours,
+                tile_size=32,
+                max_workers=2,
+            )
+
+            self.assertEqual(
+                [a.to_dict()["points"] for a in actual.annotations],
+                [a.to_dict()["points"] for a in expected.annotations],
+            )
+
     def test_from_binary_mask_to_dict_donut(self):
         data = np.array(
             [
@@ -1463,6 +2072,40 @@ class TestAnnotationManager(TestCase):
             dict_object.pop("id")
         np.testing.assert_array_equal(actual, expected)
 
+    def test_labeled_mask_many_values_equals_full_image_contours(self):
+        data = np.zeros((120, 120), dtype=np.uint16)
+        rng = np.random.default_rng(0)
+        for value, (x, y) in enumerate(rng.integers(0, 120, size=(300, 2)), 1):
+            cv2.circle(data, (int(x), int(y)), int(rng.integers(2, 9)), value, -1)
+            cv2.circle(data, (int(x), int(y)), 1, 0, -1)
+        labels = [f"cell {value}" for value in range(1, 301)]
+        expected = []
+        for value in np.unique(data)[1:]:
+            expected.extend(
+                AnnotationManager.from_binary_mask(
+                    data == value,
+                    include_inner_contours=True,
+                    label=labels[value - 1],
+                ).to_dict(features=[])
+            )
+
+        manager = AnnotationManager.from_labeled_mask(
+            data, labels=labels, include_inner_contours=True, max_workers=4
+        )
+        actual = manager.to_dict(features=[])
+
+        for dict_object in actual + expected:
+            dict_object.pop("id")
+        self.assertEqual(actual, expected)
+
+    def test_labeled_mask_value_without_label(self):
+        data = np.zeros((10, 10), dtype=np.uint8)
+        data[1:4, 1:4] = 1
+        data[5:9, 5:9] = 7
+
+        with self.assertRaises(ValueError):
+            AnnotationManager.from_labeled_mask(data, labels=["alive", "dead"])
+
     def test_labeled_mask_multiple_labels_but_missing_unique_values(self):
         data = np.array(
             [
@@ -0,0 +1 @@
+from .main import LINK_METHODS, link_stores, store_centroids
@@ -0,0 +1,184 @@
+from typing import Tuple, Union
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+from scipy.spatial import cKDTree
+
+from tomni.annotation_manager.spatial import iou_pairs, store_geometries
+from tomni.annotation_manager.store import POLYGON, AnnotationStore
+
+LINK_METHODS = ("iou", "centroid")
+
+
+def store_centroids(store: AnnotationStore) -> np.ndarray:
+    """Calculates the centroid of every annotation: the center of mass of the outer contour of a polygon,
+    equal to the one of cv2.moments, or the center of an ellipse.
+    Polygons without area use the mean of their vertices.
+
+    Args:
+        store (AnnotationStore): The annotations.
+
+    Returns:
+        np.ndarray: Array of shape [N, 2] with the (x, y) centroid of every annotation.
+    """
+    centroids = store.centers.astype(np.float64)
+    rows = np.flatnonzero(store.types == POLYGON)
+    if len(rows) == 0:
+        return centroids
+
+    ring_lengths = np.diff(store.ring_offsets)
+    ring_ids = np.repeat(np.arange(store.n_rings), ring_lengths)
+    previous = np.arange(len(store.vertices)) - 1
+    previous[store.ring_offsets[:-1]] = store.ring_offsets[1:] - 1
+    vertices = store.vertices.astype(np.float64)
+    x, y = vertices[:, 0], vertices[:, 1]
+    previous_x, previous_y = x[previous], y[previous]
+    cross = previous_x * y - x * previous_y
+
+    def ring_sums(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(ring_ids, weights=weights, minlength=store.n_rings)
+
+    outer_rings = store.object_rings[:-1][rows]
+    areas = ring_sums(cross)[outer_rings] / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        centroids[rows, 0] = ring_sums((previous_x + x) * cross)[outer_rings] / (
+            6 * areas
+        )
+        centroids[rows, 1] = ring_sums((previous_y + y) * cross)[outer_rings] / (
+            6 * areas
+        )
+
+    is_flat = areas == 0
+    if np.any(is_flat):
+        lengths = np.maximum(ring_lengths[outer_rings[is_flat]], 1)
+        centroids[rows[is_flat], 0] = ring_sums(x)[outer_rings[is_flat]] / lengths
+        centroids[rows[is_flat], 1] = ring_sums(y)[outer_rings[is_flat]] / lengths
+    return centroids
+
+
+def link_stores(
+    store: AnnotationStore,
+    next_store: AnnotationStore,
+    method: str = "iou",
+    max_distance: Union[float, None] = None,
+    min_iou: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Links the annotations of a frame to those of the next frame, every annotation to at most one other.
+
+    Candidate pairs are found with a spatial index on the next frame, their costs are calculated in batch
+    and the assignment with the lowest total cost is solved on the sparse graph of candidates.
+
+    Args:
+        store (AnnotationStore): The annotations of a frame.
+        next_store (AnnotationStore): The annotations of the next frame.
+        method (str, optional): "iou" links annotations whose geometries overlap, preferring a high
+            intersection over union. "centroid" links annotations whose centroids are within `max_distance`,
+            preferring a small distance. Defaults to "iou".
+        max_distance (Union[float, None], optional): The largest distance in pixels between linked centroids.
+            Required for "centroid", with "iou" the centroids of linked annotations are not further apart
+            when it is given. Defaults to None.
+        min_iou (float, optional): With "iou" linked annotations have an intersection over union above this value.
+            Defaults to 0.
+
+    Raises:
+        ValueError: If the method is unknown or "centroid" is used without a `max_distance`.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The rows in `store` and the rows in `next_store` they are linked to.
+    """
+    if method not in LINK_METHODS:
+        raise ValueError(
+            f"Unknown link method {method}, expected one of {', '.join(LINK_METHODS)}."
+        )
+    if method == "centroid" and max_distance is None:
+        raise ValueError("max_distance must be provided for the centroid method.")
+
+    if len(store) == 0 or len(next_store) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    if method == "iou":
+        first, second, costs = _iou_candidates(store, next_store, min_iou)
+        if max_distance is not None:
+            distances = np.linalg.norm(
+                store_centroids(store)[first] - store_centroids(next_store)[second],
+                axis=1,
+            )
+            is_close = distances <= max_distance
+            first, second, costs = first[is_close], second[is_close], costs[is_close]
+    else:
+        first, second, costs = _centroid_candidates(store, next_store, max_distance)
+
+    return _assign(first, second, costs, len(store), len(next_store))
+
+
+def _iou_candidates(
+    store: AnnotationStore, next_store: AnnotationStore, min_iou: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pairs of overlapping annotations with 1 - intersection over union as cost."""
+    first, second, ious = iou_pairs(
+        store_geometries(store), store_geometries(next_store), min_iou
+    )
+    is_candidate = ious > min_iou
+    return first[is_candidate], second[is_candidate], 1 - ious[is_candidate]
+
+
+def _centroid_candidates(
+    store: AnnotationStore, next_store: AnnotationStore, max_distance: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pairs of annotations with centroids within max_distance with the distance as cost."""
+    pairs = cKDTree(store_centroids(store)).sparse_distance_matrix(
+        cKDTree(store_centroids(next_store)), max_distance, output_type="ndarray"
+    )
+    return pairs["i"].astype(np.int64), pairs["j"].astype(np.int64), pairs["v"]
+
+
+def _assign(
+    first: np.ndarray,
+    second: np.ndarray,
+    costs: np.ndarray,
+    n_first: int,
+    n_second: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Solves the assignment with the most links and the lowest total cost on the sparse graph of candidate pairs,
+    so memory and time grow with the number of candidates, also when most annotations compete in one group.
+
+    Every annotation gets a dummy partner on the other side, so a full matching always exists:
+    first row i can match dummy column i and dummy row j can match second column j, which leaves them unlinked.
+    Dummy row j matches dummy column i for every candidate (i, j), so linking i to j frees both dummies.
+    Being unlinked costs more than all candidates together, so the most candidates are linked.
+    """
+    if len(first) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Only annotations with a candidate take part.
+    group_first, row_idx = np.unique(first, return_inverse=True)
+    group_second, col_idx = np.unique(second, return_inverse=True)
+    n_rows, n_cols = len(group_first), len(group_second)
+    unlinked_cost = costs.sum() + 1
+    rows = np.arange(n_rows)
+    cols = np.arange(n_cols)
+
+    # Left: first rows, then dummy rows. Right: second columns, then dummy columns.
+    left = np.concatenate([row_idx, rows, n_rows + cols, n_rows + col_idx])
+    right = np.concatenate([col_idx, n_cols + rows, cols, n_cols + row_idx])
+    weights = np.concatenate(
+        [
+            costs,
+            np.full(n_rows + n_cols, unlinked_cost),
+            np.zeros(len(costs)),
+        ]
+    )
+    # Every full matching has n_rows + n_cols edges, so an offset keeps the optimum and no weight is zero.
+    graph = csr_matrix(
+        (weights + 1, (left, right)), shape=(n_rows + n_cols, n_cols + n_rows)
+    )
+    # The graph is square, so the matched columns are in the order of the rows.
+    _, matched_cols = min_weight_full_bipartite_matching(graph)
+    matched_cols = matched_cols[:n_rows]
+
+    is_linked = matched_cols < n_cols
+    return (
+        group_first[is_linked].astype(np.int64),
+        group_second[matched_cols[is_linked]].astype(np.int64),
+    )
@@ -0,0 +1,111 @@
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from tomni.annotation_manager import AnnotationManager
+from tomni.annotation_manager.annotations import Ellipse, Point
+from tomni.annotation_manager.store import AnnotationStore
+
+from .main import link_stores, store_centroids
+
+
+def _ellipses(centers, radius=10):
+    return AnnotationStore.from_annotations(
+        [
+            Ellipse(radius_x=radius, center=Point(x, y), rotation=0, id=str(i))
+            for i, (x, y) in enumerate(centers)
+        ]
+    )
+
+
+class TestStoreCentroids(TestCase):
+    def test_equal_to_moments(self):
+        mask = np.zeros((100, 100), dtype=np.uint8)
+        cv2.ellipse(mask, (30, 40), (20, 8), 35, 0, 360, 1, -1)
+        cv2.fillPoly(mask, [np.array([[60, 10], [95, 20], [70, 60]])], 1)
+        store = AnnotationManager.from_binary_mask(mask).store
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+        expected = []
+        for contour in contours:
+            moments = cv2.moments(contour)
+            expected.append(
+                [moments["m10"] / moments["m00"], moments["m01"] / moments["m00"]]
+            )
+
+        np.testing.assert_allclose(store_centroids(store), expected)
+
+    def test_ellipse_and_flat_polygon(self):
+        store = AnnotationStore.concatenate(
+            [
+                _ellipses([(5, 6)]),
+                AnnotationStore.from_dicts(
+                    [
+                        {
+                            "type": "polygon",
+                            "points": [{"x": x, "y": 2} for x in range(5)],
+                        }
+                    ]
+                ),
+            ]
+        )
+
+        np.testing.assert_array_equal(store_centroids(store), [[5, 6], [2, 2]])
+
+
+class TestLinkStores(TestCase):
+    def setUp(self) -> None:
+        self.store = _ellipses([(50, 50), (70, 50), (200, 200)])
+        # The first two cells moved 4 pixels to the right and swapped order, the third disappeared.
+        self.next_store = _ellipses([(74, 50), (54, 50), (400, 400)])
+
+    def test_iou(self):
+        rows, next_rows = link_stores(self.store, self.next_store)
+
+        np.testing.assert_array_equal(rows, [0, 1])
+        np.testing.assert_array_equal(next_rows, [1, 0])
+
+    def test_centroid(self):
+        rows, next_rows = link_stores(
+            self.store, self.next_store, method="centroid", max_distance=10
+        )
+
+        np.testing.assert_array_equal(rows, [0, 1])
+        np.testing.assert_array_equal(next_rows, [1, 0])
+
+    def test_most_links_are_made(self):
+        # Linking 0 to 0 is cheapest, but then 1 has no link.
+        store = _ellipses([(0, 0), (10, 0)])
+        next_store = _ellipses([(4, 0), (20, 0)])
+
+        rows, next_rows = link_stores(store, next_store, "centroid", max_distance=10)
+
+        np.testing.assert_array_equal(rows, [0, 1])
+        np.testing.assert_array_equal(next_rows, [0, 1])
+
+    def test_one_large_group(self):
+        # Every centroid is within max_distance of its neighbours, so all cells compete in one group.
+        centers = [(10 * x, 10 * y) for y in range(100) for x in range(100)]
+        store = _ellipses(centers)
+        next_store = _ellipses([(x + 2, y + 1) for x, y in centers])
+
+        rows, next_rows = link_stores(store, next_store, "centroid", max_distance=15)
+
+        np.testing.assert_array_equal(rows, np.arange(len(centers)))
+        np.testing.assert_array_equal(next_rows, np.arange(len(centers)))
+
+    def test_thresholds(self):
+        rows, _ = link_stores(self.store, self.next_store, min_iou=0.9)
+        self.assertEqual(len(rows), 0)
+        rows, _ = link_stores(self.store, self.next_store, max_distance=3)
+        self.assertEqual(len(rows), 0)
+
+    def test_empty(self):
+        rows, next_rows = link_stores(self.store, AnnotationStore.empty())
+
+        self.assertEqual(len(rows), 0)
+        self.assertEqual(len(next_rows), 0)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, link_stores, self.store, self.store, "distance")
+        self.assertRaises(ValueError, link_stores, self.store, self.store, "centroid")
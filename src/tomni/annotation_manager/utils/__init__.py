@@ -1,6 +1,18 @@
 from .are_lines_equal import are_lines_equal
+from .main import parse_contour_to_points
 from .main import parse_points_to_contour
 from .main import parse_points_to_inner_contour
 from .simplify_line import simplify_line
 from .compress_polygon_points import compress_polygon_points
-from .overlap_object import overlap_object
+from .simplify_rings import simplify_rings
+from .overlap_object import (
+    OVERLAP_BACKENDS,
+    objects2footprints,
+    objects2shapes,
+    overlap_matrix,
+    overlap_object,
+)
+from .load_json import load_json
+from .find_label_objects import find_label_objects
+from .tiled_contours import find_contours_tiled
+from .dump_json import dump_json
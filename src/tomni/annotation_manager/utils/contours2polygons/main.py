@@ -1,7 +1,8 @@
 import numpy as np
 
 from typing import List, Union, Tuple
-from tomni.annotation_manager.annotations import Polygon, Point
+from tomni.annotation_manager.annotations import Polygon
+from tomni.contour_operations import inner_contour_indices
 import uuid
 import cv2
 
@@ -30,6 +31,10 @@ def _add_point(contour):
     return new_contour
 
 
+def _as_cv2_contour(contour: np.ndarray) -> np.ndarray:
+    return np.asarray(contour).reshape(-1, 1, 2).astype(np.int32, copy=False)
+
+
 def contours2polygons(
     contours: Tuple[np.ndarray],
     include_inner_contours: bool = False,
@@ -61,71 +66,37 @@ def contours2polygons(
             raise ValueError(
                 "hierarchy must be provided if include_inner_contours is True"
             )
-        # Iterate over all contours and their hierarchies
-        for idx, contour in enumerate(contours):
-            current_hierarchy = hierarchy[0][idx]
-            if current_hierarchy[-1] == -1:
-                if len(contour) < MIN_NR_POINTS_POLYGON:
-                    if (
-                        len(contour) == 4
-                        and cv2.contourArea(contour) > MIN_AREA_RETANGLE_POLYGON
-                        and _is_approx_rectangle(contour)
-                    ):
-                        contour = _add_point(contour)
-                    else:
-                        continue
-
-                # change shape from [N, 1, 2] to [N, 2]
-                contour = np.vstack(contour)
-                outer_points = [Point(x=int(pt[0]), y=int(pt[1])) for pt in contour]
-
-                # Find the indices of the inner contours
-                inner_indices = [i for i, h in enumerate(hierarchy[0]) if h[3] == idx]
-                # Add the corresponding inner contours
-                inner_contours = [contours[inner_idx] for inner_idx in inner_indices]
-                inner_contours = [
-                    np.vstack(inner_contour) for inner_contour in inner_contours
-                ]
-                list_of_inner_points = [
-                    [
-                        Point(x=int(pt[0]), y=int(pt[1]))
-                        for pt in inner_contour.reshape(-1, 2)
-                    ]
-                    for inner_contour in inner_contours
-                ]
-
-                annotations.append(
-                    Polygon(
-                        label=label,
-                        id=str(uuid.uuid4()),
-                        children=[],
-                        parents=[],
-                        points=outer_points,
-                        inner_points=list_of_inner_points,
-                    ),
-                )
-    elif not include_inner_contours:
-        for contour in contours:
-            if len(contour) < MIN_NR_POINTS_POLYGON:
-                if (
-                    len(contour) == 4
-                    and cv2.contourArea(contour) > MIN_AREA_RETANGLE_POLYGON
-                    and _is_approx_rectangle(contour)
-                ):
-                    contour = _add_point(contour)
-                else:
-                    continue
-            contour = np.vstack(contour)
-            points = [Point(x=int(pt[0]), y=int(pt[1])) for pt in contour]
-
-            annotations.append(
-                Polygon(
-                    label=label,
-                    id=str(uuid.uuid4()),
-                    children=[],
-                    parents=[],
-                    points=points,
-                    inner_points=[],
-                ),
+        # Group the inner contours by their outer contour once, instead of scanning the hierarchy per contour.
+        inner_indices = inner_contour_indices(hierarchy)
+        outer_indices = np.flatnonzero(np.asarray(hierarchy)[0, :, 3] == -1).tolist()
+    else:
+        inner_indices = None
+        outer_indices = range(len(contours))
+
+    for idx in outer_indices:
+        contour = contours[idx]
+        if len(contour) < MIN_NR_POINTS_POLYGON:
+            if (
+                len(contour) == 4
+                and cv2.contourArea(contour) > MIN_AREA_RETANGLE_POLYGON
+                and _is_approx_rectangle(contour)
+            ):
+                contour = _add_point(contour)
+            else:
+                continue
+
+        inner_contours = (
+            []
+            if inner_indices is None
+            else [_as_cv2_contour(contours[i]) for i in inner_indices[idx]]
+        )
+        # Points are only created from the contours when they are accessed.
+        annotations.append(
+            Polygon._from_contours(
+                _as_cv2_contour(contour),
+                inner_contours,
+                id=str(uuid.uuid4()),
+                label=label,
             )
+        )
     return annotations
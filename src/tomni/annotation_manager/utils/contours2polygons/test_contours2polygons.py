@@ -6,6 +6,7 @@ from tomni.annotation_manager.utils.contours2polygons.main import (
     contours2polygons,
 )
 from tomni.annotation_manager.annotations import Polygon, Point
+import cv2
 import numpy as np
 import uuid
 
@@ -363,3 +364,53 @@ class TestContours2Polygons(TestCase):
         )
 
         np.testing.assert_array_equal(output, expected)
+
+    def test_many_holes(self) -> None:
+        mask = np.zeros((100, 100), dtype=np.uint8)
+        for x in range(0, 100, 25):
+            cv2.ellipse(mask, (x + 11, 45), (10, 44), 0, 0, 360, 1, -1)
+            for y in range(15, 90, 20):
+                cv2.circle(mask, (x + 11, y), 3, 0, -1)
+        contours, hierarchy = cv2.findContours(
+            mask, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE
+        )
+
+        polygons = contours2polygons(
+            contours, include_inner_contours=True, hierarchy=hierarchy
+        )
+
+        outer_indices = [i for i, h in enumerate(hierarchy[0]) if h[3] == -1]
+        self.assertEqual(len(polygons), len(outer_indices))
+        for polygon, idx in zip(polygons, outer_indices):
+            expected_inner = [
+                [Point(int(x), int(y)) for x, y in contours[i].reshape(-1, 2)]
+                for i, h in enumerate(hierarchy[0])
+                if h[3] == idx
+            ]
+            self.assertEqual(len(expected_inner), 4)
+            self.assertEqual(
+                polygon.points,
+                [Point(int(x), int(y)) for x, y in contours[idx].reshape(-1, 2)],
+            )
+            self.assertEqual(polygon.inner_points, expected_inner)
+
+    def test_points_are_lazy(self) -> None:
+        contours = (
+            np.array(
+                [
+                    [[0, 0]],
+                    [[10, 0]],
+                    [[100, 0]],
+                    [[100, 100]],
+                    [[50, 100]],
+                    [[0, 100]],
+                ],
+                dtype=np.int32,
+            ),
+        )
+
+        polygon = contours2polygons(contours)[0]
+
+        self.assertIsNone(polygon._points)
+        self.assertTrue(np.shares_memory(polygon._contour, contours[0]))
+        self.assertEqual(polygon.points[1], Point(10, 0))
@@ -0,0 +1,24 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dump_json(data: Any) -> bytes:
+    """Serializes data to compact JSON bytes. orjson is used when it is installed, otherwise the json module.
+
+    Args:
+        data (Any): JSON serializable data, e.g. a list of dicts.
+
+    Note:
+        - orjson writes NaN and infinity as null, the json module writes them as NaN and Infinity.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
@@ -0,0 +1,21 @@
+import json
+from unittest import TestCase
+from unittest.mock import patch
+
+from . import main
+from .main import dump_json
+
+
+class TestDumpJson(TestCase):
+    def setUp(self) -> None:
+        self.dicts = [{"type": "ellipse", "center": {"x": 1, "y": 2.5}, "id": "é"}]
+
+    def test_dump_json(self):
+        self.assertEqual(json.loads(dump_json(self.dicts)), self.dicts)
+
+    def test_without_orjson(self):
+        with patch.object(main, "orjson", None):
+            data = dump_json(self.dicts)
+
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(json.loads(data), self.dicts)
@@ -0,0 +1 @@
+from .main import find_label_objects
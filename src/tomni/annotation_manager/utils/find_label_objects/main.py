@@ -0,0 +1,44 @@
+from typing import List, Tuple
+
+import numpy as np
+from scipy import ndimage
+
+
+def find_label_objects(mask: np.ndarray) -> Tuple[np.ndarray, List[Tuple[slice, ...]]]:
+    """Finds the bounding box of every non-zero pixel value of a labeled mask.
+
+    Non-negative integer masks are passed to `scipy.ndimage.find_objects` directly, so the image is traversed once.
+    Other masks, or masks with values far above the number of pixels, are first relabeled to 1...K with np.unique.
+
+    Args:
+        mask (np.ndarray): A labeled mask.
+
+    Returns:
+        Tuple[np.ndarray, List[Tuple[slice, ...]]]: The sorted non-zero pixel values
+            and for every value the slices of its bounding box in the mask.
+    """
+    if mask.dtype == bool:
+        mask = mask.view(np.uint8)
+
+    if mask.size == 0:
+        return np.zeros(0, dtype=mask.dtype), []
+
+    if (
+        np.issubdtype(mask.dtype, np.integer)
+        and mask.min() >= 0
+        and mask.max() <= mask.size
+    ):
+        slices = ndimage.find_objects(mask)
+        values = [value for value, region in enumerate(slices, 1) if region is not None]
+        return np.array(values, dtype=mask.dtype), [
+            slices[value - 1] for value in values
+        ]
+
+    unique_values, inverse = np.unique(mask, return_inverse=True)
+    codes = inverse.reshape(mask.shape) + 1
+    codes[mask == 0] = 0
+    slices = ndimage.find_objects(codes, max_label=len(unique_values))
+    is_object = unique_values != 0
+    return unique_values[is_object], [
+        region for region, keep in zip(slices, is_object) if keep
+    ]
@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+import numpy as np
+
+from .main import find_label_objects
+
+
+class TestFindLabelObjects(TestCase):
+    def setUp(self) -> None:
+        self.mask = np.array(
+            [
+                [0, 0, 3, 3],
+                [1, 0, 0, 3],
+                [1, 1, 0, 0],
+            ]
+        )
+
+    def test_integer_mask(self):
+        values, regions = find_label_objects(self.mask.astype(np.uint16))
+
+        np.testing.assert_array_equal(values, [1, 3])
+        self.assertEqual(
+            regions, [(slice(1, 3), slice(0, 2)), (slice(0, 2), slice(2, 4))]
+        )
+
+    def test_relabeled_mask(self):
+        expected_regions = [(slice(1, 3), slice(0, 2)), (slice(0, 2), slice(2, 4))]
+
+        for mask in [
+            self.mask * 1000,
+            self.mask * -1,
+            self.mask + 0.5 * (self.mask > 0),
+        ]:
+            values, regions = find_label_objects(mask)
+
+            self.assertEqual(len(values), 2)
+            self.assertCountEqual(regions, expected_regions)
+
+    def test_bool_mask(self):
+        values, regions = find_label_objects(self.mask > 0)
+
+        np.testing.assert_array_equal(values, [True])
+        self.assertEqual(regions, [(slice(0, 3), slice(0, 4))])
+
+    def test_empty_mask(self):
+        values, regions = find_label_objects(np.zeros((3, 3), dtype=np.uint8))
+
+        self.assertEqual(len(values), 0)
+        self.assertEqual(regions, [])
@@ -0,0 +1,26 @@
+import json
+import os
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def load_json(source: Union[bytes, bytearray, str, os.PathLike]) -> Any:
+    """Parses JSON from raw bytes or from a file. orjson is used when it is installed, otherwise the json module.
+
+    Args:
+        source (Union[bytes, bytearray, str, os.PathLike]): Raw JSON bytes or the path to a JSON file.
+
+    Returns:
+        Any: The parsed JSON, e.g. a list of dicts.
+    """
+    if not isinstance(source, (bytes, bytearray)):
+        with open(source, "rb") as f:
+            source = f.read()
+
+    if orjson is not None:
+        return orjson.loads(source)
+    return json.loads(source)
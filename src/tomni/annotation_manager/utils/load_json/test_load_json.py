@@ -0,0 +1,29 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from . import main
+from .main import load_json
+
+
+class TestLoadJson(TestCase):
+    def setUp(self) -> None:
+        self.dicts = [{"type": "ellipse", "center": {"x": 1, "y": 2}, "radiusX": 3}]
+        self.data = json.dumps(self.dicts).encode()
+
+    def test_bytes(self):
+        self.assertEqual(load_json(self.data), self.dicts)
+
+    def test_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "annotations.json")
+            with open(path, "wb") as f:
+                f.write(self.data)
+
+            self.assertEqual(load_json(path), self.dicts)
+
+    def test_without_orjson(self):
+        with patch.object(main, "orjson", None):
+            self.assertEqual(load_json(self.data), self.dicts)
@@ -20,3 +20,7 @@ def parse_points_to_inner_contour(
         contour = np.array(contour_points, dtype=np.int32)
         inner_contours.append(contour)
     return inner_contours
+
+
+def parse_contour_to_points(contour: np.ndarray) -> List[Point]:
+    return [Point(x=x, y=y) for x, y in contour.reshape(-1, 2).tolist()]
@@ -1 +1,9 @@
-from .main import overlap_object
+from .main import (
+    OVERLAP_BACKENDS,
+    create_ellipse,
+    create_ellipses,
+    objects2footprints,
+    objects2shapes,
+    overlap_matrix,
+    overlap_object,
+)
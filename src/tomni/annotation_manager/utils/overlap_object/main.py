@@ -1,10 +1,33 @@
 # %%
-from typing import Tuple, Union
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Sequence, Tuple, Union
 
-from shapely import affinity
+import cv2
+import numpy as np
+import shapely
+from scipy.sparse import csr_matrix
 from shapely.geometry import MultiPolygon, Polygon, point
 from shapely.ops import polygonize
 
+from tomni.make_mask.rasterize import fill_ellipse, fill_polygon
+
+# Engines that calculate the overlap of objects:
+# "shapely" intersects the shapes exactly, "raster" counts the pixels the objects share.
+OVERLAP_BACKENDS = ("shapely", "raster")
+
+# Segments per quarter of the unit circle that ellipses are made of, the default of shapely's buffer.
+ELLIPSE_RESOLUTION = 16
+# The number of ellipse polygons that are kept, the least recently used ellipse is dropped first.
+ELLIPSE_CACHE_SIZE = 4096
+
+_ellipse_cache = OrderedDict()
+_ellipse_cache_lock = threading.Lock()
+
+# Binary footprints of objects, each in its own bounding box, with the (x, y) of the top left corner of every box.
+Footprints = Tuple[List[np.ndarray], np.ndarray]
+
 
 def get_boundingbox(annotation_object: dict) -> Tuple[int, int, int, int]:
     """Calculate the bounding box of the dict annotation object.
@@ -58,15 +81,151 @@ def are_boundingboxes_overlapping(
 
 
 def create_ellipse(
-    center: Tuple[int, int], radii: Tuple[int, int], angle: Union[int, None] = 0
+    center: Tuple[int, int],
+    radii: Tuple[int, int],
+    angle: Union[int, None] = 0,
+    resolution: int = ELLIPSE_RESOLUTION,
 ):
+    """Creates the polygon of an ellipse: a unit circle, scaled by the radii (truncated to int) and rotated by the angle
+    in degrees around the center. Ellipses are cached, so the same ellipse is only created once, see `create_ellipses`.
+
+    Args:
+        center (Tuple[int, int]): Center (x, y) of the ellipse.
+        radii (Tuple[int, int]): Radii (x, y) of the ellipse.
+        angle (Union[int, None], optional): Rotation in degrees. Defaults to 0.
+        resolution (int, optional): Segments per quarter of the circle. Defaults to ELLIPSE_RESOLUTION.
+
+    Raises:
+        ValueError: If a radius is negative.
+
+    Returns:
+        Polygon: The ellipse.
+    """
     if radii[0] < 0 or radii[1] < 0:
         raise ValueError("Radi cannot be negative")
-    circ = point.Point(center).buffer(1)
-    ell = affinity.scale(circ, int(radii[0]), int(radii[1]))
-    ellr = affinity.rotate(ell, angle)
 
-    return ellr
+    key = _ellipse_key(center, radii, angle or 0, resolution)
+    with _ellipse_cache_lock:
+        ellipse = _ellipse_cache.get(key)
+        if ellipse is not None:
+            _ellipse_cache.move_to_end(key)
+            return ellipse
+    return create_ellipses([center], [radii], [angle or 0], resolution)[0]
+
+
+def create_ellipses(
+    centers: np.ndarray,
+    radii: np.ndarray,
+    angles: np.ndarray,
+    resolution: int = ELLIPSE_RESOLUTION,
+) -> np.ndarray:
+    """Creates the polygons of many ellipses at once, the same polygons as `create_ellipse`.
+
+    The vertices of all ellipses that are not cached yet are transformed from one unit circle template in one go.
+    Ellipses are kept in a least recently used cache of ELLIPSE_CACHE_SIZE ellipses, so ellipses of masks that are
+    checked again and again are reused. Shapely geometries are immutable, so sharing them is safe.
+
+    Args:
+        centers (np.ndarray): Array of shape [N, 2] with the center (x, y) of every ellipse.
+        radii (np.ndarray): Array of shape [N, 2] with the radii (x, y), truncated to int.
+        angles (np.ndarray): The rotation of every ellipse in degrees.
+        resolution (int, optional): Segments per quarter of the circle. Defaults to ELLIPSE_RESOLUTION.
+
+    Raises:
+        ValueError: If a radius is negative.
+
+    Returns:
+        np.ndarray: Object array with a Polygon per ellipse.
+    """
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+    radii = np.asarray(radii).reshape(-1, 2)
+    if np.any(radii < 0):
+        raise ValueError("Radi cannot be negative")
+    radii = radii.astype(np.int64)
+    angles = np.broadcast_to(np.asarray(angles, dtype=np.float64), len(centers))
+
+    keys = [
+        _ellipse_key(center, radius, angle, resolution)
+        for center, radius, angle in zip(
+            centers.tolist(), radii.tolist(), angles.tolist()
+        )
+    ]
+    ellipses = np.empty(len(keys), dtype=object)
+    missing = []
+    with _ellipse_cache_lock:
+        for row, key in enumerate(keys):
+            ellipse = _ellipse_cache.get(key)
+            if ellipse is None:
+                missing.append(row)
+            else:
+                _ellipse_cache.move_to_end(key)
+                ellipses[row] = ellipse
+    if not missing:
+        return ellipses
+
+    rows = np.array(missing)
+    unit_circle = _unit_circle(resolution)
+    x = unit_circle[:, 0] * radii[rows, :1]
+    y = unit_circle[:, 1] * radii[rows, 1:]
+    theta = np.radians(angles[rows])[:, None]
+    cos, sin = np.cos(theta), np.sin(theta)
+    coordinates = np.stack(
+        [
+            x * cos - y * sin + centers[rows, :1],
+            x * sin + y * cos + centers[rows, 1:],
+        ],
+        axis=-1,
+    )
+    ellipses[rows] = shapely.polygons(coordinates)
+
+    with _ellipse_cache_lock:
+        for row in missing:
+            _ellipse_cache[keys[row]] = ellipses[row]
+        while len(_ellipse_cache) > ELLIPSE_CACHE_SIZE:
+            _ellipse_cache.popitem(last=False)
+    return ellipses
+
+
+def _ellipse_key(
+    center: Tuple[float, float],
+    radii: Tuple[int, int],
+    angle: float,
+    resolution: int,
+) -> Tuple[float, float, int, int, float, int]:
+    return (
+        float(center[0]),
+        float(center[1]),
+        int(radii[0]),
+        int(radii[1]),
+        float(angle),
+        resolution,
+    )
+
+
+@lru_cache(maxsize=None)
+def _unit_circle(resolution: int) -> np.ndarray:
+    """The vertices of the unit circle around (0, 0), the ring of a buffered point."""
+    circle = point.Point(0, 0).buffer(1, quad_segs=resolution)
+    return shapely.get_coordinates(circle.exterior)
+
+
+def repair_polygon(polygon: Polygon) -> Union[Polygon, MultiPolygon]:
+    """Splits an invalid, e.g. self-intersecting, polygon into the valid polygons enclosed by its exterior.
+
+    Args:
+        polygon (Polygon): A shapely polygon.
+
+    Returns:
+        Union[Polygon, MultiPolygon]: The polygon if it is valid, otherwise a MultiPolygon.
+    """
+    if polygon.is_valid:
+        return polygon
+
+    be = polygon.exterior
+    mls = be.intersection(be)
+    polygons = polygonize(mls)
+    multi_polygons = MultiPolygon(polygons)
+    return multi_polygons
 
 
 def object2shape(annotation_object: dict):
@@ -86,15 +245,7 @@ def object2shape(annotation_object: dict):
         if len(object_points) < 3:
             return Polygon()
 
-        polygon = Polygon(object_points)
-        if polygon.is_valid:
-            return polygon
-        else:
-            be = polygon.exterior
-            mls = be.intersection(be)
-            polygons = polygonize(mls)
-            multi_polygons = MultiPolygon(polygons)
-            return multi_polygons
+        return repair_polygon(Polygon(object_points))
 
     elif annotation_object["type"] == "ellipse":
         return create_ellipse(
@@ -106,16 +257,24 @@ def object2shape(annotation_object: dict):
         raise ValueError(f"Object 1 has an unkown type of {annotation_object['type']}")
 
 
-def overlap_object(object_1: dict, object_2: dict) -> float:
+def overlap_object(object_1: dict, object_2: dict, backend: str = "shapely") -> float:
     """This function calculates the overlap percentage of the first object with the second object.
 
     Args:
         object1 (dict): JSON object1 in AxionBio format
         object2 (dict): JSON object2 in AxionBio format
+        backend (str, optional): "shapely" intersects the shapes, "raster" counts the pixels the objects share,
+            see `overlap_matrix`. Defaults to "shapely".
+
+    Raises:
+        ValueError: If the backend is unknown.
 
     Returns:
         int: overlap percentage.
     """
+    if backend == "raster":
+        return float(overlap_matrix([object_1], [object_2], backend=backend)[0, 0])
+    validate_overlap_backend(backend)
 
     bbox1 = get_boundingbox(object_1)
     bbox2 = get_boundingbox(object_2)
@@ -129,3 +288,313 @@ def overlap_object(object_1: dict, object_2: dict) -> float:
     intersect = shape1.intersection(shape2)
     overlap_percentage = intersect.area / (shape1.area + 1e-17)
     return overlap_percentage
+
+
+def objects2shapes(annotation_objects: Sequence[dict]) -> np.ndarray:
+    """Convert object dicts to shapely shapes, the same shapes as `object2shape` creates one by one.
+    The polygons are created with one call of the vectorized shapely constructors, only invalid polygons are repaired one by one.
+    Ellipses are created at once with `create_ellipses`.
+
+    Args:
+        annotation_objects (Sequence[dict]): Annotation objects in AxionBio format.
+
+    Raises:
+        ValueError: If type of an annotation object is unknown.
+
+    Returns:
+        np.ndarray: Object array with a shapely shape per annotation object.
+    """
+    shapes = np.empty(len(annotation_objects), dtype=object)
+    shapes[:] = [Polygon()] * len(annotation_objects)
+
+    polygon_rows = []
+    point_counts = []
+    coordinates = []
+    ellipse_rows = []
+    ellipse_parameters = []
+    for row, annotation_object in enumerate(annotation_objects):
+        if annotation_object["type"] == "polygon":
+            points = annotation_object["points"]
+            # Fewer than 3 points do not enclose an area.
+            if len(points) >= 3:
+                polygon_rows.append(row)
+                point_counts.append(len(points))
+                coordinates.extend([(point["x"], point["y"]) for point in points])
+        elif annotation_object["type"] == "ellipse":
+            ellipse_rows.append(row)
+            ellipse_parameters.append(
+                (
+                    annotation_object["center"]["x"],
+                    annotation_object["center"]["y"],
+                    annotation_object["radiusX"],
+                    annotation_object["radiusY"],
+                    annotation_object["angleOfRotation"],
+                )
+            )
+        else:
+            raise ValueError(
+                f"Object {row} has an unkown type of {annotation_object['type']}"
+            )
+
+    if ellipse_rows:
+        ellipse_parameters = np.array(ellipse_parameters, dtype=np.float64)
+        shapes[ellipse_rows] = create_ellipses(
+            ellipse_parameters[:, :2],
+            ellipse_parameters[:, 2:4],
+            ellipse_parameters[:, 4],
+        )
+
+    if polygon_rows:
+        polygons = shapely.polygons(
+            shapely.linearrings(
+                np.array(coordinates, dtype=np.float64),
+                indices=np.repeat(np.arange(len(polygon_rows)), point_counts),
+            )
+        )
+        for idx in np.flatnonzero(~shapely.is_valid(polygons)):
+            polygons[idx] = repair_polygon(polygons[idx])
+        shapes[polygon_rows] = polygons
+    return shapes
+
+
+def overlap_matrix(
+    objects_a: Union[Sequence[dict], np.ndarray, Footprints],
+    objects_b: Union[Sequence[dict], np.ndarray, Footprints],
+    backend: str = "shapely",
+) -> csr_matrix:
+    """Calculates the overlap percentage of every object of `objects_a` with every object of `objects_b`,
+    as `overlap_object` does for one pair.
+
+    The shapes of both sides are created once and only the pairs whose bounding boxes overlap are compared.
+
+    Args:
+        objects_a (Union[Sequence[dict], np.ndarray, Footprints]): Objects in AxionBio format, or shapely shapes
+            (e.g. from `objects2shapes` or `store_geometries`) for the shapely backend,
+            or footprints (e.g. from `objects2footprints` or `store_footprints`) for the raster backend.
+        objects_b (Union[Sequence[dict], np.ndarray, Footprints]): Objects in the same formats.
+        backend (str, optional): "shapely" intersects the shapes exactly.
+            "raster" draws every object once into a binary footprint of its bounding box, with the pixels of
+            `to_binary_mask`, and counts the pixels that the footprints of a pair share.
+            This is faster for cell-sized objects, but the ratios are pixel counts: polygons include their boundary pixels
+            and coordinates are rounded to whole pixels. Defaults to "shapely".
+
+    Raises:
+        ValueError: If the backend or the type of an object is unknown.
+
+    Returns:
+        csr_matrix: Sparse matrix of shape [len(objects_a), len(objects_b)]. Entry (i, j) is the fraction of the area
+        of object i of `objects_a` that overlaps with object j of `objects_b`, pairs without overlap are not stored.
+    """
+    validate_overlap_backend(backend)
+    if backend == "raster":
+        return _raster_overlap_matrix(
+            _as_footprints(objects_a), _as_footprints(objects_b)
+        )
+
+    shapes_a = _as_shapes(objects_a)
+    shapes_b = _as_shapes(objects_b)
+    idx_a, idx_b = shapely.STRtree(shapes_b).query(shapes_a, predicate="intersects")
+
+    intersections = shapely.area(shapely.intersection(shapes_a[idx_a], shapes_b[idx_b]))
+    ratios = intersections / (shapely.area(shapes_a)[idx_a] + 1e-17)
+    return _sparse_ratios(ratios, idx_a, idx_b, (len(shapes_a), len(shapes_b)))
+
+
+def polygon_footprint(
+    contour: np.ndarray, inner_contours: Sequence[np.ndarray] = ()
+) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """Draws a polygon into a binary footprint of its bounding box, with the same pixels as `fill_polygon`.
+
+    Args:
+        contour (np.ndarray): The outer contour with shape (N, 1, 2) or (N, 2), coordinates are rounded to whole pixels.
+        inner_contours (Sequence[np.ndarray], optional): Contours of the holes. Defaults to ().
+
+    Returns:
+        Tuple[np.ndarray, Tuple[int, int]]: The boolean footprint and the (x, y) of its top left corner.
+        Polygons with fewer than 3 points have an empty footprint.
+    """
+    contour = np.round(np.asarray(contour)).astype(np.int32).reshape(-1, 2)
+    if len(contour) < 3:
+        return np.zeros((0, 0), dtype=bool), (0, 0)
+
+    x, y, width, height = cv2.boundingRect(contour)
+    corner = np.array([x, y], dtype=np.int32)
+    footprint = np.zeros((height, width), dtype=np.uint8)
+    fill_polygon(
+        footprint,
+        contour - corner,
+        [
+            np.round(np.asarray(inner)).astype(np.int32).reshape(-1, 2) - corner
+            for inner in inner_contours
+        ],
+    )
+    return footprint.view(bool), (x, y)
+
+
+def ellipse_footprint(
+    center: Tuple[float, float], radii: Tuple[float, float], angle: float = 0
+) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """Draws an ellipse into a binary footprint around its center, with the same pixels as `fill_ellipse`.
+
+    Args:
+        center (Tuple[float, float]): Center (x, y) of the ellipse, rounded to whole pixels.
+        radii (Tuple[float, float]): Radii (x, y) of the ellipse, truncated as in `create_ellipse`.
+        angle (float, optional): Rotation in degrees. Defaults to 0.
+
+    Returns:
+        Tuple[np.ndarray, Tuple[int, int]]: The boolean footprint and the (x, y) of its top left corner.
+    """
+    radii = (max(int(radii[0]), 0), max(int(radii[1]), 0))
+    # The largest radius bounds the ellipse for every rotation.
+    radius = max(radii) + 1
+    footprint = np.zeros((2 * radius + 1, 2 * radius + 1), dtype=np.uint8)
+    fill_ellipse(footprint, (radius, radius), radii, angle)
+    return footprint.view(bool), (
+        int(round(center[0])) - radius,
+        int(round(center[1])) - radius,
+    )
+
+
+def objects2footprints(annotation_objects: Sequence[dict]) -> Footprints:
+    """Draws object dicts into binary footprints for the raster backend of `overlap_matrix`.
+    As in `object2shape`, holes of polygons are ignored.
+
+    Args:
+        annotation_objects (Sequence[dict]): Annotation objects in AxionBio format.
+
+    Raises:
+        ValueError: If type of an annotation object is unknown.
+
+    Returns:
+        Footprints: The boolean footprint of every object and an array of shape [N, 2] with their top left corners.
+    """
+    footprints = []
+    corners = np.zeros((len(annotation_objects), 2), dtype=np.int64)
+    for row, annotation_object in enumerate(annotation_objects):
+        if annotation_object["type"] == "polygon":
+            footprint, corners[row] = polygon_footprint(
+                [(point["x"], point["y"]) for point in annotation_object["points"]]
+            )
+        elif annotation_object["type"] == "ellipse":
+            footprint, corners[row] = ellipse_footprint(
+                (annotation_object["center"]["x"], annotation_object["center"]["y"]),
+                (annotation_object["radiusX"], annotation_object["radiusY"]),
+                annotation_object["angleOfRotation"],
+            )
+        else:
+            raise ValueError(
+                f"Object {row} has an unkown type of {annotation_object['type']}"
+            )
+        footprints.append(footprint)
+    return footprints, corners
+
+
+def validate_overlap_backend(backend: str) -> str:
+    """Checks that the overlap backend is one of OVERLAP_BACKENDS.
+
+    Raises:
+        ValueError: If the backend is unknown.
+
+    Returns:
+        str: The backend.
+    """
+    if backend not in OVERLAP_BACKENDS:
+        raise ValueError(
+            f"Unknown overlap backend {backend}, expected one of {', '.join(OVERLAP_BACKENDS)}."
+        )
+    return backend
+
+
+def _raster_overlap_matrix(
+    footprints_a: Footprints, footprints_b: Footprints
+) -> csr_matrix:
+    """Counts the pixels that the footprints of every pair with overlapping bounding boxes share."""
+    boxes_a, areas_a = _footprint_boxes(footprints_a)
+    boxes_b, areas_b = _footprint_boxes(footprints_b)
+    shape = (len(boxes_a), len(boxes_b))
+
+    # Empty footprints have no box. The tree only compares the box envelopes, so boxes that only touch are dropped after.
+    rows_a = np.flatnonzero(areas_a > 0)
+    rows_b = np.flatnonzero(areas_b > 0)
+    tree = shapely.STRtree(shapely.box(*boxes_b[rows_b].T))
+    idx_a, idx_b = tree.query(shapely.box(*boxes_a[rows_a].T))
+    idx_a, idx_b = rows_a[idx_a], rows_b[idx_b]
+
+    # The part of each pair where both boxes overlap, in the coordinates of both footprints.
+    overlaps = np.concatenate(
+        [
+            np.maximum(boxes_a[idx_a, :2], boxes_b[idx_b, :2]),
+            np.minimum(boxes_a[idx_a, 2:], boxes_b[idx_b, 2:]),
+        ],
+        axis=1,
+    )
+    is_overlapping = np.all(overlaps[:, 2:] > overlaps[:, :2], axis=1)
+    idx_a, idx_b, overlaps = (
+        idx_a[is_overlapping],
+        idx_b[is_overlapping],
+        overlaps[is_overlapping],
+    )
+    local_a = (overlaps - np.tile(boxes_a[idx_a, :2], 2)).tolist()
+    local_b = (overlaps - np.tile(boxes_b[idx_b, :2], 2)).tolist()
+
+    masks_a, masks_b = footprints_a[0], footprints_b[0]
+    counts = np.zeros(len(idx_a), dtype=np.int64)
+    # One scratch buffer, grown when needed, holds the shared pixels of every pair.
+    scratch = np.empty(0, dtype=bool)
+    for pair, (i, j) in enumerate(zip(idx_a.tolist(), idx_b.tolist())):
+        x0_a, y0_a, x1_a, y1_a = local_a[pair]
+        x0_b, y0_b, x1_b, y1_b = local_b[pair]
+        height, width = y1_a - y0_a, x1_a - x0_a
+        if scratch.size < height * width:
+            scratch = np.empty(height * width, dtype=bool)
+        shared = scratch[: height * width].reshape(height, width)
+        np.logical_and(
+            masks_a[i][y0_a:y1_a, x0_a:x1_a],
+            masks_b[j][y0_b:y1_b, x0_b:x1_b],
+            out=shared,
+        )
+        counts[pair] = np.count_nonzero(shared)
+
+    ratios = counts / (areas_a[idx_a] + 1e-17)
+    return _sparse_ratios(ratios, idx_a, idx_b, shape)
+
+
+def _footprint_boxes(footprints: Footprints) -> Tuple[np.ndarray, np.ndarray]:
+    """The (x0, y0, x1, y1) box with exclusive x1 and y1 and the pixel count of every footprint."""
+    masks, corners = footprints
+    boxes = np.zeros((len(masks), 4), dtype=np.int64)
+    areas = np.zeros(len(masks), dtype=np.int64)
+    for row, mask in enumerate(masks):
+        boxes[row, 2:] = mask.shape[::-1]
+        areas[row] = np.count_nonzero(mask)
+    boxes[:, :2] = corners
+    boxes[:, 2:] += corners
+    return boxes, areas
+
+
+def _sparse_ratios(
+    ratios: np.ndarray, idx_a: np.ndarray, idx_b: np.ndarray, shape: Tuple[int, int]
+) -> csr_matrix:
+    is_overlapping = ratios > 0
+    return csr_matrix(
+        (ratios[is_overlapping], (idx_a[is_overlapping], idx_b[is_overlapping])),
+        shape=shape,
+    )
+
+
+def _as_shapes(objects: Union[Sequence[dict], np.ndarray]) -> np.ndarray:
+    if isinstance(objects, np.ndarray) and objects.dtype == object:
+        if len(objects) == 0 or not isinstance(objects[0], dict):
+            return objects
+    return objects2shapes(objects)
+
+
+def _as_footprints(objects: Union[Sequence[dict], Footprints]) -> Footprints:
+    if (
+        isinstance(objects, tuple)
+        and len(objects) == 2
+        and isinstance(objects[1], np.ndarray)
+        and objects[1].ndim == 2
+    ):
+        return objects
+    return objects2footprints(objects)
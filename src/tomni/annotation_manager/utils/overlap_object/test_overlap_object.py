@@ -1,5 +1,22 @@
 from unittest import TestCase
-from .main import overlap_object
+from unittest.mock import patch
+
+import numpy as np
+import shapely
+from shapely import affinity
+from shapely.geometry import Point
+
+from tomni.make_mask import make_mask_contour
+
+from . import main
+from .main import (
+    create_ellipse,
+    create_ellipses,
+    objects2footprints,
+    objects2shapes,
+    overlap_matrix,
+    overlap_object,
+)
 
 
 class Test_overlap_object(TestCase):
@@ -213,3 +230,211 @@ class Test_overlap_object(TestCase):
         overlap = overlap_object(object1, object2)
         expOverlap = 0
         self.assertAlmostEqual(overlap, expOverlap, places=1)
+
+
+class Test_overlap_matrix(TestCase):
+    def setUp(self):
+        def square(x, y, size):
+            return {
+                "type": "polygon",
+                "points": [
+                    {"x": x, "y": y},
+                    {"x": x + size, "y": y},
+                    {"x": x + size, "y": y + size},
+                    {"x": x, "y": y + size},
+                ],
+            }
+
+        def ellipse(x, y, radius_x, radius_y):
+            return {
+                "type": "ellipse",
+                "center": {"x": x, "y": y},
+                "radiusX": radius_x,
+                "radiusY": radius_y,
+                "angleOfRotation": 0,
+            }
+
+        bowtie = {
+            "type": "polygon",
+            "points": [
+                {"x": 0, "y": 0},
+                {"x": 10, "y": 10},
+                {"x": 10, "y": 0},
+                {"x": 0, "y": 10},
+            ],
+        }
+        line = {"type": "polygon", "points": [{"x": 0, "y": 0}, {"x": 5, "y": 5}]}
+        self.objects_a = [
+            square(0, 0, 10),
+            ellipse(20, 20, 5, 3),
+            bowtie,
+            line,
+            square(100, 100, 5),
+        ]
+        self.objects_b = [
+            square(5, 5, 10),
+            ellipse(22, 20, 6, 6),
+            square(0, 0, 4),
+            square(10, 0, 10),
+        ]
+
+    def test_equal_to_overlap_object(self):
+        matrix = overlap_matrix(self.objects_a, self.objects_b)
+
+        self.assertEqual(matrix.shape, (5, 4))
+        for i, object_a in enumerate(self.objects_a):
+            for j, object_b in enumerate(self.objects_b):
+                self.assertAlmostEqual(matrix[i, j], overlap_object(object_a, object_b))
+
+    def test_only_overlapping_pairs_are_stored(self):
+        matrix = overlap_matrix(self.objects_a, self.objects_b)
+
+        # Touching squares and objects without area have no overlap.
+        self.assertEqual(matrix.nnz, 5)
+        self.assertEqual(matrix[0, 3], 0)
+        self.assertEqual(matrix[3].nnz, 0)
+
+    def test_shapes(self):
+        shapes_a = objects2shapes(self.objects_a)
+        shapes_b = objects2shapes(self.objects_b)
+
+        np.testing.assert_allclose(
+            overlap_matrix(shapes_a, shapes_b).toarray(),
+            overlap_matrix(self.objects_a, self.objects_b).toarray(),
+        )
+
+    def test_empty(self):
+        self.assertEqual(overlap_matrix([], self.objects_b).shape, (0, 4))
+        self.assertEqual(overlap_matrix(self.objects_a, []).shape, (5, 0))
+
+    def test_unknown_type(self):
+        self.assertRaises(
+            ValueError, overlap_matrix, [{"type": "point"}], self.objects_b
+        )
+
+    def test_raster_counts_shared_pixels(self):
+        square = self.objects_a[0]
+        other = self.objects_b[0]
+        mask = make_mask_contour((30, 30), _contour(square))
+        other_mask = make_mask_contour((30, 30), _contour(other))
+
+        actual = overlap_matrix([square], [other], backend="raster")[0, 0]
+
+        self.assertAlmostEqual(
+            actual, np.count_nonzero(mask & other_mask) / np.count_nonzero(mask)
+        )
+
+    def test_raster_close_to_shapely(self):
+        # Large objects, so the boundary pixels hardly count.
+        objects_a = [_scaled(o, 20) for o in self.objects_a if o["type"] == "polygon"]
+        objects_b = [_scaled(o, 20) for o in self.objects_b if o["type"] == "polygon"]
+
+        expected = overlap_matrix(objects_a, objects_b).toarray()
+        actual = overlap_matrix(objects_a, objects_b, backend="raster").toarray()
+
+        np.testing.assert_allclose(actual, expected, atol=0.02)
+
+    def test_raster_footprints(self):
+        footprints_a = objects2footprints(self.objects_a)
+        footprints_b = objects2footprints(self.objects_b)
+
+        np.testing.assert_array_equal(
+            overlap_matrix(footprints_a, footprints_b, backend="raster").toarray(),
+            overlap_matrix(self.objects_a, self.objects_b, backend="raster").toarray(),
+        )
+
+    def test_raster_overlap_object(self):
+        for object_a in self.objects_a:
+            for object_b in self.objects_b:
+                self.assertEqual(
+                    overlap_object(object_a, object_b, backend="raster"),
+                    overlap_matrix([object_a], [object_b], backend="raster")[0, 0],
+                )
+
+    def test_raster_empty(self):
+        self.assertEqual(
+            overlap_matrix([], self.objects_b, backend="raster").shape, (0, 4)
+        )
+        self.assertEqual(overlap_matrix(self.objects_a, [], backend="raster").nnz, 0)
+
+    def test_unknown_backend(self):
+        self.assertRaises(
+            ValueError, overlap_matrix, self.objects_a, self.objects_b, backend="gpu"
+        )
+        self.assertRaises(
+            ValueError,
+            overlap_object,
+            self.objects_a[0],
+            self.objects_b[0],
+            backend="gpu",
+        )
+
+
+class Test_create_ellipse(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.centers = rng.uniform(0, 100, (20, 2))
+        self.radii = rng.uniform(0, 30, (20, 2))
+        self.angles = rng.uniform(-180, 180, 20)
+
+    def test_equal_to_affine_transform_of_buffer(self):
+        for center, radii, angle in zip(self.centers, self.radii, self.angles):
+            expected = affinity.rotate(
+                affinity.scale(Point(center).buffer(1), int(radii[0]), int(radii[1])),
+                angle,
+            )
+
+            actual = create_ellipse(tuple(center), tuple(radii), angle)
+
+            self.assertTrue(shapely.equals_exact(actual, expected, tolerance=1e-9))
+
+    def test_create_ellipses_equal_to_create_ellipse(self):
+        expected = [
+            create_ellipse(tuple(center), tuple(radii), angle, resolution=4)
+            for center, radii, angle in zip(self.centers, self.radii, self.angles)
+        ]
+
+        actual = create_ellipses(self.centers, self.radii, self.angles, resolution=4)
+
+        self.assertTrue(all(shapely.equals_exact(actual, expected, tolerance=0)))
+
+    def test_resolution(self):
+        ellipse = create_ellipse((10, 10), (5, 3), 0, resolution=4)
+
+        # 4 segments per quarter and the closing vertex.
+        self.assertEqual(len(ellipse.exterior.coords), 17)
+
+    def test_cached(self):
+        ellipse = create_ellipse((10, 10), (5, 3), 45)
+
+        self.assertIs(create_ellipse((10.0, 10.0), (5.9, 3), 45.0), ellipse)
+        self.assertIsNot(create_ellipse((10, 10), (5, 3), 46), ellipse)
+
+    def test_least_recently_used_is_dropped(self):
+        with patch.object(main, "ELLIPSE_CACHE_SIZE", 2):
+            first = create_ellipse((1, 1), (2, 2), 0)
+            second = create_ellipse((2, 2), (2, 2), 0)
+            self.assertIs(create_ellipse((1, 1), (2, 2), 0), first)
+            create_ellipse((3, 3), (2, 2), 0)
+
+            self.assertIs(create_ellipse((1, 1), (2, 2), 0), first)
+            self.assertIsNot(create_ellipse((2, 2), (2, 2), 0), second)
+            self.assertLessEqual(len(main._ellipse_cache), 2)
+
+    def test_negative_radius(self):
+        self.assertRaises(ValueError, create_ellipse, (10, 10), (-1, 3))
+        self.assertRaises(
+            ValueError, create_ellipses, self.centers, -self.radii, self.angles
+        )
+
+
+def _contour(polygon: dict) -> np.ndarray:
+    return np.array([[point["x"], point["y"]] for point in polygon["points"]])
+
+
+def _scaled(polygon: dict, factor: int) -> dict:
+    points = [
+        {"x": point["x"] * factor, "y": point["y"] * factor}
+        for point in polygon["points"]
+    ]
+    return {**polygon, "points": points}
@@ -0,0 +1 @@
+from .main import simplify_rings
@@ -0,0 +1,187 @@
+from typing import Tuple, Union
+
+import numpy as np
+
+
+def simplify_rings(
+    vertices: np.ndarray,
+    ring_offsets: np.ndarray,
+    epsilon: Union[float, None] = None,
+    max_vertices: Union[int, None] = None,
+    min_vertices: int = 5,
+) -> np.ndarray:
+    """Simplifies many rings of a flat vertex buffer at once, e.g. the vertices of an AnnotationStore.
+
+    Two simplifications are offered, when both are given the rings are first simplified with epsilon and then capped:
+    - `epsilon` uses the Ramer-Douglas-Peucker algorithm on every ring as an open line from its first to its last vertex,
+      with the same result as `compress_polygon_points`. Rings that would keep fewer than `min_vertices` vertices are
+      not simplified.
+    - `max_vertices` caps the number of vertices of every ring with the Visvalingam-Whyatt algorithm: the vertices that
+      span the smallest triangles with their neighbours are removed until `max_vertices` are left. Every round removes
+      the vertices that are smaller than both neighbours in all rings at once.
+
+    Args:
+        vertices (np.ndarray): Array of shape [N, 2] with the vertices of all rings after each other.
+        ring_offsets (np.ndarray): Start of every ring in `vertices`, followed by the total number of vertices.
+        epsilon (Union[float, None], optional): Epsilon value in Ramer-Douglas-Peucker algorithm. The smaller the epsilon,
+            the more points are kept and the more faithful the simplified curve is to the original one. Defaults to None.
+        max_vertices (Union[int, None], optional): The maximum number of vertices of a ring. Defaults to None.
+        min_vertices (int, optional): The minimum number of vertices of a simplified ring. Defaults to 5.
+
+    Raises:
+        ValueError: If epsilon is negative or max_vertices is smaller than min_vertices.
+
+    Returns:
+        np.ndarray: Boolean array with a value per vertex, True for the vertices that are kept.
+    """
+    if epsilon is not None and epsilon < 0:
+        raise ValueError(f"Epsilon must be at least 0, got {epsilon}.")
+    if max_vertices is not None and max_vertices < min_vertices:
+        raise ValueError(
+            f"max_vertices must be at least min_vertices ({min_vertices}), got {max_vertices}."
+        )
+
+    points = np.asarray(vertices, dtype=np.float64).reshape(-1, 2)
+    ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+    keep = np.ones(len(points), dtype=bool)
+
+    # An epsilon of 0 keeps every vertex, as in `simplify_coords`.
+    if epsilon is not None and epsilon > 0:
+        keep = _ramer_douglas_peucker(points, ring_offsets, epsilon)
+        # Rings that become too small are kept as they are.
+        ring_counts = np.add.reduceat(keep, ring_offsets[:-1]) if len(keep) else []
+        too_small = np.flatnonzero(
+            (np.asarray(ring_counts) < min_vertices) & (np.diff(ring_offsets) > 0)
+        )
+        starts, ends = ring_offsets[too_small], ring_offsets[too_small + 1]
+        keep[_ranges(starts, ends)[0]] = True
+
+    if max_vertices is not None:
+        kept = np.flatnonzero(keep)
+        kept_offsets = np.searchsorted(kept, ring_offsets)
+        keep[kept[~_visvalingam_whyatt(points[kept], kept_offsets, max_vertices)]] = (
+            False
+        )
+    return keep
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """All indices of the ranges [start, end) and the range every index belongs to."""
+    counts = ends - starts
+    total = int(counts.sum())
+    range_ids = np.repeat(np.arange(len(starts)), counts)
+    indices = np.arange(total, dtype=np.int64) + np.repeat(
+        starts - (np.cumsum(counts) - counts), counts
+    )
+    return indices, range_ids
+
+
+def _segment_distances(
+    points: np.ndarray, starts: np.ndarray, ends: np.ndarray
+) -> np.ndarray:
+    """Distance of every point to its line segment, with the same float operations as `simplify_coords`."""
+    dx = ends[:, 0] - starts[:, 0]
+    dy = ends[:, 1] - starts[:, 1]
+    length_squared = dx * dx + dy * dy
+    to_start = np.hypot(points[:, 0] - starts[:, 0], points[:, 1] - starts[:, 1])
+    to_end = np.hypot(points[:, 0] - ends[:, 0], points[:, 1] - ends[:, 1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = (
+            (points[:, 0] - starts[:, 0]) * dx + (points[:, 1] - starts[:, 1]) * dy
+        ) / length_squared
+        s = (
+            (starts[:, 1] - points[:, 1]) * dx - (starts[:, 0] - points[:, 0]) * dy
+        ) / length_squared
+        distances = np.abs(s) * np.hypot(dx, dy)
+    distances = np.where(r <= 0, to_start, distances)
+    distances = np.where(r >= 1, to_end, distances)
+    return np.where(length_squared == 0, to_start, distances)
+
+
+def _ramer_douglas_peucker(
+    points: np.ndarray, ring_offsets: np.ndarray, epsilon: float
+) -> np.ndarray:
+    """Every iteration splits the segments of all rings at their farthest vertex at once."""
+    keep = np.zeros(len(points), dtype=bool)
+    ring_starts, ring_ends = ring_offsets[:-1], ring_offsets[1:] - 1
+    has_vertices = ring_ends >= ring_starts
+    keep[ring_starts[has_vertices]] = True
+    keep[ring_ends[has_vertices]] = True
+
+    is_split = ring_ends - ring_starts >= 2
+    segment_starts, segment_ends = ring_starts[is_split], ring_ends[is_split]
+    while len(segment_starts):
+        indices, segment_ids = _ranges(segment_starts + 1, segment_ends)
+        distances = _segment_distances(
+            points[indices],
+            points[segment_starts][segment_ids],
+            points[segment_ends][segment_ids],
+        )
+        first_indices = np.searchsorted(segment_ids, np.arange(len(segment_starts)))
+        max_distances = np.maximum.reduceat(distances, first_indices)
+        # The last vertex with the largest distance splits the segment.
+        splits = np.maximum.reduceat(
+            np.where(distances == max_distances[segment_ids], indices, -1),
+            first_indices,
+        )
+
+        is_split = max_distances > epsilon
+        splits = splits[is_split]
+        keep[splits] = True
+        segment_starts = np.concatenate([segment_starts[is_split], splits])
+        segment_ends = np.concatenate([splits, segment_ends[is_split]])
+        is_long = segment_ends - segment_starts >= 2
+        segment_starts, segment_ends = segment_starts[is_long], segment_ends[is_long]
+    return keep
+
+
+def _visvalingam_whyatt(
+    points: np.ndarray, ring_offsets: np.ndarray, max_vertices: int
+) -> np.ndarray:
+    """Removes the vertices with the smallest triangles of closed rings in rounds, until no ring has too many vertices.
+    A vertex is removed in a round when its triangle is smaller than those of both neighbours, so no two neighbours
+    are removed at once. Ties are broken by the vertex index."""
+    keep = np.ones(len(points), dtype=bool)
+    ring_lengths = np.diff(ring_offsets)
+    ring_ids = np.repeat(np.arange(len(ring_lengths)), ring_lengths)
+
+    # The rings are closed, the neighbours of the first and last vertex wrap around.
+    next_vertices = np.arange(1, len(points) + 1)
+    next_vertices[ring_offsets[1:][ring_lengths > 0] - 1] = ring_offsets[:-1][
+        ring_lengths > 0
+    ]
+    previous_vertices = np.empty_like(next_vertices)
+    previous_vertices[next_vertices] = np.arange(len(points))
+
+    excess = np.maximum(ring_lengths - max_vertices, 0)
+    while excess.any():
+        vertices = np.flatnonzero(keep & (excess[ring_ids] > 0))
+        previous, following = previous_vertices[vertices], next_vertices[vertices]
+        areas = np.zeros(len(points))
+        areas[vertices] = 0.5 * np.abs(
+            (points[previous, 0] - points[vertices, 0])
+            * (points[following, 1] - points[vertices, 1])
+            - (points[previous, 1] - points[vertices, 1])
+            * (points[following, 0] - points[vertices, 0])
+        )
+
+        def is_smaller(neighbours: np.ndarray) -> np.ndarray:
+            return (areas[vertices] < areas[neighbours]) | (
+                (areas[vertices] == areas[neighbours]) & (vertices < neighbours)
+            )
+
+        candidates = vertices[is_smaller(previous) & is_smaller(following)]
+        # Only the smallest candidates of a ring are removed when fewer vertices are in excess.
+        candidate_rings = ring_ids[candidates]
+        order = np.lexsort((candidates, areas[candidates], candidate_rings))
+        candidates, candidate_rings = candidates[order], candidate_rings[order]
+        first_candidates = np.searchsorted(candidate_rings, candidate_rings)
+        rank = np.arange(len(candidates)) - first_candidates
+        removed = candidates[rank < excess[candidate_rings]]
+
+        keep[removed] = False
+        np.subtract.at(excess, ring_ids[removed], 1)
+        previous, following = previous_vertices[removed], next_vertices[removed]
+        next_vertices[previous] = following
+        previous_vertices[following] = previous
+    return keep
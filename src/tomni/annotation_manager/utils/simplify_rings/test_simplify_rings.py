@@ -0,0 +1,85 @@
+from unittest import TestCase
+
+import numpy as np
+from simplification.cutil import simplify_coords
+
+from .main import simplify_rings
+
+
+class TestSimplifyRings(TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.rings = []
+        for n_vertices in [40, 7, 120, 3, 60]:
+            angles = np.sort(rng.uniform(0, 2 * np.pi, n_vertices))
+            radii = rng.uniform(20, 30, n_vertices)
+            self.rings.append(
+                np.round(
+                    np.column_stack(
+                        [100 + radii * np.cos(angles), 100 + radii * np.sin(angles)]
+                    )
+                )
+            )
+        self.vertices = np.concatenate(self.rings)
+        self.ring_offsets = np.concatenate(
+            [[0], np.cumsum([len(ring) for ring in self.rings])]
+        )
+
+    def _split(self, keep: np.ndarray):
+        return [
+            self.vertices[start:end][keep[start:end]]
+            for start, end in zip(self.ring_offsets[:-1], self.ring_offsets[1:])
+        ]
+
+    def test_same_as_simplify_coords(self):
+        for epsilon in [0, 0.5, 1, 3, 10]:
+            keep = simplify_rings(
+                self.vertices, self.ring_offsets, epsilon=epsilon, min_vertices=0
+            )
+
+            for ring, actual in zip(self.rings, self._split(keep)):
+                expected = np.array(simplify_coords(ring.tolist(), epsilon))
+                np.testing.assert_array_equal(actual, expected)
+
+    def test_too_small_rings_are_kept(self):
+        keep = simplify_rings(self.vertices, self.ring_offsets, epsilon=100)
+
+        for ring, actual in zip(self.rings, self._split(keep)):
+            np.testing.assert_array_equal(actual, ring)
+
+    def test_max_vertices(self):
+        keep = simplify_rings(self.vertices, self.ring_offsets, max_vertices=10)
+
+        actual = [len(ring) for ring in self._split(keep)]
+
+        self.assertEqual(actual, [10, 7, 10, 3, 10])
+
+    def test_epsilon_and_max_vertices(self):
+        keep_epsilon = simplify_rings(self.vertices, self.ring_offsets, epsilon=1)
+        keep = simplify_rings(
+            self.vertices, self.ring_offsets, epsilon=1, max_vertices=10
+        )
+
+        self.assertFalse(np.any(keep & ~keep_epsilon))
+        self.assertTrue(all(len(ring) <= 10 for ring in self._split(keep)))
+
+    def test_removes_smallest_triangle(self):
+        vertices = np.array([[0, 0], [5, 0.1], [10, 0], [10, 10], [5, 12], [0, 10]])
+
+        keep = simplify_rings(vertices, [0, 6], max_vertices=5)
+
+        np.testing.assert_array_equal(keep, [True, False, True, True, True, True])
+
+    def test_nothing_to_simplify(self):
+        keep = simplify_rings(self.vertices, self.ring_offsets)
+
+        self.assertTrue(keep.all())
+        self.assertEqual(
+            len(simplify_rings(np.zeros((0, 2)), [0], epsilon=1, max_vertices=5)), 0
+        )
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            simplify_rings(self.vertices, self.ring_offsets, epsilon=-1)
+        with self.assertRaises(ValueError):
+            simplify_rings(self.vertices, self.ring_offsets, max_vertices=3)
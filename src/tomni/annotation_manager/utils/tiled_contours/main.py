@@ -0,0 +1,270 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Union
+
+import cv2
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+DEFAULT_TILE_SIZE = 4096
+
+# An object: its outer contour and the contours of its holes.
+ContourObject = Tuple[np.ndarray, List[np.ndarray]]
+
+
+def find_contours_tiled(
+    mask: np.ndarray,
+    include_inner_contours: bool = False,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    max_workers: Union[int, None] = None,
+) -> Tuple[List[np.ndarray], Union[np.ndarray, None]]:
+    """Finds the same contours as `cv2.findContours` on `mask.astype(np.uint8)` while reading the mask in tiles.
+
+    Every tile is read with a 1 pixel border of its neighbours and split into connected components.
+    Components that stay inside the tile are traced in the tile. Components that reach into the border cross a seam:
+    their parts in the different tiles are joined with a union-find over the seam pixels,
+    after which every crossing object is traced in a crop of its own bounding box.
+    Peak memory is proportional to the tile size times the number of workers and the size of the largest crossing object,
+    not to the size of the mask.
+
+    Args:
+        mask (np.ndarray): A binary mask or an array-like that supports 2D slicing, e.g. a memory-mapped array.
+        include_inner_contours (bool, optional): Return inner contours as RETR_CCOMP does,
+            otherwise only the outer contours as RETR_EXTERNAL does. Defaults to False.
+        tile_size (int, optional): Height and width of the tiles. Defaults to 4096.
+        max_workers (Union[int, None], optional): The number of threads that process tiles. Defaults to None,
+            which uses the default of ThreadPoolExecutor.
+
+    Returns:
+        Tuple[List[np.ndarray], Union[np.ndarray, None]]: The contours in the order of cv2.findContours with
+            CHAIN_APPROX_SIMPLE and, with `include_inner_contours`, a hierarchy in which inner contours
+            have their outer contour as parent.
+    """
+    height, width = mask.shape[:2]
+    tiles = [
+        (y, x, min(y + tile_size, height), min(x + tile_size, width))
+        for y in range(0, height, tile_size)
+        for x in range(0, width, tile_size)
+    ]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tile_results = list(executor.map(lambda tile: _process_tile(mask, tile), tiles))
+        seam_objects = _stitch_seam_objects(mask, tile_results, executor)
+
+    objects = [obj for result in tile_results for obj in result["objects"]]
+    objects.extend(seam_objects)
+    # cv2.findContours returns outer contours in reverse raster order of their first pixel.
+    objects.sort(key=lambda obj: (-obj[0][0, 0, 1], -obj[0][0, 0, 0]))
+
+    if not include_inner_contours:
+        return [outer for outer, _ in _remove_nested_objects(objects)], None
+
+    contours = []
+    parents = []
+    for outer, inner_contours in objects:
+        parent = len(contours)
+        contours.append(outer)
+        parents.append(-1)
+        contours.extend(inner_contours)
+        parents.extend([parent] * len(inner_contours))
+
+    if not contours:
+        return [], None
+    hierarchy = np.full((1, len(contours), 4), -1, dtype=np.int32)
+    hierarchy[0, :, 3] = parents
+    return contours, hierarchy
+
+
+def _trace_objects(binary: np.ndarray, offset: Tuple[int, int]) -> List[ContourObject]:
+    """Outer and inner contours of every component of a uint8 mask, with a 1 pixel padding so edges are traced as in the full mask."""
+    padded = cv2.copyMakeBorder(binary, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+    contours, hierarchy = cv2.findContours(
+        padded,
+        cv2.RETR_CCOMP,
+        cv2.CHAIN_APPROX_SIMPLE,
+        offset=(offset[0] - 1, offset[1] - 1),
+    )
+    if hierarchy is None:
+        return []
+
+    parents = hierarchy[0, :, 3]
+    inner_contours = {idx: [] for idx in np.flatnonzero(parents == -1).tolist()}
+    for idx in np.flatnonzero(parents != -1).tolist():
+        inner_contours[int(parents[idx])].append(contours[idx])
+    return [(contours[idx], holes) for idx, holes in inner_contours.items()]
+
+
+def _ring_coordinates(
+    rows: Tuple[int, ...], cols: Tuple[int, ...], y_range: range, x_range: range
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Local coordinates of full rows within x_range and full columns within y_range."""
+    ys = [np.full(len(x_range), row) for row in rows]
+    xs = [np.arange(x_range.start, x_range.stop) for _ in rows]
+    ys += [np.arange(y_range.start, y_range.stop) for _ in cols]
+    xs += [np.full(len(y_range), col) for col in cols]
+    if not ys:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(ys).astype(np.int64), np.concatenate(xs).astype(np.int64)
+
+
+def _process_tile(mask: np.ndarray, tile: Tuple[int, int, int, int]) -> Dict:
+    height, width = mask.shape[:2]
+    y0, x0, y1, x1 = tile
+    ey0, ex0 = max(y0 - 1, 0), max(x0 - 1, 0)
+    ey1, ex1 = min(y1 + 1, height), min(x1 + 1, width)
+    binary = np.ascontiguousarray(np.asarray(mask[ey0:ey1, ex0:ex1]).astype(np.uint8))
+    n_labels, labels, stats, _ = cv2.connectedComponentsWithStats(
+        binary, connectivity=8, ltype=cv2.CV_32S
+    )
+
+    # The core is the tile itself, the halo is the border read from the neighbouring tiles.
+    cy0, cx0 = y0 - ey0, x0 - ex0
+    cy1, cx1 = cy0 + y1 - y0, cx0 + x1 - x0
+    extended_height, extended_width = binary.shape
+    halo_y, halo_x = _ring_coordinates(
+        tuple(
+            row
+            for row, is_halo in ((0, cy0 > 0), (cy1, cy1 < extended_height))
+            if is_halo
+        ),
+        (),
+        range(0),
+        range(0, extended_width),
+    )
+    side_y, side_x = _ring_coordinates(
+        (),
+        tuple(
+            col
+            for col, is_halo in ((0, cx0 > 0), (cx1, cx1 < extended_width))
+            if is_halo
+        ),
+        range(cy0, cy1),
+        range(0),
+    )
+    halo_y, halo_x = np.concatenate([halo_y, side_y]), np.concatenate([halo_x, side_x])
+    edge_y, edge_x = _ring_coordinates(
+        tuple(sorted({cy0, cy1 - 1})),
+        tuple(sorted({cx0, cx1 - 1})),
+        range(cy0, cy1),
+        range(cx0, cx1),
+    )
+
+    halo_labels = labels[halo_y, halo_x]
+    has_core = np.bincount(labels[cy0:cy1, cx0:cx1].ravel(), minlength=n_labels) > 0
+    has_halo = np.bincount(halo_labels, minlength=n_labels) > 0
+    is_seam = has_core & has_halo
+    is_seam[0] = False
+    is_complete = has_core & ~has_halo
+    is_complete[0] = False
+
+    objects = []
+    if is_complete.any():
+        binary[~is_complete[labels]] = 0
+        objects = _trace_objects(binary, (ex0, ey0))
+
+    # Seam pixels: the halo pixels of seam components and the foreground pixels on the edge of the core.
+    is_seam_halo = is_seam[halo_labels]
+    edge_labels = labels[edge_y, edge_x]
+    is_edge_foreground = edge_labels > 0
+    return {
+        "objects": objects,
+        "n_labels": n_labels,
+        "bboxes": np.column_stack(
+            [
+                stats[:, cv2.CC_STAT_LEFT] + ex0,
+                stats[:, cv2.CC_STAT_TOP] + ey0,
+                stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH] + ex0,
+                stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT] + ey0,
+            ]
+        ),
+        "halo_labels": halo_labels[is_seam_halo],
+        "halo_pixels": (halo_y[is_seam_halo] + ey0) * width
+        + halo_x[is_seam_halo]
+        + ex0,
+        "edge_labels": edge_labels[is_edge_foreground],
+        "edge_pixels": (edge_y[is_edge_foreground] + ey0) * width
+        + edge_x[is_edge_foreground]
+        + ex0,
+    }
+
+
+def _stitch_seam_objects(
+    mask: np.ndarray, tile_results: List[Dict], executor: ThreadPoolExecutor
+) -> List[ContourObject]:
+    """Joins the components that cross tile seams and traces every joined object in a crop of its bounding box."""
+    label_offsets = np.cumsum([0] + [result["n_labels"] for result in tile_results])
+    halo_nodes = np.concatenate(
+        [r["halo_labels"] + o for r, o in zip(tile_results, label_offsets)]
+    ).astype(np.int64)
+    if len(halo_nodes) == 0:
+        return []
+    halo_pixels = np.concatenate([r["halo_pixels"] for r in tile_results])
+    edge_nodes = np.concatenate(
+        [r["edge_labels"] + o for r, o in zip(tile_results, label_offsets)]
+    ).astype(np.int64)
+    edge_pixels = np.concatenate([r["edge_pixels"] for r in tile_results])
+
+    # Every halo pixel is on the edge of the core of exactly one other tile: the same pixel, so the same object.
+    order = np.argsort(edge_pixels, kind="stable")
+    matches = order[np.searchsorted(edge_pixels, halo_pixels, sorter=order)]
+    n_nodes = int(label_offsets[-1])
+    graph = coo_matrix(
+        (np.ones(len(halo_nodes)), (halo_nodes, edge_nodes[matches])),
+        shape=(n_nodes, n_nodes),
+    )
+    _, node_groups = connected_components(graph, directed=False)
+
+    seam_nodes = np.unique(halo_nodes)
+    seam_groups = node_groups[seam_nodes]
+    bboxes = np.concatenate([result["bboxes"] for result in tile_results])[seam_nodes]
+    # A halo pixel of every seam node serves as seed to find the object in its crop.
+    _, first_halo = np.unique(halo_nodes, return_index=True)
+    seeds = halo_pixels[first_halo]
+
+    groups, group_idx = np.unique(seam_groups, return_inverse=True)
+    group_bboxes = np.empty((len(groups), 4), dtype=np.int64)
+    group_bboxes[:, :2] = np.iinfo(np.int64).max
+    group_bboxes[:, 2:] = np.iinfo(np.int64).min
+    np.minimum.at(group_bboxes[:, 0], group_idx, bboxes[:, 0])
+    np.minimum.at(group_bboxes[:, 1], group_idx, bboxes[:, 1])
+    np.maximum.at(group_bboxes[:, 2], group_idx, bboxes[:, 2])
+    np.maximum.at(group_bboxes[:, 3], group_idx, bboxes[:, 3])
+    group_seeds = np.empty(len(groups), dtype=np.int64)
+    group_seeds[group_idx] = seeds
+
+    width = mask.shape[1]
+
+    def trace_group(idx: int) -> List[ContourObject]:
+        x0, y0, x1, y1 = group_bboxes[idx].tolist()
+        seed_y, seed_x = divmod(int(group_seeds[idx]), width)
+        binary = np.ascontiguousarray(np.asarray(mask[y0:y1, x0:x1]).astype(np.uint8))
+        _, labels = cv2.connectedComponents(binary, connectivity=8, ltype=cv2.CV_32S)
+        component = (labels == labels[seed_y - y0, seed_x - x0]).view(np.uint8)
+        return _trace_objects(component, (x0, y0))
+
+    return [
+        obj for objs in executor.map(trace_group, range(len(groups))) for obj in objs
+    ]
+
+
+def _remove_nested_objects(objects: List[ContourObject]) -> List[ContourObject]:
+    """Removes objects inside a hole of another object, as RETR_EXTERNAL does."""
+    starts = np.array([outer[0, 0] for outer, _ in objects], dtype=np.int64).reshape(
+        -1, 2
+    )
+    is_nested = np.zeros(len(objects), dtype=bool)
+    for outer, inner_contours in objects:
+        if not inner_contours:
+            continue
+        x, y, w, h = cv2.boundingRect(outer)
+        candidates = np.flatnonzero(
+            (starts[:, 0] > x)
+            & (starts[:, 0] < x + w - 1)
+            & (starts[:, 1] > y)
+            & (starts[:, 1] < y + h - 1)
+        )
+        for idx in candidates.tolist():
+            point = (float(starts[idx, 0]), float(starts[idx, 1]))
+            if cv2.pointPolygonTest(outer, point, False) > 0:
+                is_nested[idx] = True
+    return [obj for obj, nested in zip(objects, is_nested) if not nested]
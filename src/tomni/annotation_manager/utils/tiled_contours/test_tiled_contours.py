@@ -0,0 +1,88 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import cv2
+import numpy as np
+from scipy import ndimage
+
+from .main import find_contours_tiled
+
+
+def _objects(contours, hierarchy):
+    """Outer contours with their inner contours, as lists for comparison."""
+    if hierarchy is None:
+        return [(contour.tolist(), []) for contour in contours]
+    parents = hierarchy[0, :, 3]
+    return [
+        (
+            contours[idx].tolist(),
+            [contours[j].tolist() for j in np.flatnonzero(parents == idx)],
+        )
+        for idx in np.flatnonzero(parents == -1)
+    ]
+
+
+class TestFindContoursTiled(TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        noise = rng.random((60, 70)) < 0.45
+        self.masks = [
+            noise.astype(np.uint8),
+            ndimage.binary_opening(ndimage.binary_closing(noise)).astype(np.uint8),
+        ]
+
+        donut = np.zeros((40, 40), dtype=np.uint8)
+        cv2.circle(donut, (20, 20), 15, 1, -1)
+        cv2.circle(donut, (20, 20), 8, 0, -1)
+        cv2.circle(donut, (20, 20), 3, 1, -1)
+        self.masks.append(donut)
+
+    def assert_equal_to_cv2(self, mask, include_inner_contours, tile_size):
+        mode = cv2.RETR_CCOMP if include_inner_contours else cv2.RETR_EXTERNAL
+        expected = cv2.findContours(mask, mode, cv2.CHAIN_APPROX_SIMPLE)
+
+        actual = find_contours_tiled(
+            mask, include_inner_contours, tile_size=tile_size, max_workers=2
+        )
+
+        if include_inner_contours:
+            self.assertEqual(_objects(*actual), _objects(*expected))
+        else:
+            self.assertIsNone(actual[1])
+            self.assertEqual(
+                [c.tolist() for c in actual[0]],
+                list(map(np.ndarray.tolist, expected[0])),
+            )
+
+    def test_external_contours(self):
+        for mask in self.masks:
+            for tile_size in [1, 7, 16, 100]:
+                self.assert_equal_to_cv2(mask, False, tile_size)
+
+    def test_inner_contours(self):
+        for mask in self.masks:
+            for tile_size in [1, 7, 16, 100]:
+                self.assert_equal_to_cv2(mask, True, tile_size)
+
+    def test_empty_mask(self):
+        mask = np.zeros((20, 20), dtype=np.uint8)
+
+        self.assertEqual(find_contours_tiled(mask, True, tile_size=8), ([], None))
+        self.assertEqual(find_contours_tiled(mask, False, tile_size=8), ([], None))
+
+    def test_memory_mapped_mask(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mask.dat")
+            mask = np.memmap(path, dtype=np.uint8, mode="w+", shape=(40, 40))
+            mask[:] = self.masks[2]
+            mask.flush()
+
+            readonly = np.memmap(path, dtype=np.uint8, mode="r", shape=(40, 40))
+            actual = find_contours_tiled(readonly, True, tile_size=16)
+            del readonly, mask
+
+        expected = cv2.findContours(
+            self.masks[2], cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE
+        )
+        self.assertEqual(_objects(*actual), _objects(*expected))
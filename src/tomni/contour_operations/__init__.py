@@ -2,3 +2,4 @@ from .get_center import get_center
 from .approximate_circle_by_area import approximate_circle_by_area
 from .circularity import circularity
 from .roundness import roundness
+from .inner_contour_indices import inner_contour_indices
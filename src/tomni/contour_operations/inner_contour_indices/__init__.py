@@ -0,0 +1 @@
+from .main import inner_contour_indices
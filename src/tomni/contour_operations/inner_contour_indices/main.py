@@ -0,0 +1,31 @@
+from typing import List, Union
+
+import numpy as np
+
+
+def inner_contour_indices(hierarchy: Union[np.ndarray, None]) -> List[List[int]]:
+    """
+    Group the inner contours of a RETR_CCOMP hierarchy by their outer contour in one pass.
+
+    Args:
+        hierarchy (Union[np.ndarray, None]): The hierarchy from cv2.findContours of shape [1, N, 4],
+            or None when no contours were found. Only the parent, the last value of every contour, is used.
+
+    Returns:
+        List[List[int]]: For every contour the indices of its inner contours in ascending order,
+        empty for contours without inner contours.
+
+    Example:
+        >>> hierarchy = np.array([[[1, -1, 2, -1], [-1, 0, -1, -1], [-1, -1, -1, 0]]])
+        >>> inner_contour_indices(hierarchy)
+        [[2], [], []]
+    """
+    if hierarchy is None:
+        return []
+
+    parents = np.asarray(hierarchy).reshape(-1, 4)[:, 3]
+    inner_indices = [[] for _ in range(len(parents))]
+    for idx, parent in enumerate(parents.tolist()):
+        if parent >= 0:
+            inner_indices[parent].append(idx)
+    return inner_indices
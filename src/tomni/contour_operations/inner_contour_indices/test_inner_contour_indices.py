@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from .main import inner_contour_indices
+
+
+class TestInnerContourIndices(TestCase):
+    def test_equal_to_parent_scan(self):
+        mask = np.zeros((60, 60), dtype=np.uint8)
+        for x in range(0, 60, 20):
+            cv2.rectangle(mask, (x + 1, 1), (x + 17, 40), 1, -1)
+            cv2.circle(mask, (x + 9, 10), 3, 0, -1)
+            cv2.circle(mask, (x + 9, 30), 3, 0, -1)
+        cv2.rectangle(mask, (1, 45), (10, 55), 1, -1)
+        contours, hierarchy = cv2.findContours(
+            mask, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE
+        )
+        expected = [
+            [i for i, h in enumerate(hierarchy[0]) if h[3] == idx]
+            for idx in range(len(contours))
+        ]
+
+        result = inner_contour_indices(hierarchy)
+
+        self.assertEqual(result, expected)
+        self.assertEqual(sum(len(indices) == 2 for indices in result), 3)
+
+    def test_only_parents(self):
+        # Hierarchies of stitched tiles only hold the parents.
+        hierarchy = np.full((1, 4, 4), -1, dtype=np.int32)
+        hierarchy[0, :, 3] = [-1, 2, -1, 2]
+
+        result = inner_contour_indices(hierarchy)
+
+        self.assertEqual(result, [[], [], [1, 3], []])
+
+    def test_empty(self):
+        self.assertEqual(inner_contour_indices(np.zeros((1, 0, 4))), [])
+        self.assertEqual(inner_contour_indices(None), [])
@@ -3,3 +3,11 @@ from ..bbox_fitting import bbox_fitting_center, bbox_fitting
 from .circlair_mask import make_mask_circle
 from .contour_mask_maker import make_mask_contour
 from .ellipse_mask import make_mask_ellipse
+from .rasterize import (
+    fill_axis_aligned_ellipse,
+    fill_ellipse,
+    fill_polygon,
+    label_dtype,
+    overlap_order,
+    paste_footprint,
+)
@@ -0,0 +1,9 @@
+from .main import (
+    OVERLAP_POLICIES,
+    fill_axis_aligned_ellipse,
+    fill_ellipse,
+    fill_polygon,
+    label_dtype,
+    overlap_order,
+    paste_footprint,
+)
@@ -0,0 +1,245 @@
+from typing import Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+# Dtypes that cv2 drawing functions can write to directly.
+CV2_DRAWABLE_DTYPES = (
+    np.uint8,
+    np.int8,
+    np.uint16,
+    np.int16,
+    np.int32,
+    np.float32,
+    np.float64,
+)
+
+# Overlap policies for labeled masks: which object keeps a pixel that is covered by several objects.
+OVERLAP_POLICIES = ("last", "accuracy", "smallest")
+
+# Above these radii fill_axis_aligned_ellipse uses cv2's structuring element, as make_mask_ellipse does.
+SMALL_ELLIPSE_RADIUS = 100
+
+
+def fill_polygon(
+    canvas: np.ndarray,
+    contour: np.ndarray,
+    inner_contours: Sequence[np.ndarray] = (),
+    value: Union[int, float] = 1,
+) -> np.ndarray:
+    """
+    Fill a polygon with holes into a canvas in place. Only the bounding box of the polygon is touched.
+    Pixels in the holes keep their value, so holes never erase other objects.
+
+    Args:
+        canvas (np.ndarray): The 2D canvas to draw on.
+        contour (np.ndarray): The outer contour as OpenCV contour of shape (N, 1, 2) or (N, 2) with dtype int32.
+        inner_contours (Sequence[np.ndarray], optional): Contours of the holes. Defaults to ().
+        value (Union[int, float], optional): The value of the pixels of the polygon. Defaults to 1.
+
+    Returns:
+        np.ndarray: The canvas.
+    """
+    contour = np.asarray(contour, dtype=np.int32).reshape(-1, 1, 2)
+    if len(inner_contours) == 0 and _is_cv2_drawable(canvas):
+        cv2.fillPoly(canvas, [contour], value)
+        return canvas
+
+    region, offset, footprint = _footprint(canvas.shape, cv2.boundingRect(contour))
+    if region is None:
+        return canvas
+
+    cv2.fillPoly(footprint, [contour], 1, offset=offset)
+    for inner_contour in inner_contours:
+        inner_contour = np.asarray(inner_contour, dtype=np.int32).reshape(-1, 1, 2)
+        cv2.fillPoly(footprint, [inner_contour], 0, offset=offset)
+
+    canvas[region][footprint.view(bool)] = value
+    return canvas
+
+
+def fill_ellipse(
+    canvas: np.ndarray,
+    center: Tuple[int, int],
+    axes: Tuple[int, int],
+    angle: float = 0,
+    value: Union[int, float] = 1,
+) -> np.ndarray:
+    """
+    Fill a rotated ellipse into a canvas in place, with the same pixels as a filled cv2.ellipse.
+    Only the bounding box of the ellipse is touched.
+
+    Args:
+        canvas (np.ndarray): The 2D canvas to draw on.
+        center (Tuple[int, int]): Center (x, y) of the ellipse.
+        axes (Tuple[int, int]): Radii (x, y) of the ellipse.
+        angle (float, optional): Rotation in degrees. Defaults to 0.
+        value (Union[int, float], optional): The value of the pixels of the ellipse. Defaults to 1.
+
+    Returns:
+        np.ndarray: The canvas.
+    """
+    if _is_cv2_drawable(canvas):
+        cv2.ellipse(canvas, center, axes, angle, 0, 360, color=value, thickness=-1)
+        return canvas
+
+    # The largest radius bounds the ellipse for every rotation.
+    radius = int(np.ceil(max(axes))) + 1
+    x = int(np.floor(center[0])) - radius
+    y = int(np.floor(center[1])) - radius
+    region, offset, footprint = _footprint(
+        canvas.shape, (x, y, 2 * radius + 2, 2 * radius + 2)
+    )
+    if region is None:
+        return canvas
+
+    shifted_center = (center[0] + offset[0], center[1] + offset[1])
+    cv2.ellipse(footprint, shifted_center, axes, angle, 0, 360, color=1, thickness=-1)
+    canvas[region][footprint.view(bool)] = value
+    return canvas
+
+
+def fill_axis_aligned_ellipse(
+    canvas: np.ndarray,
+    x: int,
+    y: int,
+    rx: int,
+    ry: int,
+    value: Union[int, float] = 1,
+) -> np.ndarray:
+    """
+    Fill an ellipse into a canvas in place, with the same pixels as make_mask_ellipse.
+    Only the bounding box of the ellipse is touched.
+
+    Args:
+        canvas (np.ndarray): The 2D canvas to draw on.
+        x (int): The x-coordinate of the center of the ellipse.
+        y (int): The y-coordinate of the center of the ellipse.
+        rx (int): The length of the radius on the x-axis of the ellipse.
+        ry (int): The length of the radius on the y-axis of the ellipse.
+        value (Union[int, float], optional): The value of the pixels of the ellipse. Defaults to 1.
+
+    Raises:
+        ValueError: If a radius is smaller than 1.
+
+    Returns:
+        np.ndarray: The canvas.
+    """
+    x, y, rx, ry = int(x), int(y), int(rx), int(ry)
+    if rx < 1 or ry < 1:
+        raise ValueError("Radii must be greater than 1.")
+
+    if rx < SMALL_ELLIPSE_RADIUS and ry < SMALL_ELLIPSE_RADIUS:
+        yy, xx = np.ogrid[-ry : ry + 1, -rx : rx + 1]
+        kernel = (xx**2) * (ry**2) + (yy**2) * (rx**2) <= (rx**2) * (ry**2)
+    else:
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (rx * 2, ry * 2))
+
+    # Both kernels have their top left corner at (x - rx, y - ry).
+    paste_footprint(canvas, kernel, x - rx, y - ry, value)
+    return canvas
+
+
+def paste_footprint(
+    canvas: np.ndarray,
+    footprint: np.ndarray,
+    x: int,
+    y: int,
+    value: Union[int, float] = 1,
+) -> np.ndarray:
+    """
+    Set the pixels of a binary footprint with its top left corner at (x, y) to value.
+    Parts of the footprint outside of the canvas are ignored.
+
+    Args:
+        canvas (np.ndarray): The 2D canvas to draw on.
+        footprint (np.ndarray): A binary array, non-zero pixels are set.
+        x (int): The x-coordinate of the top left corner of the footprint.
+        y (int): The y-coordinate of the top left corner of the footprint.
+        value (Union[int, float], optional): The value of the pixels. Defaults to 1.
+
+    Returns:
+        np.ndarray: The canvas.
+    """
+    height, width = footprint.shape
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + width, canvas.shape[1]), min(y + height, canvas.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return canvas
+
+    footprint = footprint[y0 - y : y1 - y, x0 - x : x1 - x]
+    canvas[y0:y1, x0:x1][footprint.astype(bool, copy=False)] = value
+    return canvas
+
+
+def label_dtype(max_label: int) -> np.dtype:
+    """
+    The smallest unsigned integer dtype that holds all labels of a labeled mask.
+
+    Args:
+        max_label (int): The highest label in the mask.
+
+    Raises:
+        ValueError: If the labels do not fit in uint32.
+
+    Returns:
+        np.dtype: uint8, uint16 or uint32.
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_label <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise ValueError(f"{max_label} labels do not fit in a uint32 labeled mask.")
+
+
+def overlap_order(
+    overlap: str = "last",
+    n_objects: int = 0,
+    accuracy: Union[np.ndarray, None] = None,
+    areas: Union[np.ndarray, None] = None,
+) -> np.ndarray:
+    """
+    The drawing order of objects for an overlap policy. Objects drawn later win overlapping pixels.
+
+    Args:
+        overlap (str, optional): "last" keeps the object that comes last, "accuracy" keeps the object with the
+            highest accuracy and "smallest" keeps the object with the smallest area. Defaults to "last".
+            Ties are won by the object that comes last.
+        n_objects (int, optional): The number of objects, used for "last". Defaults to 0.
+        accuracy (Union[np.ndarray, None], optional): The accuracy per object, required for "accuracy".
+        areas (Union[np.ndarray, None], optional): The area per object, required for "smallest".
+
+    Raises:
+        ValueError: If the overlap policy is unknown.
+
+    Returns:
+        np.ndarray: Indices of the objects in drawing order.
+    """
+    if overlap == "last":
+        return np.arange(n_objects)
+    elif overlap == "accuracy":
+        return np.argsort(np.asarray(accuracy), kind="stable")
+    elif overlap == "smallest":
+        return np.argsort(-np.asarray(areas), kind="stable")
+    raise ValueError(
+        f"Unknown overlap policy {overlap}, expected one of {', '.join(OVERLAP_POLICIES)}."
+    )
+
+
+def _is_cv2_drawable(canvas: np.ndarray) -> bool:
+    return canvas.dtype in CV2_DRAWABLE_DTYPES and canvas.flags.c_contiguous
+
+
+def _footprint(
+    shape: Tuple[int, ...], bbox: Tuple[int, int, int, int]
+) -> Tuple[Union[Tuple[slice, slice], None], Tuple[int, int], Union[np.ndarray, None]]:
+    """Clips an (x, y, width, height) box to the canvas and creates an empty footprint for it.
+    Returns the canvas region, the offset to draw contours into the footprint and the footprint.
+    """
+    x, y, width, height = bbox
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + width, shape[1]), min(y + height, shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return None, (0, 0), None
+
+    region = (slice(y0, y1), slice(x0, x1))
+    return region, (-x0, -y0), np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
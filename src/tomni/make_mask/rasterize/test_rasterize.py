@@ -0,0 +1,138 @@
+from unittest import TestCase
+
+import cv2
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from ..contour_mask_maker import make_mask_contour
+from ..ellipse_mask import make_mask_ellipse
+from .main import (
+    fill_axis_aligned_ellipse,
+    fill_ellipse,
+    fill_polygon,
+    label_dtype,
+    overlap_order,
+    paste_footprint,
+)
+
+
+class TestRasterize(TestCase):
+    def setUp(self):
+        self.square = np.array([[1, 1], [8, 1], [8, 8], [1, 8]], dtype=np.int32)
+        self.hole = np.array([[3, 3], [6, 3], [6, 6], [3, 6]], dtype=np.int32)
+
+    def test_fill_polygon_equals_make_mask_contour(self):
+        contour = np.array([[2, 1], [9, 4], [5, 9], [0, 6]], dtype=np.int32)
+        expected = make_mask_contour((12, 10), contour)
+
+        actual = fill_polygon(np.zeros((10, 12), dtype=np.uint8), contour)
+
+        assert_array_equal(actual, expected)
+
+    def test_fill_polygon_with_hole(self):
+        expected = make_mask_contour((10, 10), self.square)
+        expected[3:7, 3:7] = 0
+
+        actual = fill_polygon(
+            np.zeros((10, 10), dtype=np.uint8), self.square, [self.hole]
+        )
+
+        assert_array_equal(actual, expected)
+
+    def test_hole_keeps_other_objects(self):
+        canvas = np.zeros((10, 10), dtype=np.uint8)
+        canvas[4, 4] = 1
+
+        fill_polygon(canvas, self.square, [self.hole])
+
+        self.assertEqual(canvas[4, 4], 1)
+        self.assertEqual(canvas[3, 3], 0)
+
+    def test_fill_polygon_clipped(self):
+        contour = np.array([[-5, -5], [4, -5], [4, 4], [-5, 4]], dtype=np.int32)
+        expected = np.zeros((10, 10), dtype=np.uint8)
+        expected[:5, :5] = 7
+
+        actual = fill_polygon(
+            np.zeros((10, 10), dtype=np.uint8), contour, [self.hole + 100], value=7
+        )
+
+        assert_array_equal(actual, expected)
+
+    def test_fill_polygon_outside_canvas(self):
+        actual = fill_polygon(
+            np.zeros((10, 10), dtype=np.uint32), self.square + 50, [self.hole + 50]
+        )
+
+        assert_array_equal(actual, np.zeros((10, 10)))
+
+    def test_fill_polygon_wide_dtype(self):
+        expected = make_mask_contour((10, 10), self.square) * np.uint32(70000)
+
+        actual = fill_polygon(
+            np.zeros((10, 10), dtype=np.uint32), self.square, value=70000
+        )
+
+        assert_array_equal(actual, expected)
+
+    def test_fill_ellipse_equals_cv2(self):
+        expected = np.zeros((30, 40), dtype=np.uint8)
+        cv2.ellipse(expected, (10, 12), (15, 6), 35, 0, 360, color=1, thickness=-1)
+
+        actual_uint8 = fill_ellipse(
+            np.zeros((30, 40), dtype=np.uint8), (10, 12), (15, 6), 35
+        )
+        actual_bool = fill_ellipse(
+            np.zeros((30, 40), dtype=bool), (10, 12), (15, 6), 35
+        )
+
+        assert_array_equal(actual_uint8, expected)
+        assert_array_equal(actual_bool, expected)
+
+    def test_fill_axis_aligned_ellipse_small(self):
+        expected = make_mask_ellipse((30, 20), 3, 17, 6, 4)
+
+        actual = fill_axis_aligned_ellipse(
+            np.zeros((20, 30), dtype=np.uint8), 3, 17, 6, 4
+        )
+
+        assert_array_equal(actual, expected)
+
+    def test_fill_axis_aligned_ellipse_big(self):
+        expected = make_mask_ellipse((300, 250), 120, 200, 110, 100)
+
+        actual = fill_axis_aligned_ellipse(
+            np.zeros((250, 300), dtype=np.uint8), 120, 200, 110, 100
+        )
+
+        assert_array_equal(actual, expected)
+
+    def test_fill_axis_aligned_ellipse_small_radius(self):
+        canvas = np.zeros((10, 10), dtype=np.uint8)
+
+        self.assertRaises(ValueError, fill_axis_aligned_ellipse, canvas, 5, 5, 0, 3)
+
+    def test_paste_footprint_clipped(self):
+        expected = np.array([[0, 0, 0], [0, 0, 0], [2, 0, 0]])
+
+        actual = paste_footprint(
+            np.zeros((3, 3), dtype=np.uint8), np.eye(2), -1, 1, value=2
+        )
+
+        assert_array_equal(actual, expected)
+
+    def test_label_dtype(self):
+        self.assertEqual(label_dtype(0), np.uint8)
+        self.assertEqual(label_dtype(255), np.uint8)
+        self.assertEqual(label_dtype(256), np.uint16)
+        self.assertEqual(label_dtype(70000), np.uint32)
+        self.assertRaises(ValueError, label_dtype, 2**32)
+
+    def test_overlap_order(self):
+        accuracy = np.array([0.9, 0.5, 0.9])
+        areas = np.array([10.0, 30.0, 10.0])
+
+        assert_array_equal(overlap_order("last", 3), [0, 1, 2])
+        assert_array_equal(overlap_order("accuracy", accuracy=accuracy), [1, 0, 2])
+        assert_array_equal(overlap_order("smallest", areas=areas), [1, 0, 2])
+        self.assertRaises(ValueError, overlap_order, "first", 3)
@@ -0,0 +1 @@
+from .main import find_contours_in_bands, foreground_bands
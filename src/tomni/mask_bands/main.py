@@ -0,0 +1,84 @@
+from typing import List, Tuple, Union
+
+import cv2
+import numpy as np
+
+# Rows per band for the row-wise any-reduction, so at most one band is in memory at a time.
+DEFAULT_BAND_SIZE = 1024
+
+
+def foreground_bands(
+    mask: np.ndarray, band_size: int = DEFAULT_BAND_SIZE, min_gap: int = 1
+) -> List[Tuple[int, int]]:
+    """
+    Find the bands of consecutive rows that contain non-zero pixels.
+    The mask is read in bands of `band_size` rows, so memory-mapped or chunked arrays are never loaded at once.
+    Objects never cross an empty row, so every band can be processed on its own.
+
+    Args:
+        mask (np.ndarray): A mask or any array-like that supports slicing rows, e.g. a memory-mapped array.
+        band_size (int, optional): The number of rows read at once. Defaults to 1024.
+        min_gap (int, optional): The minimal number of empty rows between two bands,
+            bands with a smaller gap are merged. Defaults to 1.
+
+    Returns:
+        List[Tuple[int, int]]: The (start, stop) rows of every band, from top to bottom.
+    """
+    height = mask.shape[0]
+    has_foreground = np.zeros(height, dtype=bool)
+    for y in range(0, height, band_size):
+        rows = np.asarray(mask[y : y + band_size])
+        has_foreground[y : y + len(rows)] = rows.reshape(len(rows), -1).any(axis=1)
+
+    foreground_rows = np.flatnonzero(has_foreground)
+    if len(foreground_rows) == 0:
+        return []
+
+    breaks = np.flatnonzero(np.diff(foreground_rows) > min_gap)
+    starts = foreground_rows[np.concatenate([[0], breaks + 1])]
+    stops = foreground_rows[np.concatenate([breaks, [-1]])] + 1
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+def find_contours_in_bands(
+    mask: np.ndarray, mode: int, band_size: int = DEFAULT_BAND_SIZE
+) -> Tuple[List[np.ndarray], Union[np.ndarray, None]]:
+    """
+    Find the same contours as `cv2.findContours(mask.astype(np.uint8), mode, cv2.CHAIN_APPROX_SIMPLE)`,
+    while only loading the bands of rows that contain foreground.
+
+    Args:
+        mask (np.ndarray): A binary mask or any array-like that supports slicing rows, e.g. a memory-mapped array.
+        mode (int): cv2.RETR_EXTERNAL or cv2.RETR_CCOMP.
+        band_size (int, optional): The number of rows read at once to find the foreground. Defaults to 1024.
+
+    Returns:
+        Tuple[List[np.ndarray], Union[np.ndarray, None]]: The contours and their hierarchy,
+            or None if there are no contours.
+    """
+    contours = []
+    hierarchies = []
+    # cv2.findContours returns the lowest objects first.
+    for start, stop in reversed(foreground_bands(mask, band_size)):
+        band = np.asarray(mask[start:stop]).astype(np.uint8)
+        # Padding keeps objects at the edge of the band away from the image border, as in the full mask.
+        band = cv2.copyMakeBorder(band, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+        band_contours, hierarchy = cv2.findContours(
+            band, mode, cv2.CHAIN_APPROX_SIMPLE, offset=(-1, start - 1)
+        )
+        if hierarchy is None:
+            continue
+
+        hierarchy[hierarchy != -1] += len(contours)
+        contours.extend(band_contours)
+        hierarchies.append(hierarchy[0])
+
+    if not contours:
+        return [], None
+
+    hierarchy = np.concatenate(hierarchies)[np.newaxis]
+    # Link the outer contours of consecutive bands, as they are in the full mask.
+    outer = np.flatnonzero(hierarchy[0, :, 3] == -1)
+    hierarchy[0, outer[:-1], 0] = outer[1:]
+    hierarchy[0, outer[1:], 1] = outer[:-1]
+    return contours, hierarchy
@@ -0,0 +1,74 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import cv2
+import numpy as np
+from scipy import ndimage
+
+from .main import find_contours_in_bands, foreground_bands
+
+
+class TestForegroundBands(TestCase):
+    def setUp(self):
+        self.mask = np.zeros((12, 5), dtype=np.uint8)
+        self.mask[1:3, 1] = 1
+        self.mask[4, 2] = 1
+        self.mask[8:11, 3] = 1
+
+    def test_foreground_bands(self):
+        for band_size in [1, 3, 100]:
+            self.assertEqual(
+                foreground_bands(self.mask, band_size),
+                [(1, 3), (4, 5), (8, 11)],
+            )
+
+    def test_min_gap(self):
+        self.assertEqual(foreground_bands(self.mask, min_gap=3), [(1, 5), (8, 11)])
+
+    def test_empty_mask(self):
+        self.assertEqual(foreground_bands(np.zeros((4, 4))), [])
+
+
+class TestFindContoursInBands(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        mask = ndimage.binary_closing(rng.random((60, 50)) < 0.4)
+        mask[rng.random(60) < 0.3] = 0
+        self.mask = mask.astype(np.uint8)
+
+    def test_equal_to_cv2(self):
+        for mode in [cv2.RETR_EXTERNAL, cv2.RETR_CCOMP]:
+            expected_contours, expected_hierarchy = cv2.findContours(
+                self.mask, mode, cv2.CHAIN_APPROX_SIMPLE
+            )
+
+            contours, hierarchy = find_contours_in_bands(self.mask, mode, band_size=7)
+
+            self.assertEqual(
+                [c.tolist() for c in contours],
+                [c.tolist() for c in expected_contours],
+            )
+            np.testing.assert_array_equal(hierarchy, expected_hierarchy)
+
+    def test_empty_mask(self):
+        contours, hierarchy = find_contours_in_bands(
+            np.zeros((5, 5), dtype=bool), cv2.RETR_EXTERNAL
+        )
+
+        self.assertEqual(contours, [])
+        self.assertIsNone(hierarchy)
+
+    def test_memory_mapped_mask(self):
+        expected = cv2.findContours(self.mask, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE)[
+            0
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mask.npy")
+            np.save(path, self.mask)
+            mask = np.load(path, mmap_mode="r")
+            contours, _ = find_contours_in_bands(mask, cv2.RETR_CCOMP, band_size=8)
+            del mask
+
+        self.assertEqual([c.tolist() for c in contours], [c.tolist() for c in expected])
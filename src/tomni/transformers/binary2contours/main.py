@@ -3,6 +3,9 @@ import numpy as np
 
 from typing import List
 
+from ...contour_operations import inner_contour_indices
+from ...mask_bands import find_contours_in_bands
+
 
 def binary2contours(
     binary_img: np.ndarray, return_inner_contours: bool = True
@@ -13,7 +16,8 @@ def binary2contours(
     are returned.
 
     Args:
-        binary_img (np.ndarray): A binary image.
+        binary_img (np.ndarray): A binary image, or any array that supports slicing rows, e.g. a memory-mapped array.
+            Only the bands of rows that contain foreground are loaded.
         return_inner_contours (bool): boolean to check if inner contours are desired. Defaults to True.
 
     Returns:
@@ -22,28 +26,17 @@ def binary2contours(
 
     mode = cv2.RETR_CCOMP if return_inner_contours else cv2.RETR_EXTERNAL
 
-    contours, hierarchy = cv2.findContours(binary_img, mode, cv2.CHAIN_APPROX_SIMPLE)
+    contours, hierarchy = find_contours_in_bands(binary_img, mode)
 
-    if not return_inner_contours:
+    if not return_inner_contours or len(contours) == 0:
         return contours
 
+    # Group the inner contours by their outer contour once, instead of scanning the hierarchy per contour.
+    inner_indices = inner_contour_indices(hierarchy)
     combined_contours = []
-    # Iterate over all contours and their hierarchies
-    for idx, contour in enumerate(contours):
-        current_hierarchy = hierarchy[0][idx]
-
-        if current_hierarchy[-1] == -1:
-            # If the contour has no parent, it is an outer contour
-            combined_contour = [contour]
-            inner_contours = []
-            # Find the indices of the inner contours
-            inner_indices = [i for i, h in enumerate(hierarchy[0]) if h[3] == idx]
-
-            # Add the corresponding inner contours
-            for inner_idx in inner_indices:
-                inner_contours.append(contours[inner_idx])
-
-            combined_contour.append(inner_contours)
-            combined_contours.append(combined_contour)
+    for idx in np.flatnonzero(hierarchy[0][:, 3] == -1).tolist():
+        # If the contour has no parent, it is an outer contour
+        inner_contours = [contours[inner_idx] for inner_idx in inner_indices[idx]]
+        combined_contours.append([contours[idx], inner_contours])
 
     return combined_contours
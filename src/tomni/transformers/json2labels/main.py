@@ -1,43 +1,74 @@
+from typing import List, Tuple, Union
+
 import cv2
 import numpy as np
-from typing import List
+
+from ...make_mask import fill_ellipse, fill_polygon, label_dtype, overlap_order
 
 
-def json2labels(json_list: List[dict], output_dim: tuple) -> np.ndarray:
+def json2labels(
+    json_list: List[dict],
+    output_dim: tuple,
+    overlap: str = "last",
+    return_lookup: bool = False,
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
     """
     Convert a list of JSON objects representing objects to a labeled segmentation map.
 
     Args:
         json_list (list of dict): A list of objects in JSON format, each describing an object to be labeled.
         output_dim (tuple of int): The dimensions of the output image in image coordinates, specified as (width, height).
+        overlap (str, optional): Which object keeps the pixels where objects overlap. "last" keeps the object that
+            comes last, "accuracy" keeps the object with the highest accuracy and "smallest" keeps the object with the
+            smallest area. Defaults to "last".
+        return_lookup (bool, optional): Also return a lookup table from label to index in json_list. Defaults to False.
 
     Returns:
-        np.ndarray: A segmentation map where each object has a unique label.
+        Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]: A segmentation map where each object has a unique label.
+            The dtype is the smallest of uint8, uint16 and uint32 that fits all labels.
+            With `return_lookup` also the lookup table, where lookup[label] is the index of the object and lookup[0]
+            is -1 for the background.
 
     Raises:
-        ValueError: If an unsupported object type is encountered in the JSON list.
+        ValueError: If an unsupported object type is encountered in the JSON list or the overlap policy is unknown.
     """
-
-    seg_map = np.zeros((output_dim[1], output_dim[0]), dtype=np.uint8)
-
-    for i, obj in enumerate(json_list):
+    shapes = []
+    for obj in json_list:
         if obj["type"] == "ellipse":
-            cv2.ellipse(
-                seg_map,
-                (obj["center"]["x"], obj["center"]["y"]),
-                (obj["radiusX"], obj["radiusY"]),
-                obj["angleOfRotation"],
-                0,
-                360,
-                color=i + 1,
-                thickness=-1,
-            )
+            center = (obj["center"]["x"], obj["center"]["y"])
+            axes = (obj["radiusX"], obj["radiusY"])
+            shapes.append((center, axes, obj["angleOfRotation"]))
         elif obj["type"] == "polygon":
-            points = np.empty((len(obj["points"]), 2))
-            for j in range(len(obj["points"])):
-                points[j,] = [obj["points"][j]["x"], obj["points"][j]["y"]]
-            cv2.fillConvexPoly(seg_map, np.int32([points]), i + 1)
+            points = np.array(
+                [[point["x"], point["y"]] for point in obj["points"]], dtype=np.int32
+            )
+            shapes.append(points)
         else:
             raise ValueError("Object type not supported")
 
+    areas = None
+    if overlap == "smallest":
+        areas = np.array(
+            [
+                (
+                    cv2.contourArea(shape)
+                    if isinstance(shape, np.ndarray)
+                    else np.pi * shape[1][0] * shape[1][1]
+                )
+                for shape in shapes
+            ]
+        )
+    accuracy = np.array([obj.get("accuracy", 1) for obj in json_list])
+    order = overlap_order(overlap, len(shapes), accuracy=accuracy, areas=areas)
+
+    seg_map = np.zeros((output_dim[1], output_dim[0]), dtype=label_dtype(len(shapes)))
+    for i in order.tolist():
+        if isinstance(shapes[i], np.ndarray):
+            fill_polygon(seg_map, shapes[i], value=i + 1)
+        else:
+            center, axes, rotation = shapes[i]
+            fill_ellipse(seg_map, center, axes, rotation, value=i + 1)
+
+    if return_lookup:
+        return seg_map, np.arange(-1, len(shapes), dtype=np.int64)
     return seg_map
@@ -1,6 +1,7 @@
 from unittest import TestCase
 from .main import json2labels
 import numpy as np
+from ...make_mask import make_mask_contour
 
 
 class Test_json2labels(TestCase):
@@ -52,9 +53,9 @@ class Test_json2labels(TestCase):
             [0, 0, 1, 1, 1, 0, 0, 0, 0, 0],
             [0, 0, 0, 1, 1, 1, 0, 0, 0, 0],
             [0, 0, 1, 1, 1, 1, 0, 0, 0, 0],
-            [0, 0, 1, 1, 1, 1, 1, 0, 0, 0],
+            [0, 0, 0, 1, 1, 1, 1, 0, 0, 0],
             [0, 0, 0, 0, 1, 1, 1, 0, 0, 0],
-            [0, 0, 0, 0, 0, 1, 1, 1, 0, 0],
+            [0, 0, 0, 0, 0, 0, 1, 1, 0, 0],
             [0, 0, 0, 0, 0, 0, 0, 1, 0, 0],
         ]
         segMap = json2labels(objects, imgSize)
@@ -93,3 +94,72 @@ class Test_json2labels(TestCase):
         objects = [{"type": "random", "center": {"x": 2, "y": 3}, "radius": 4}]
         imgSize = (10, 10)
         self.assertRaises(ValueError, json2labels, objects, imgSize)
+
+    def test_concave_polygon(self):
+        points = [[1, 1], [8, 1], [8, 8], [6, 8], [6, 4], [3, 4], [3, 8], [1, 8]]
+        objects = [{"type": "polygon", "points": [{"x": x, "y": y} for x, y in points]}]
+        expOut = make_mask_contour((10, 10), np.array(points))
+
+        segMap = json2labels(objects, (10, 10))
+
+        np.testing.assert_array_equal(segMap, expOut)
+        self.assertEqual(segMap[6, 4], 0)
+
+    def test_many_objects(self):
+        objects = [
+            {
+                "type": "polygon",
+                "points": [
+                    {"x": x, "y": y},
+                    {"x": x + 1, "y": y},
+                    {"x": x + 1, "y": y + 1},
+                    {"x": x, "y": y + 1},
+                ],
+            }
+            for y in range(0, 60, 3)
+            for x in range(0, 60, 3)
+        ]
+
+        segMap = json2labels(objects, (60, 60))
+
+        self.assertEqual(segMap.dtype, np.uint16)
+        self.assertEqual(segMap.max(), 400)
+        self.assertEqual(len(np.unique(segMap)), 401)
+
+    def test_overlap(self):
+        big = {
+            "type": "ellipse",
+            "center": {"x": 5, "y": 5},
+            "radiusX": 4,
+            "radiusY": 4,
+            "angleOfRotation": 0.0,
+            "accuracy": 0.9,
+        }
+        small = {
+            "type": "polygon",
+            "points": [{"x": 4, "y": 4}, {"x": 6, "y": 4}, {"x": 6, "y": 6}],
+            "accuracy": 0.5,
+        }
+        objects = [small, big]
+
+        self.assertEqual(json2labels(objects, (10, 10), overlap="last")[5, 5], 2)
+        self.assertEqual(json2labels(objects, (10, 10), overlap="accuracy")[5, 5], 2)
+        self.assertEqual(json2labels(objects, (10, 10), overlap="smallest")[5, 5], 1)
+        self.assertRaises(ValueError, json2labels, objects, (10, 10), overlap="largest")
+
+    def test_return_lookup(self):
+        objects = [
+            {
+                "type": "ellipse",
+                "center": {"x": 3 + 5 * i, "y": 4},
+                "radiusX": 2,
+                "radiusY": 2,
+                "angleOfRotation": 0.0,
+            }
+            for i in range(3)
+        ]
+
+        segMap, lookup = json2labels(objects, (20, 10), return_lookup=True)
+
+        np.testing.assert_array_equal(lookup, [-1, 0, 1, 2])
+        self.assertEqual(objects[lookup[segMap[4, 8]]]["center"]["x"], 8)
@@ -1,28 +1,51 @@
+from typing import Union
+
 import numpy as np
 
-from ...img_dim import img_dim
-from ...make_mask import make_mask_contour, make_mask_ellipse
+from ...make_mask import fill_axis_aligned_ellipse, fill_polygon
 from ..json2contours import json2contours
 
 
-def contour2mask(mask: np.ndarray, contour: list) -> np.ndarray:
-    """Converts contour to mask"""
-    add_mask = make_mask_contour(img_dim(mask), contour)
-    mask = mask + add_mask
-    mask[mask > 1] = 1
-    return mask
+def contour2mask(
+    mask: np.ndarray, contour: list, out: Union[np.ndarray, None] = None
+) -> np.ndarray:
+    """Converts contour to mask.
+    Returns a copy of `mask` with the contour drawn on it, values above 1 are set to 1.
+    With `out` the contour is drawn on `out` in place, e.g. `out=mask`, and only the pixels of the contour change.
+    """
+    if out is None:
+        out = mask.copy()
+        fill_polygon(out, contour)
+        out[out > 1] = 1
+        return out
+    return fill_polygon(out, contour)
 
 
-def ellipse2mask(mask: np.ndarray, x: int, y: int, r1: float, r2: float) -> np.ndarray:
-    """Converts ellipse to mask"""
-    add_mask = make_mask_ellipse(img_dim(mask), x, y, r1, r2)
-    mask = mask + add_mask
-    mask[mask > 1] = 1
-    return mask
+def ellipse2mask(
+    mask: np.ndarray,
+    x: int,
+    y: int,
+    r1: float,
+    r2: float,
+    out: Union[np.ndarray, None] = None,
+) -> np.ndarray:
+    """Converts ellipse to mask.
+    Returns a copy of `mask` with the ellipse drawn on it, values above 1 are set to 1.
+    With `out` the ellipse is drawn on `out` in place, e.g. `out=mask`, and only the pixels of the ellipse change.
+    """
+    if out is None:
+        out = mask.copy()
+        fill_axis_aligned_ellipse(out, x, y, r1, r2)
+        out[out > 1] = 1
+        return out
+    return fill_axis_aligned_ellipse(out, x, y, r1, r2)
 
 
 def json2mask(
-    json_objects: list, img_shape: tuple, minimum_size_contours: int = 3
+    json_objects: list,
+    img_shape: tuple,
+    minimum_size_contours: int = 3,
+    out: Union[np.ndarray, None] = None,
 ) -> np.ndarray:
     """
     Convert a list of JSON objects in standard AxionBio format to a binary mask.
@@ -32,6 +55,8 @@ def json2mask(
         img_shape (tuple): The dimensions (height, width) of the mask.
         minimum_size_contours (int, optional): The minimum number of points a contour should have to be included.
             Defaults to 3. Set to 0 to include all contours regardless of size.
+        out (Union[np.ndarray, None], optional): A canvas of shape `img_shape` to draw the objects on.
+            Objects are drawn on top of its current content. Defaults to None, which creates a new mask.
 
     Returns:
         np.ndarray: A binary mask as a NumPy array.
@@ -67,19 +92,17 @@ def json2mask(
          [0 0 0 0 0 0 0 0 0 0]
          [0 0 0 0 0 0 0 0 0 0]]
     """
-    mask = np.zeros(img_shape, dtype=np.uint8)
+    mask = np.zeros(img_shape, dtype=np.uint8) if out is None else out
     for json_object in json_objects:
         if json_object["type"] == "polygon":
             if len(json_object["points"]) >= minimum_size_contours:
-                contour = json2contours(json_object)
-                contour = [x[0] for x in contour]
-                mask = contour2mask(mask, contour)
+                fill_polygon(mask, json2contours(json_object))
         elif json_object["type"] == "ellipse":
             x = json_object["center"]["x"]
             y = json_object["center"]["y"]
             r1 = json_object["radiusX"]
             r2 = json_object["radiusY"]
-            mask = ellipse2mask(mask, x, y, r1, r2)
+            fill_axis_aligned_ellipse(mask, x, y, r1, r2)
         else:
             raise TypeError(
                 f"json object {json_object['type']} could not be converted to a mask"
@@ -3,7 +3,7 @@ import numpy as np
 from numpy.testing import assert_array_equal
 from unittest import TestCase
 
-from .main import json2mask
+from .main import contour2mask, ellipse2mask, json2mask
 from ...make_mask import make_mask_circle
 
 
@@ -196,6 +196,36 @@ class TestJson2Mask(TestCase):
         result = json2mask(self.json_objects_multi_overlap, self.img_dim)
         assert_array_equal(expected_result, result)
 
+    def test_out_buffer(self):
+        out = np.zeros((10, 10), dtype=np.uint8)
+        out[9, 9] = 1
+        expected_result = json2mask(self.json_objects_multi_overlap, self.img_dim)
+        expected_result[9, 9] = 1
+
+        result = json2mask(self.json_objects_multi_overlap, self.img_dim, out=out)
+
+        self.assertIs(result, out)
+        assert_array_equal(expected_result, result)
+
+    def test_contour2mask_ellipse2mask_copy(self):
+        mask = np.zeros((10, 10), dtype=np.uint8)
+        mask[9, 9] = 2
+        contour = [[2, 2], [2, 4], [4, 4], [4, 2]]
+
+        result = ellipse2mask(contour2mask(mask, contour), 7, 7, 1, 1)
+
+        self.assertEqual(mask.sum(), 2)
+        self.assertEqual(result[9, 9], 1)
+        self.assertEqual(result[2:5, 2:5].sum(), 9)
+        self.assertEqual(result[7, 7], 1)
+
+        out = contour2mask(mask, contour, out=mask)
+        ellipse2mask(mask, 7, 7, 1, 1, out=mask)
+
+        self.assertIs(out, mask)
+        self.assertEqual(mask[9, 9], 2)
+        assert_array_equal(result[:9, :9], mask[:9, :9])
+
     def test_to_small_objects(self):
         expected_result = np.zeros((10, 10), dtype=np.uint8)
 
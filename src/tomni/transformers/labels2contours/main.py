@@ -12,7 +12,8 @@ def labels2contours(
 
     Args:
         labels (np.ndarray): An array where every pixel is labeled to indicate which object it belongs to.
-            The labels should be non-negative integers.
+            The labels should be non-negative integers. Any array that supports slicing rows works,
+            e.g. a memory-mapped array, only the bands of rows that contain labels are loaded.
         return_inner_contours (bool, optional): If True, return the internal contours (contours around holes within objects).
             If False (default), return only the external contours (outlines of objects).
 
@@ -1,7 +1,8 @@
 import numpy as np
-from scipy.sparse import csr_matrix, find
 import numpy_indexed as npi
 
+from ...mask_bands import foreground_bands
+
 
 def labels2listsOfPoints(labels: np.ndarray) -> np.ndarray:
     """
@@ -9,7 +10,8 @@ def labels2listsOfPoints(labels: np.ndarray) -> np.ndarray:
 
     Args:
         labels (np.ndarray): An array where every pixel is labeled to indicate which object it belongs to.
-            The labels should be non-negative integers.
+            The labels should be non-negative integers. Any array that supports slicing rows works,
+            e.g. a memory-mapped array.
 
     Returns:
         List[List[Tuple[int, int]]]: A list of lists, where each inner list contains the (x, y) coordinates
@@ -21,22 +23,26 @@ def labels2listsOfPoints(labels: np.ndarray) -> np.ndarray:
         ValueError: If the number of labels exceeds the supported limit.
 
     Note:
-        - The function automatically determines the appropriate data type for labels based on their maximum value.
-        - It uses sparse matrix operations to efficiently extract points for each label.
+        - Only the bands of rows that contain labels are loaded, one band at a time.
     """
-
-    if np.max(labels) < 256:
-        dataType = np.uint8
-    elif np.max(labels) < 65536:
-        dataType = np.uint16
-    elif np.max(labels) < 4294967296:
-        dataType = np.uint32
-    else:
+    rows, columns, values = [], [], []
+    for start, stop in foreground_bands(labels):
+        band = np.asarray(labels[start:stop])
+        band_rows, band_columns = np.nonzero(band)
+        rows.append(band_rows + start)
+        columns.append(band_columns)
+        values.append(band[band_rows, band_columns])
+
+    if not values:
+        return []
+
+    values = np.concatenate(values)
+    if values.max() >= 4294967296:
         raise ValueError("There are to many labels")
 
-    # Memory check number of labels
-    c = csr_matrix(labels, dtype=dataType)
-    x, y, v = find(c)
-    g = npi.group_by(v)
-    output = g.split_array_as_list(np.array([y, x]).transpose())
+    g = npi.group_by(values)
+    positions = np.array(
+        [np.concatenate(columns), np.concatenate(rows)], dtype=np.int32
+    )
+    output = g.split_array_as_list(positions.transpose())
     return output
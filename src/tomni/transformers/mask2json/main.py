@@ -1,9 +1,15 @@
 import cv2
 import numpy as np
 
+from ...mask_bands import foreground_bands
 from ..contours2json import contours2json
 from ..labels2contours import labels2contours
 
+# Edges are dilated by 2 pixels and Canny looks 1 pixel around every pixel, so bands separated by
+# this many empty rows do not influence each other.
+BAND_GAP = 3
+BAND_MARGIN = BAND_GAP - 1
+
 
 def get_edges(mask: np.ndarray):
     """
@@ -49,7 +55,8 @@ def mask2json(
     Converts a binary mask into a list of JSON objects representing contours.
 
     Args:
-        mask (np.ndarray): A binary mask represented as a NumPy array.
+        mask (np.ndarray): A binary mask represented as a NumPy array, or any array that supports slicing rows,
+            e.g. a memory-mapped array. Only the bands of rows that contain foreground are loaded.
         minimum_size_contours (int, optional): The minimum number of points a contour should have to be included.
             Contours with fewer points will be excluded. Defaults to 3.
         is_diagonal_connected (bool, optional): If True, diagonal pixels (e.g., [[1, 0], [0, 1]]) will be considered
@@ -78,14 +85,28 @@ def mask2json(
     if is_diagonal_connected:
         connectivity = 8
 
-    labels = cv2.connectedComponents(mask.astype(np.uint8), connectivity=connectivity)[
-        1
-    ]
-    edges = get_edges(mask)
-
-    edges = edges * labels
-    del labels
-    contours = labels2contours(edges, return_inner_contours=return_inner_contours)
+    height = mask.shape[0]
+    contours = []
+    for start, stop in foreground_bands(mask, min_gap=BAND_GAP):
+        # The margin of empty rows makes the edges equal to those of the full mask.
+        # cv2 labels 8-connected components in blocks of 2 rows, an even top row keeps the same blocks.
+        top, bottom = max(start - BAND_MARGIN, 0), min(stop + BAND_MARGIN, height)
+        top -= top % 2
+        band = np.asarray(mask[top:bottom])
+        labels = cv2.connectedComponents(
+            band.astype(np.uint8), connectivity=connectivity
+        )[1]
+        edges = get_edges(band)
+
+        edges = edges * labels
+        del labels
+        # Bands are processed from top to bottom, so objects keep the order of the full mask.
+        contours.extend(
+            _shift_contour(contour, top, return_inner_contours)
+            for contour in labels2contours(
+                edges, return_inner_contours=return_inner_contours
+            )
+        )
 
     if return_inner_contours:
         json_objects = []
@@ -102,3 +123,10 @@ def mask2json(
     ]
 
     return json_objects
+
+
+def _shift_contour(contour, dy: int, return_inner_contours: bool):
+    """Moves a contour of labels2contours, with its inner contours, down by dy rows."""
+    if not return_inner_contours:
+        return contour + [0, dy]
+    return contour[0] + [0, dy], [inner + [0, dy] for inner in contour[1]]
@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 import numpy as np
 import cv2
 
@@ -472,3 +475,19 @@ class TestMask2Json(TestCase):
         result = mask2json(input_mask, 0)
 
         self.compare_result_to_expected(result, self.json_objects_small)
+
+    def test_memory_mapped_mask(self):
+        input_mask = np.zeros((40, 30), dtype=np.uint8)
+        cv2.circle(input_mask, (10, 8), 5, 255, -1)
+        cv2.rectangle(input_mask, (5, 25), (25, 35), 255, -1)
+        cv2.rectangle(input_mask, (10, 28), (20, 32), 0, -1)
+        expected = mask2json(input_mask, return_inner_contours=True)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mask.npy")
+            np.save(path, input_mask)
+            mask = np.load(path, mmap_mode="r")
+            result = mask2json(mask, return_inner_contours=True)
+            del mask
+
+        self.compare_result_to_expected(expected, result)